@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Almacenamiento de casos (malla, soluciones de flujo potencial, coeficientes
+    aerodinamicos e historiales de convergencia) en un solo archivo HDF5.
+
+La estructura del archivo sigue la nomenclatura de CGNS/SIDS en donde es
+    practico (Base, Zone, GridCoordinates, FlowSolution), sin implementar el
+    mapeo completo de nodos ADF de CGNS/HDF5:
+
+    /Base                                   CGNSBase_t
+    /Base/Zone                              Zone_t (atributos de la malla)
+    /Base/Zone/GridCoordinates/CoordinateX  (M, N)
+    /Base/Zone/GridCoordinates/CoordinateY  (M, N)
+    /Base/Zone/airfoil_boundary             (M, ) o tamano del perfil
+    /Base/Zone/<caso>                       FlowSolution_t
+        Potential, Theta, ...               campos (M, N)
+        ConvergenceHistory                  historial de residuos
+        atributos: alfa, mach, C, CL, CD, IMA
+
+Los campos se guardan en datasets fragmentados (chunked) y comprimidos, de
+    manera que se puede leer un solo campo o solo la linea de la superficie
+    (j = 0) sin cargar el resto del archivo.
+"""
+
+from os import listdir
+from os.path import join
+
+import numpy as np
+import h5py
+
+from util.helpers import mesh_from_arrays
+
+# nombres de los campos de flujo potencial siguiendo la convencion de CGNS
+CAMPOS = {'phi': 'Potential', 'theta': 'Theta'}
+ESCALARES = ('alfa', 'mach', 'C', 'CL', 'CD', 'IMA')
+
+
+def case_name(alfa, mach=None):
+    """
+    Genera el nombre del grupo FlowSolution_t de un caso
+    ...
+
+    Parametros
+    ----------
+    alfa : float64
+        angulo de ataque en grados
+    mach : float64
+        numero de mach de la corriente libre. None si no se distingue el caso
+        por numero de mach
+
+    Return
+    ------
+    name : str
+        nombre del grupo dentro de /Base/Zone
+    """
+
+    name = 'FlowSolution_a{:+09.4f}'.format(float(alfa))
+    if mach is not None:
+        name += '_M{:.4f}'.format(float(mach))
+
+    return name
+
+
+class case_store(object):
+    """
+    Archivo HDF5 que agrupa una malla y todos los casos resueltos sobre ella.
+    ...
+
+    Atributos
+    ----------
+    filename : str
+        nombre del archivo HDF5
+    mode : str
+        modo de apertura del archivo, igual que en h5py ('r', 'a', 'w')
+    compression : int
+        nivel de compresion gzip de los datasets (0 - 9)
+
+    Metodos
+    -------
+    write_mesh(mesh):
+        Guarda la malla en la zona del archivo
+    read_mesh():
+        Reconstruye el objeto mesh_O o mesh_C almacenado
+    write_case(alfa, phi=None, theta=None, C=None, CL=None, CD=None,
+               IMA=None, history=None, mach=None, **campos):
+        Guarda un caso de flujo potencial
+    read_field(alfa, campo='phi', surface=False, mach=None):
+        Lectura parcial de un campo, completo o solo en la superficie
+    read_scalars(alfa, mach=None):
+        Lee C, CL, CD, IMA de un caso
+    read_history(alfa, mach=None):
+        Lee el historial de convergencia de un caso
+    cases():
+        Lista de casos almacenados
+    polar():
+        Coeficientes de todos los casos, ordenados por angulo de ataque
+    """
+
+    def __init__(self, filename, mode='a', compression=4):
+        self.filename       = filename
+        self.mode           = mode
+        self.compression    = compression
+        self.file           = h5py.File(filename, mode)
+
+        if 'Base' not in self.file and mode != 'r':
+            base = self.file.create_group('Base')
+            base.attrs['label'] = 'CGNSBase_t'
+            base.attrs['cell_dimension'] = 2
+            base.attrs['physical_dimension'] = 2
+
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+        return
+
+    def _zone(self):
+        return self.file['Base/Zone']
+
+    def _dataset(self, group, name, data):
+        """
+        Crea (o reemplaza) un dataset fragmentado y comprimido
+        """
+
+        data = np.asarray(data)
+        if name in group:
+            del group[name]
+
+        if data.ndim == 2:
+            # fragmentos de lineas eta completas para lecturas de superficie
+            # (j = 0) baratas
+            chunks = (min(data.shape[0], 512), min(data.shape[1], 16))
+        elif data.ndim == 1 and data.shape[0] > 0:
+            chunks = (min(data.shape[0], 4096), )
+        else:
+            chunks = None
+
+        if chunks is None:
+            return group.create_dataset(name, data=data)
+
+        return group.create_dataset(name, data=data, chunks=chunks,
+                                    compression='gzip',
+                                    compression_opts=self.compression,
+                                    shuffle=True)
+
+    def write_mesh(self, mesh):
+        """
+        Guarda la malla en /Base/Zone
+        ...
+
+        Parametros
+        ----------
+        mesh : mesh
+            Objeto mesh_O o mesh_C
+
+        Return
+        ------
+        None
+        """
+
+        base = self.file['Base']
+        if 'Zone' in base:
+            zone = base['Zone']
+        else:
+            zone = base.create_group('Zone')
+        zone.attrs['label']             = 'Zone_t'
+        zone.attrs['ZoneType']          = 'Structured'
+        # VertexSize, CellSize, VertexSizeBoundary
+        zone.attrs['size']              = np.array([[mesh.M, mesh.N],
+                                                    [mesh.M - 1, mesh.N - 1],
+                                                    [0, 0]])
+        zone.attrs['tipo']              = str(mesh.tipo)
+        zone.attrs['d_eta']             = mesh.d_eta
+        zone.attrs['d_xi']              = mesh.d_xi
+        zone.attrs['R']                 = mesh.R
+        zone.attrs['M']                 = mesh.M
+        zone.attrs['N']                 = mesh.N
+        zone.attrs['airfoil_alone']     = bool(mesh.airfoil_alone)
+        zone.attrs['airfoil_join']      = int(mesh.airfoil_join)
+
+        if 'GridCoordinates' in zone:
+            coords = zone['GridCoordinates']
+        else:
+            coords = zone.create_group('GridCoordinates')
+            coords.attrs['label'] = 'GridCoordinates_t'
+        self._dataset(coords, 'CoordinateX', mesh.X)
+        self._dataset(coords, 'CoordinateY', mesh.Y)
+        self._dataset(zone, 'airfoil_boundary', mesh.airfoil_boundary)
+
+        return
+
+    def read_mesh(self):
+        """
+        Reconstruye la malla almacenada en el archivo
+        ...
+
+        Parametros
+        ----------
+        None
+
+        Return
+        ------
+        mesh : mesh
+            Objeto mesh_O o mesh_C
+        """
+
+        zone    = self._zone()
+        attrs   = zone.attrs
+        X       = zone['GridCoordinates/CoordinateX'][...]
+        Y       = zone['GridCoordinates/CoordinateY'][...]
+
+        mesh = mesh_from_arrays(str(attrs['tipo']), float(attrs['d_eta']),
+                                float(attrs['d_xi']), float(attrs['R']),
+                                int(attrs['M']), int(attrs['N']),
+                                bool(attrs['airfoil_alone']),
+                                int(attrs['airfoil_join']),
+                                zone['airfoil_boundary'][...], X, Y)
+
+        return mesh
+
+    def write_case(self, alfa, phi=None, theta=None, C=None, CL=None, CD=None,
+                   IMA=None, history=None, mach=None, **campos):
+        """
+        Guarda un caso de flujo potencial. Los argumentos con valor None no se
+            escriben, lo que permite completar un caso en varias llamadas.
+        ...
+
+        Parametros
+        ----------
+        alfa : float64
+            angulo de ataque en grados
+        phi, theta : numpy.array
+            funcion de potencial y angulo de cada nodo (M, N)
+        C : float64
+            circulacion alrededor del perfil
+        CL, CD : float64
+            coeficientes de levantamiento y resistencia
+        IMA : int
+            indica si la densidad fue negativa en algun nodo
+        history : numpy.array
+            historial de convergencia del metodo iterativo
+        mach : float64
+            numero de mach de la corriente libre. Forma parte del nombre del
+            caso
+        **campos : numpy.array
+            campos adicionales (u, v, cp, psi, ...) con forma (M, N)
+
+        Return
+        ------
+        name : str
+            nombre del grupo del caso
+        """
+
+        zone = self._zone()
+        name = case_name(alfa, mach)
+        if name in zone:
+            case = zone[name]
+        else:
+            case = zone.create_group(name)
+            case.attrs['label']         = 'FlowSolution_t'
+            case.attrs['GridLocation']  = 'Vertex'
+
+        escalares = {'alfa': alfa, 'mach': mach, 'C': C, 'CL': CL, 'CD': CD,
+                     'IMA': IMA}
+        for key in ESCALARES:
+            if escalares[key] is not None:
+                case.attrs[key] = escalares[key]
+
+        campos['phi']   = phi
+        campos['theta'] = theta
+        for key, data in campos.items():
+            if data is not None:
+                self._dataset(case, CAMPOS.get(key, key), data)
+
+        if history is not None:
+            self._dataset(case, 'ConvergenceHistory', history)
+
+        return name
+
+    def _case(self, alfa, mach=None):
+        return self._zone()[case_name(alfa, mach)]
+
+    def read_field(self, alfa, campo='phi', surface=False, mach=None):
+        """
+        Lee un campo de un caso. Solo se leen del disco los fragmentos
+            necesarios.
+        ...
+
+        Parametros
+        ----------
+        alfa : float64
+            angulo de ataque en grados
+        campo : str
+            nombre del campo ('phi', 'theta' o cualquier campo adicional)
+        surface : boolean
+            True para leer solo la linea j = 0 (superficie del perfil)
+        mach : float64
+            numero de mach del caso, si se almaceno con el
+
+        Return
+        ------
+        data : numpy.array
+            campo completo (M, N) o solo la superficie (M, )
+        """
+
+        dset = self._case(alfa, mach)[CAMPOS.get(campo, campo)]
+        if surface:
+            return dset[:, 0]
+
+        return dset[...]
+
+    def read_scalars(self, alfa, mach=None):
+        """
+        Regresa un diccionario con los escalares almacenados de un caso
+            (alfa, mach, C, CL, CD, IMA)
+        """
+
+        attrs = self._case(alfa, mach).attrs
+
+        return {key: attrs[key] for key in ESCALARES if key in attrs}
+
+    def read_history(self, alfa, mach=None):
+        """
+        Regresa el historial de convergencia de un caso
+        """
+
+        return self._case(alfa, mach)['ConvergenceHistory'][...]
+
+    def cases(self):
+        """
+        Regresa la lista de nombres de los casos almacenados
+        """
+
+        zone = self._zone()
+        return [name for name in zone
+                if zone[name].attrs.get('label') == 'FlowSolution_t']
+
+    def polar(self):
+        """
+        Reune los escalares de todos los casos, ordenados por angulo de ataque
+        ...
+
+        Parametros
+        ----------
+        None
+
+        Return
+        ------
+        polar : dict
+            diccionario de numpy.array con llaves alfa, mach, C, CL, CD, IMA.
+            Los valores no almacenados se regresan como nan
+        """
+
+        zone    = self._zone()
+        names   = self.cases()
+        polar   = {key: np.full((len(names), ), np.nan) for key in ESCALARES}
+
+        for k, name in enumerate(names):
+            attrs = zone[name].attrs
+            for key in ESCALARES:
+                if key in attrs:
+                    polar[key][k] = attrs[key]
+
+        orden = np.lexsort((polar['alfa'], polar['mach']))
+        for key in ESCALARES:
+            polar[key] = polar[key][orden]
+
+        return polar
+
+
+def from_csv_dir(path, store_file, mesh=None):
+    """
+    Importa un directorio con resultados en formato csv (phi_<alfa>.csv,
+        C_<alfa>.csv, theta_<alfa>.csv), como potential_0012_mayo, a un
+        archivo HDF5
+    ...
+
+    Parametros
+    ----------
+    path : str
+        directorio con los archivos csv
+    store_file : str
+        nombre del archivo HDF5 que se creara
+    mesh : mesh
+        malla sobre la cual se calcularon las soluciones. Opcional, los csv
+        no la incluyen
+
+    Return
+    ------
+    store : case_store
+        archivo abierto en modo de escritura
+    """
+
+    alfas = sorted(int(name[4:-4]) for name in listdir(path)
+                   if name.startswith('phi_') and name.endswith('.csv'))
+
+    store = case_store(store_file, mode='w')
+    if mesh is not None:
+        store.write_mesh(mesh)
+    else:
+        store.file['Base'].create_group('Zone').attrs['label'] = 'Zone_t'
+
+    for alfa in alfas:
+        phi     = np.loadtxt(join(path, 'phi_' + str(alfa) + '.csv'),
+                             delimiter=',')
+        theta   = np.loadtxt(join(path, 'theta_' + str(alfa) + '.csv'),
+                             delimiter=',')
+        C       = float(np.loadtxt(join(path, 'C_' + str(alfa) + '.csv')))
+        store.write_case(alfa, phi=phi, theta=theta, C=C)
+
+    return store
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Conversion masiva de mallas entre formatos.
+
+Entradas: txt_mesh (formato propio) y h5 (case_store)
+Salidas:  txt_mesh, su2, msh (gmsh 4.1 binario), p2d (Plot3D) y h5
+
+Ejemplo:
+    python convert_mesh.py 'aspect_ratio/**/*.txt_mesh' 'meshes/*.txt_mesh' \
+        -f su2 -o /tmp/su2 -j 8
+
+Las conversiones se ejecutan en paralelo (un proceso por archivo). Si el
+    archivo de salida es mas reciente que el de entrada no se vuelve a
+    generar, a menos que se utilice --force.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import util.helpers as helpers
+from case_store import case_store
+
+# extension de cada formato de salida
+FORMATOS = {'txt_mesh': '.txt_mesh', 'su2': '.su2', 'msh': '.msh',
+            'p2d': '.p2d', 'h5': '.h5'}
+
+
+def read_mesh(filename):
+    '''
+    Importa una malla a partir de su extension (txt_mesh o h5)
+    '''
+
+    if filename.endswith('.h5'):
+        with case_store(filename, mode='r') as store:
+            return store.read_mesh()
+
+    return helpers.from_txt_mesh(filename)
+
+
+def write_mesh(mesh, filename, formato):
+    '''
+    Exporta una malla en el formato indicado
+    '''
+
+    if formato == 'txt_mesh':
+        mesh.to_txt_mesh(filename)
+    elif formato == 'su2':
+        mesh.to_su2(filename)
+    elif formato == 'msh':
+        mesh.to_gmsh(filename)
+    elif formato == 'p2d':
+        mesh.to_plot3d(filename)
+    elif formato == 'h5':
+        with case_store(filename, mode='w') as store:
+            store.write_mesh(mesh)
+
+    return
+
+
+def output_name(filename, formato, outdir=None):
+    '''
+    Nombre del archivo de salida. Se conserva el nombre base y se cambia la
+        extension. Si no se indica outdir se escribe junto al de entrada
+    '''
+
+    base = os.path.splitext(filename)[0]
+    if outdir is not None:
+        # se conserva la estructura de directorios relativa. Las rutas fuera
+        # del directorio actual se conservan completas dentro de outdir
+        rel = os.path.relpath(base)
+        if rel.startswith(os.pardir):
+            rel = os.path.abspath(base).lstrip(os.sep)
+        base = os.path.join(outdir, rel)
+
+    return base + FORMATOS[formato]
+
+
+def convert(filename, out, formato):
+    '''
+    Convierte un archivo. Se ejecuta en los procesos del pool, los errores
+        se regresan como texto para no detener el resto de conversiones
+    '''
+
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        mesh = read_mesh(filename)
+        write_mesh(mesh, out, formato)
+    except Exception as e:
+        return (filename, out, repr(e))
+
+    return (filename, out, None)
+
+
+def is_updated(filename, out):
+    '''
+    True si el archivo de salida existe y es mas reciente que la entrada
+    '''
+
+    return os.path.exists(out) \
+        and os.path.getmtime(out) >= os.path.getmtime(filename)
+
+
+def progress(done, total, t0, width=40):
+    '''
+    Barra de progreso en una sola linea
+    '''
+
+    full = width * done // total if total > 0 else width
+    sys.stdout.write('\r[' + '#' * full + '.' * (width - full) + '] '
+                     + str(done) + '/' + str(total)
+                     + ' {:.1f} s'.format(time.time() - t0))
+    sys.stdout.flush()
+
+    return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+                description='Conversion masiva de mallas entre formatos')
+    parser.add_argument('inputs', nargs='+',
+                        help='archivos o patrones glob (admite **)')
+    parser.add_argument('-f', '--format', required=True,
+                        choices=sorted(FORMATOS.keys()),
+                        help='formato de salida')
+    parser.add_argument('-o', '--outdir', default=None,
+                        help='directorio de salida. Por defecto junto a cada '
+                             'archivo de entrada')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='numero de procesos')
+    parser.add_argument('--force', action='store_true',
+                        help='convierte aunque la salida este actualizada')
+    args = parser.parse_args(argv)
+
+    # lista de archivos, sin repetidos y solo con extensiones de entrada
+    files = []
+    for pattern in args.inputs:
+        for filename in sorted(glob.glob(pattern, recursive=True)):
+            if filename.endswith(('.txt_mesh', '.h5')) \
+                    and filename not in files:
+                files.append(filename)
+
+    tareas  = []
+    skipped = 0
+    for filename in files:
+        out = output_name(filename, args.format, args.outdir)
+        if os.path.abspath(out) == os.path.abspath(filename):
+            skipped += 1
+        elif not args.force and is_updated(filename, out):
+            skipped += 1
+        else:
+            tareas.append((filename, out))
+
+    print(str(len(files)) + ' archivos, ' + str(skipped) + ' actualizados, '
+          + str(len(tareas)) + ' por convertir')
+    if not tareas:
+        return 0
+
+    errores = []
+    t0      = time.time()
+    progress(0, len(tareas), t0)
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(convert, filename, out, args.format)
+                   for (filename, out) in tareas]
+        for done, future in enumerate(as_completed(futures), start=1):
+            (filename, out, error) = future.result()
+            if error is not None:
+                errores.append((filename, error))
+            progress(done, len(tareas), t0)
+    print()
+
+    for (filename, error) in errores:
+        print('ERROR ' + filename + ': ' + error)
+
+    return 1 if errores else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,6 +17,8 @@ from sys import maxsize
 from numba import jitclass
 from numba import float32, int8, int16, boolean
 
+from .mesh_metric import metric
+
 np.set_printoptions(threshold=maxsize)
 
 class mesh(object):
@@ -54,6 +56,44 @@ class mesh(object):
 
         return
 
+    # al reasignar X o Y se descartan las metricas guardadas
+    @property
+    def X(self):
+        return self._X
+
+    @X.setter
+    def X(self, X):
+        self._X         = X
+        self._metric    = None
+
+    @property
+    def Y(self):
+        return self._Y
+
+    @Y.setter
+    def Y(self, Y):
+        self._Y         = Y
+        self._metric    = None
+
+    # remuestreo de la malla (refinamiento y engrosamiento)
+    from .mesh_resample import resample, refine, coarsen
+
+    def metric(self):
+        '''
+        Metricas de la malla (ver mesh_metric), calculadas al primer uso y
+            guardadas mientras X y Y no cambien. Se comparan las coordenadas
+            en cada llamada, de manera que tambien se detectan modificaciones
+            de X y Y en el lugar
+        '''
+
+        if self._metric is None \
+                or not self._metric.valid(self._X, self._Y, self.d_xi,
+                                          self.d_eta):
+            self._metric = metric(self._X, self._Y, self.d_xi, self.d_eta,
+                                  periodic=self.tipo != 'C')
+
+        return self._metric
+
     def get_tipo(self):
         return self.tipo
 
@@ -142,6 +182,20 @@ class mesh(object):
 
         return
 
+    def to_plot3d(self, filename='./garbage/mesh_own.p2d'):
+        '''
+        Exporta la malla a formato Plot3D, 2D, un solo bloque, ASCII
+            (formatted). Primero las dimensiones M N, despues todas las
+            coordenadas X y luego todas las Y, con xi como indice mas rapido
+        '''
+
+        with open(filename, 'w') as file:
+            file.write(str(self.M) + ' ' + str(self.N) + '\n')
+            np.savetxt(file, np.asarray(self.X).ravel(order='F'), fmt='%.17g')
+            np.savetxt(file, np.asarray(self.Y).ravel(order='F'), fmt='%.17g')
+
+        return
+
     def gen_inter_pol(self, eje='eta'):
         '''
         genera malla por interpolación polinomial por Lagrange
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Metricas de la transformacion de una malla, con cache.
+
+El tensor metrico (g11, g22, g12, J y derivadas) se calcula al primer uso,
+    para la orientacion de la malla o para la malla invertida (np.flip en
+    ambos ejes, la orientacion del metodo de flujo potencial), junto con sus
+    valores en las mallas intercaladas vertical (M, N-1) y horizontal
+    (M-1, N). Los arreglos se regresan como solo lectura, ya que se comparten
+    entre todas las funciones que los utilizan.
+
+El objeto metric guarda una copia de X y Y; mesh.metric() lo vuelve a crear
+    si las coordenadas de la malla cambiaron.
+"""
+
+import numpy as np
+
+
+def _tensor(X, Y, d_xi, d_eta, periodic=True):
+    """
+    Tensor metrico de la transformacion, ver mesh_O.tensor. Con periodic las
+        derivadas en xi de los extremos son centrales a traves del corte
+        (malla O); si no, son de un solo lado (malla C)
+    """
+
+    (M, N)  = np.shape(X)
+    x_xi    = np.zeros((M, N))
+    x_eta   = np.zeros((M, N))
+    y_xi    = np.zeros((M, N))
+    y_eta   = np.zeros((M, N))
+
+    # cálculo de derivadas parciales
+    # nodos internos
+    x_eta[:-1, 1:-1] = (X[:-1, 2:] - X[:-1, :-2]) / 2 / d_eta
+    y_eta[:-1, 1:-1] = (Y[:-1, 2:] - Y[:-1, :-2]) / 2 / d_eta
+
+    x_eta[:-1, 0]   = (X[:-1, 1] - X[:-1, 0]) / d_eta
+    x_eta[:-1, -1]  = (X[:-1, -1] - X[:-1, -2]) / d_eta
+    y_eta[:-1, 0]   = (Y[:-1, 1] - Y[:-1, 0]) / d_eta
+    y_eta[:-1, -1]  = (Y[:-1, -1] - Y[:-1, -2]) / d_eta
+
+    x_xi[1:-1, :] = (X[2:, :] - X[:-2, :]) / 2 / d_xi
+    y_xi[1:-1, :] = (Y[2:, :] - Y[:-2, :]) / 2 / d_xi
+
+    if periodic:
+        x_eta[-1, :]    = x_eta[0, :]
+        y_eta[-1, :]    = y_eta[0, :]
+        x_xi[0, :]      = (X[1, :] - X[-2, :]) / 2 / d_xi
+        y_xi[0, :]      = (Y[1, :] - Y[-2, :]) / 2 / d_xi
+        x_xi[-1, :]     = x_xi[0, :]
+        y_xi[-1, :]     = y_xi[0, :]
+    else:
+        x_eta[-1, 1:-1] = (X[-1, 2:] - X[-1, :-2]) / 2 / d_eta
+        y_eta[-1, 1:-1] = (Y[-1, 2:] - Y[-1, :-2]) / 2 / d_eta
+        x_eta[-1, 0]    = (X[-1, 1] - X[-1, 0]) / d_eta
+        x_eta[-1, -1]   = (X[-1, -1] - X[-1, -2]) / d_eta
+        y_eta[-1, 0]    = (Y[-1, 1] - Y[-1, 0]) / d_eta
+        y_eta[-1, -1]   = (Y[-1, -1] - Y[-1, -2]) / d_eta
+        x_xi[0, :]      = (X[1, :] - X[0, :]) / d_xi
+        y_xi[0, :]      = (Y[1, :] - Y[0, :]) / d_xi
+        x_xi[-1, :]     = (X[-1, :] - X[-2, :]) / d_xi
+        y_xi[-1, :]     = (Y[-1, :] - Y[-2, :]) / d_xi
+
+    # obteniendo los tensores de la métrica
+    J       = (x_xi * y_eta) - (x_eta * y_xi)
+    g11I    = x_xi ** 2 + y_xi ** 2
+    g12I    = x_xi * x_eta + y_xi * y_eta
+    g22I    = x_eta ** 2 + y_eta ** 2
+    g11     = g22I / J ** 2
+    g12     = -g12I / J ** 2
+    g22     = g11I / J ** 2
+
+    C1      = g11I
+    A       = g22I
+    B       = g12I
+
+    return (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, A, B, C1)
+
+
+def _solo_lectura(arrays):
+    for a in arrays:
+        a.setflags(write=False)
+
+    return arrays
+
+
+class metric(object):
+    '''
+    Metricas de una malla, calculadas al primer uso
+    ...
+
+    Atributos
+    ----------
+    X, Y : numpy.array
+        copia de las coordenadas con las que se calculan las metricas
+    d_xi, d_eta : float64
+        tamaño de paso en la malla computacional
+    periodic : boolean
+        True para mallas tipo O
+
+    Metodos
+    -------
+    valid(X, Y, d_xi, d_eta):
+        indica si las metricas corresponden a las coordenadas indicadas
+    coords(flip=False):
+        coordenadas X y Y
+    tensor(flip=False):
+        (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, A, B, C1)
+    staggered(flip=False):
+        metricas en las mallas intercaladas vertical y horizontal
+    '''
+
+    CAMPOS = ('g11', 'g12', 'g22', 'J', 'x_xi', 'x_eta', 'y_xi', 'y_eta')
+
+    def __init__(self, X, Y, d_xi=1, d_eta=1, periodic=True):
+        (self.X, self.Y) = _solo_lectura((np.array(X, dtype=float),
+                                          np.array(Y, dtype=float)))
+        self.d_xi       = d_xi
+        self.d_eta      = d_eta
+        self.periodic   = periodic
+        self._coords    = {False: (self.X, self.Y)}
+        self._tensor    = {}
+        self._staggered = {}
+
+        return
+
+    def valid(self, X, Y, d_xi=1, d_eta=1):
+        '''
+        Indica si las metricas corresponden a X, Y, d_xi y d_eta
+        '''
+
+        return d_xi == self.d_xi and d_eta == self.d_eta \
+            and np.array_equal(X, self.X) and np.array_equal(Y, self.Y)
+
+    def coords(self, flip=False):
+        '''
+        Coordenadas de la malla (solo lectura)
+        ...
+
+        Parametros
+        ----------
+        flip : boolean
+            True para la malla invertida
+
+        Return
+        ------
+        (X, Y) : (numpy.array, numpy.array)
+        '''
+
+        if flip not in self._coords:
+            self._coords[flip] = _solo_lectura(
+                (np.flip(self.X).copy(), np.flip(self.Y).copy()))
+
+        return self._coords[flip]
+
+    def tensor(self, flip=False):
+        '''
+        Tensor metrico en los nodos de la malla (solo lectura), en el mismo
+            orden que mesh_O.tensor
+        ...
+
+        Parametros
+        ----------
+        flip : boolean
+            True para la malla invertida
+
+        Return
+        ------
+        (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, A, B, C1) : numpy.array
+        '''
+
+        if flip not in self._tensor:
+            (X, Y) = self.coords(flip)
+            self._tensor[flip] = _solo_lectura(
+                _tensor(X, Y, self.d_xi, self.d_eta, self.periodic))
+
+        return self._tensor[flip]
+
+    def staggered(self, flip=False):
+        '''
+        Metricas en las mallas intercaladas (solo lectura), promedio de los
+            nodos vecinos
+        ...
+
+        Parametros
+        ----------
+        flip : boolean
+            True para la malla invertida
+
+        Return
+        ------
+        (V, H) : (dict, dict)
+            g11, g12, g22, J, x_xi, x_eta, y_xi, y_eta en la malla vertical
+            (M, N-1) y en la malla horizontal (M-1, N)
+        '''
+
+        if flip not in self._staggered:
+            (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, _, _, _) = \
+                self.tensor(flip)
+            nodos = dict(zip(self.CAMPOS,
+                             (g11, g12, g22, J, x_xi, x_eta, y_xi, y_eta)))
+            V = {k: 0.5 * (a[:, :-1] + a[:, 1:]) for (k, a) in nodos.items()}
+            H = {k: 0.5 * (a[:-1, :] + a[1:, :]) for (k, a) in nodos.items()}
+            _solo_lectura(V.values())
+            _solo_lectura(H.values())
+            self._staggered[flip] = (V, H)
+
+        return self._staggered[flip]
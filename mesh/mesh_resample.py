@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Extiende la clase mesh.
+
+Remuestreo de una malla tipo O o tipo C a otro numero de nodos M x N
+    (refinamiento y engrosamiento), para secuencias de mallas, estudios de
+    convergencia y transferencia de soluciones entre resoluciones.
+
+Las nuevas lineas se ubican en indices fraccionarios de la malla original,
+    uniformes en eta y uniformes por tramos en xi: los tramos separan las
+    esquinas de las fronteras (borde de salida, union perfil-estela en
+    mallas C, cambios de airfoil_boundary y quiebres de mas de 10 grados),
+    que se conservan como nodos de la nueva malla.
+
+Las fronteras (perfil, frontera externa y, en mallas C, las salidas) se
+    reconstruyen con splines cubicos parametrizados por longitud de arco,
+    uno por tramo; la longitud de arco de los nuevos nodos se obtiene por
+    interpolacion monotona en el espacio de indices, por lo que la
+    distribucion de los nodos se conserva. El interior se interpola con
+    splines bicubicos en el espacio computacional (periodicos en xi en
+    mallas O). Con un factor entero los nodos originales se conservan
+    exactamente, y la malla refinada es una aproximacion inicial cercana a
+    la solucion de los generadores (gen_Laplace_n y gen_Poisson_n con
+    tfi=False) en lugar de reiniciar desde TFI.
+"""
+
+import copy
+
+import numpy as np
+from scipy.interpolate import CubicSpline, PchipInterpolator, \
+    RectBivariateSpline
+
+
+def _borde_de_salida(X, Y):
+    """
+    Indice del borde de salida del lado inferior de una malla tipo C: ultimo
+        nodo de la frontera interna que coincide con su nodo simetrico
+    """
+
+    M       = np.shape(X)[0]
+    k       = np.arange(M // 2)
+    igual   = np.isclose(X[k, 0], X[M-1-k, 0]) \
+        & np.isclose(Y[k, 0], Y[M-1-k, 0])
+    # en mallas tipo O solo coinciden los nodos 0 y M-1
+    if igual.all() or not igual[:2].all():
+        raise ValueError('la frontera interna no tiene estela (malla tipo C)')
+
+    return int(np.argmin(igual)) - 1
+
+
+def _quiebres(x, y, angulo):
+    """
+    Nodos internos de una curva donde la direccion cambia mas de angulo
+        (grados)
+    """
+
+    dx  = np.diff(x)
+    dy  = np.diff(y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cos = (dx[:-1] * dx[1:] + dy[:-1] * dy[1:]) \
+            / np.hypot(dx[:-1], dy[:-1]) / np.hypot(dx[1:], dy[1:])
+
+    return np.nonzero(cos < np.cos(angulo * np.pi / 180))[0] + 1
+
+
+def _cortes(self, angulo=10.):
+    """
+    Indices en xi de las esquinas de las fronteras, que separan los tramos
+        del remuestreo
+    """
+
+    M       = self.M
+    cortes  = [0, M-1]
+    for j in (0, self.N-1):
+        cortes.extend(_quiebres(self.X[:, j], self.Y[:, j], angulo))
+    if self.tipo == 'C':
+        i_te = _borde_de_salida(self.X, self.Y)
+        cortes.extend([i_te, M-1-i_te])
+    elif np.size(self.airfoil_boundary) == M:
+        # la esquina es el ultimo nodo del perfil (o flap), no el primero de
+        # la linea de union
+        frontera    = np.asarray(self.airfoil_boundary)
+        cambio      = np.nonzero(np.diff(frontera))[0]
+        cortes.extend(np.where(frontera[cambio] != 0, cambio, cambio + 1))
+
+    return np.unique(cortes)
+
+
+def _mapa(cortes, M, M_n):
+    """
+    Indices fraccionarios de la malla original (M_n, ) para los nodos de la
+        nueva malla, lineales entre cortes. Los cortes se redondean de forma
+        simetrica, de modo que las mallas tipo C conservan la simetria de la
+        estela
+    """
+
+    f       = (M_n - 1) / (M - 1)
+    nuevos  = np.where(cortes <= (M - 1) / 2, np.rint(cortes * f),
+                       M_n - 1 - np.rint((M - 1 - cortes) * f))
+    if np.any(np.diff(nuevos) <= 0):
+        raise ValueError('la malla es muy gruesa para conservar las '
+                         + 'esquinas de las fronteras')
+
+    return np.interp(np.arange(M_n), nuevos, cortes)
+
+
+def _curva(x, y, t, cortes, periodica=False):
+    """
+    Reconstruye una curva de la frontera en los indices fraccionarios t, con
+        un spline cubico por longitud de arco en cada tramo entre cortes
+    """
+
+    curva = np.empty((np.size(t), 2))
+    for (a, b) in zip(cortes[:-1], cortes[1:]):
+        k       = np.arange(a, b + 1)
+        puntos  = np.column_stack((x[k], y[k]))
+        s       = np.concatenate(([0], np.cumsum(np.hypot(np.diff(x[k]),
+                                                          np.diff(y[k])))))
+        bc      = 'not-a-knot'
+        if periodica:
+            puntos[-1] = puntos[0]
+            bc = 'periodic'
+        tramo           = (t >= a) & (t <= b)
+        s_t             = PchipInterpolator(k, s)(t[tramo])
+        curva[tramo]    = CubicSpline(s, puntos, bc_type=bc)(s_t)
+
+    return (curva[:, 0], curva[:, 1])
+
+
+def resample(self, M, N, angulo=10.):
+    """
+    Malla con M x N nodos que sigue a la malla actual, ver la descripcion del
+        modulo
+    ...
+
+    Parametros
+    ----------
+    M, N : int
+        numero de nodos en xi y en eta de la nueva malla
+    angulo : float64
+        cambio de direccion minimo (grados) para considerar un nodo de las
+        fronteras como esquina
+
+    Return
+    ------
+    malla : mesh
+        nueva malla del mismo tipo. La malla actual no se modifica
+    """
+
+    (M0, N0) = (self.M, self.N)
+    X0      = self.X
+    Y0      = self.Y
+    cortes  = _cortes(self, angulo)
+    t       = _mapa(cortes, M0, M)
+    s       = np.linspace(0, N0 - 1, N)
+
+    # interior: splines bicubicos en el espacio computacional. En mallas O
+    # se agregan nodos a ambos lados del corte para que sean periodicos
+    i0 = np.arange(M0)
+    if self.tipo != 'C':
+        X0 = np.concatenate((X0[-4:-1], X0, X0[1:4]))
+        Y0 = np.concatenate((Y0[-4:-1], Y0, Y0[1:4]))
+        i0 = np.arange(-3, M0 + 3)
+    j0 = np.arange(N0)
+    X = RectBivariateSpline(i0, j0, X0)(t, s)
+    Y = RectBivariateSpline(i0, j0, Y0)(t, s)
+
+    # fronteras por longitud de arco. La frontera externa de las mallas O es
+    # una curva cerrada sin esquinas
+    (X[:, 0], Y[:, 0]) = _curva(self.X[:, 0], self.Y[:, 0], t, cortes)
+    cerrada = self.tipo != 'C' and np.size(cortes) == 2 \
+        and np.size(_quiebres(np.append(self.X[-2:, -1], self.X[1, -1]),
+                              np.append(self.Y[-2:, -1], self.Y[1, -1]),
+                              angulo)) == 0
+    (X[:, -1], Y[:, -1]) = _curva(self.X[:, -1], self.Y[:, -1], t,
+                                  cortes, cerrada)
+    if self.tipo == 'C':
+        extremos = np.array([0, N0 - 1])
+        for i in (0, -1):
+            (X[i, :], Y[i, :]) = _curva(self.X[i, :], self.Y[i, :], s,
+                                        extremos)
+        # los nodos de la estela coinciden en ambos lados del corte
+        i_te = _borde_de_salida(self.X, self.Y)
+        k = np.arange(np.rint(i_te * (M - 1) / (M0 - 1)).astype(int) + 1)
+        X[M-1-k, 0] = X[k, 0]
+        Y[M-1-k, 0] = Y[k, 0]
+    else:
+        X[-1] = X[0]
+        Y[-1] = Y[0]
+
+    # airfoil_boundary: todo el eje xi en mallas O, solo el perfil en mallas
+    # C. Un nodo nuevo entre un nodo del perfil y uno de la linea de union
+    # pertenece a la linea de union (0)
+    frontera = np.asarray(self.airfoil_boundary)
+    if self.tipo == 'C':
+        i_te_n  = np.rint(i_te * (M - 1) / (M0 - 1)).astype(int)
+        frontera = frontera[np.rint(t[i_te_n:M-i_te_n]).astype(int) - i_te]
+    elif np.size(frontera) == M0:
+        t_r     = np.where(np.isclose(t, np.rint(t)), np.rint(t), t)
+        a       = frontera[np.floor(t_r).astype(int)]
+        b       = frontera[np.ceil(t_r).astype(int)]
+        frontera = np.where(a == b, a, 0)
+
+    malla                   = copy.copy(self)
+    malla.M                 = M
+    malla.N                 = N
+    malla.airfoil_boundary  = frontera
+    malla.X                 = X
+    malla.Y                 = Y
+
+    return malla
+
+
+def refine(self, factor_xi=2, factor_eta=2, angulo=10.):
+    """
+    Malla refinada: el numero de celdas en cada direccion se multiplica por
+        el factor correspondiente. Con factores enteros los nodos de la malla
+        actual se conservan
+    ...
+
+    Parametros
+    ----------
+    factor_xi, factor_eta : float64
+        factores de refinamiento en xi y en eta (>= 1)
+    angulo : float64
+        ver resample
+
+    Return
+    ------
+    malla : mesh
+        malla refinada
+    """
+
+    M = int(round((self.M - 1) * factor_xi)) + 1
+    N = int(round((self.N - 1) * factor_eta)) + 1
+
+    return self.resample(M, N, angulo)
+
+
+def coarsen(self, factor_xi=2, factor_eta=2, angulo=10.):
+    """
+    Malla gruesa: el numero de celdas en cada direccion se divide entre el
+        factor correspondiente. Si M-1 y N-1 son multiplos de los factores
+        la malla gruesa es un subconjunto de los nodos de la malla actual
+    ...
+
+    Parametros
+    ----------
+    factor_xi, factor_eta : float64
+        factores de engrosamiento en xi y en eta (>= 1)
+    angulo : float64
+        ver resample
+
+    Return
+    ------
+    malla : mesh
+        malla gruesa
+    """
+
+    M = int(round((self.M - 1) / factor_xi)) + 1
+    N = int(round((self.N - 1) / factor_eta)) + 1
+
+    return self.resample(M, N, angulo)
@@ -12,8 +12,10 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 from mesh import mesh
+from mesh.mesh_metric import _tensor
 from airfoil import airfoil
 import mesh_su2
+import mesh_gmsh
 
 class mesh_C(mesh):
     """
@@ -58,6 +60,8 @@ class mesh_C(mesh):
         Utiliza la libreria numba para acelerar la ejecucion
     to_su2(filename):
         Convierte la malla a formato de SU2
+    to_gmsh(filename):
+        Convierte la malla a formato de gmsh (MSH 4.1 binario)
     """
 
     def __init__(self, R, N, airfoil, from_file=False, weight=1.355):
@@ -697,6 +701,25 @@ class mesh_C(mesh):
             Fprev = F
         return
 
+    def tensor(self):
+        """
+        Calcula el tensor metrico de la malla. En los extremos del eje xi
+            las derivadas son de un solo lado
+        ...
+
+        Parametros
+        ----------
+        None
+
+        Return
+        ------
+        (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, A, B, C1) : numpy.array
+            Matrices con los valores de la metrica de la transformacin para
+            todos los nodos de la malla
+        """
+
+        return _tensor(self.X, self.Y, self.d_xi, self.d_eta, periodic=False)
+
     def to_su2(self, filename):
         """
         Exporta la malla a un archivo de texto en formato de SU2.
@@ -719,3 +742,23 @@ class mesh_C(mesh):
             mesh_su2.to_su2_mesh_c_airfoil_n_flap(self, filename)
 
         return
+
+    def to_gmsh(self, filename):
+        """
+        Exporta la malla a un archivo binario en formato MSH 4.1 de gmsh.
+        ...
+
+        Parametros
+        ----------
+        filename : str
+            nombre del archivo en el cual se exportara la malla.
+            Debe incluir el path (relativo o absoluto)
+
+        Return
+        ------
+        None
+        """
+
+        mesh_gmsh.to_gmsh(self, filename)
+
+        return
@@ -17,6 +17,7 @@ from numba import jit
 
 from mesh import mesh
 import mesh_su2
+from util.anderson import anderson
 
 def gen_Laplace_v_(self, metodo='SOR', omega=1):
     """
@@ -188,7 +189,7 @@ def gen_Laplace_v_(self, metodo='SOR', omega=1):
     return
 
 
-def gen_Laplace_n(self, metodo='SOR', omega=1):
+def gen_Laplace_n(self, metodo='SOR', omega=1, depth=5, tfi=True):
     """
     Resuelve la ecuacion de Laplace para generar la malla.
 
@@ -199,14 +200,20 @@ def gen_Laplace_n(self, metodo='SOR', omega=1):
     Parametros
     ----------
     metodo : str
-        Metodo iterativo de solucion. Jacobi (J), Gauss Seidel (GS) y
-        sobrerelajacion (SOR)
+        Metodo iterativo de solucion. Jacobi (J), Gauss Seidel (GS),
+        sobrerelajacion (SOR) y Gauss Seidel con aceleracion de Anderson (AA)
     omega : float64
         Valor utilizado para acelerar o suavizar la solucion. Solo se
-        utiliza si metodo == 'SOR'
+        utiliza si metodo == 'SOR' o metodo == 'AA' (amortiguamiento)
         omega < 1 ---> suaviza la solucion
         omega = 1 ---> metodod Gauss Seidel
         omega > 1 ---> acelera la solucion
+    depth : int
+        numero de iteraciones anteriores utilizadas por la aceleracion de
+        Anderson, ver util.anderson. Solo se utiliza si metodo == 'AA'
+    tfi : boolean
+        aproximacion inicial por TFI. Con False se parte de la malla actual,
+        por ejemplo de una malla remapeada con resample o refine
 
     Return
     ------
@@ -214,7 +221,8 @@ def gen_Laplace_n(self, metodo='SOR', omega=1):
     """
 
     # aproximacion inicial
-    self.gen_TFI()
+    if tfi:
+        self.gen_TFI()
 
     Xn = self.X
     Yn = self.Y
@@ -240,6 +248,8 @@ def gen_Laplace_n(self, metodo='SOR', omega=1):
 
     mesh.it_max = 950e3
     mesh.err_max = 1e-8
+    # aceleracion de Anderson, G(x) es un barrido de Gauss-Seidel
+    acel = anderson(depth, omega) if metodo == 'AA' else None
 
     # inicio del metodo iterativo, separar el metodo para perfl con y sin flap
     print(f"Generando malla tipo C. \nDimensiones M: {self.M} N: {self.N}")
@@ -247,7 +257,7 @@ def gen_Laplace_n(self, metodo='SOR', omega=1):
         print("Perfil")
         print("Laplace numba:")
 
-        for it in range(mesh.it_max):
+        for it in range(int(mesh.it_max)):
             if (it % 25000 == 0):
                 self.X = np.copy(Xn)
                 self.Y = np.copy(Yn)
@@ -276,6 +286,8 @@ def gen_Laplace_n(self, metodo='SOR', omega=1):
             if metodo == 'SOR':
                 Xn = omega * Xn + (1 - omega) * Xo
                 Yn = omega * Yn + (1 - omega) * Yo
+            elif metodo == 'AA':
+                (Xn, Yn) = acel.update((Xo, Yo), (Xn, Yn))
 
             if abs(Xn -Xo).max() < mesh.err_max\
                     and abs(Yn - Yo).max() < mesh.err_max:
@@ -286,7 +298,7 @@ def gen_Laplace_n(self, metodo='SOR', omega=1):
         print("Perfil con flap")
         print("Laplace numba:")
 
-        for it in range(mesh.it_max):
+        for it in range(int(mesh.it_max)):
             if (it % 25000 == 0):
                 self.X = np.copy(Xn)
                 self.Y = np.copy(Yn)
@@ -316,6 +328,8 @@ def gen_Laplace_n(self, metodo='SOR', omega=1):
             if metodo == 'SOR':
                 Xn = omega * Xn + (1 - omega) * Xo
                 Yn = omega * Yn + (1 - omega) * Yo
+            elif metodo == 'AA':
+                (Xn, Yn) = acel.update((Xo, Yo), (Xn, Yn))
 
             if abs(Xn -Xo).max() < mesh.err_max\
                     and abs(Yn - Yo).max() < mesh.err_max:
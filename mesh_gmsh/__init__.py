@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Scripts para convertir mallas a formato de gmsh (MSH 4.1, binario)
+
+La conectividad se obtiene de mesh_su2.connectivity, de manera que ambos
+    formatos comparten la numeracion de nodos, celdas y fronteras
+
+Documentación: https://gmsh.info/doc/texinfo/gmsh.html#MSH-file-format
+"""
+
+import struct
+
+import numpy as np
+
+from mesh_su2 import connectivity
+
+# tipos de elemento de gmsh
+LINE    = 1
+QUAD    = 3
+
+def _size_t(*valores):
+    return struct.pack('<' + 'Q' * len(valores), *valores)
+
+def _entities(points, markers):
+    '''
+    Bloque $Entities. Una curva por cada frontera y una superficie (fluido).
+        No se definen entidades tipo punto
+    '''
+
+    curvas  = list(markers.keys())
+    data    = [_size_t(0, len(curvas), 1, 0)]
+
+    for tag, name in enumerate(curvas, start=1):
+        nodos   = points[np.unique(markers[name])]
+        bbox    = np.concatenate((nodos.min(axis=0), [0.],
+                                  nodos.max(axis=0), [0.]))
+        data.append(struct.pack('<i', tag) + bbox.astype('<f8').tobytes()
+                    + _size_t(1) + struct.pack('<i', tag) + _size_t(0))
+
+    bbox = np.concatenate((points.min(axis=0), [0.], points.max(axis=0), [0.]))
+    data.append(struct.pack('<i', 1) + bbox.astype('<f8').tobytes()
+                + _size_t(1) + struct.pack('<i', len(curvas) + 1)
+                + _size_t(len(curvas))
+                + np.arange(1, len(curvas) + 1, dtype='<i4').tobytes())
+
+    return b''.join(data)
+
+def to_gmsh(mesh, filename):
+    '''
+    Convierte malla de formato propio a formato MSH 4.1 binario de gmsh
+    Para mallas tipo O y C, con perfil solo o con flap
+
+    Se crean grupos fisicos para cada frontera (airfoil, flap, farfield) y
+        para el dominio (fluid). Todos los nodos se asocian a la superficie
+    ...
+
+    Parametros
+    ----------
+    mesh : mesh
+        Objeto mesh_O o mesh_C
+    filename : str
+        nombre del archivo en el cual se exportara la malla.
+        Debe incluir el path (relativo o absoluto)
+
+    Return
+    ------
+    None
+    '''
+
+    (points, _, elems, markers) = connectivity(mesh)
+    NPOIN   = np.shape(points)[0]
+    curvas  = list(markers.keys())
+
+    with open(filename, 'wb') as msh:
+        msh.write(b'$MeshFormat\n4.1 1 8\n')
+        msh.write(struct.pack('<i', 1))
+        msh.write(b'\n$EndMeshFormat\n')
+
+        # grupos fisicos: fronteras (dim 1) y dominio (dim 2)
+        msh.write(b'$PhysicalNames\n' + str(len(curvas) + 1).encode() + b'\n')
+        for tag, name in enumerate(curvas, start=1):
+            msh.write('1 {} "{}"\n'.format(tag, name).encode())
+        msh.write('2 {} "fluid"\n'.format(len(curvas) + 1).encode())
+        msh.write(b'$EndPhysicalNames\n')
+
+        msh.write(b'$Entities\n')
+        msh.write(_entities(points, markers))
+        msh.write(b'\n$EndEntities\n')
+
+        # nodos, un solo bloque en la superficie
+        coords          = np.zeros((NPOIN, 3), dtype='<f8')
+        coords[:, :2]   = points
+        msh.write(b'$Nodes\n')
+        msh.write(_size_t(1, NPOIN, 1, NPOIN))
+        msh.write(struct.pack('<iii', 2, 1, 0) + _size_t(NPOIN))
+        msh.write(np.arange(1, NPOIN + 1, dtype='<u8').tobytes())
+        msh.write(coords.tobytes())
+        msh.write(b'\n$EndNodes\n')
+
+        # elementos, un bloque por curva y uno para los cuadrilateros
+        bloques = [(1, tag, LINE, markers[name])
+                   for tag, name in enumerate(curvas, start=1)]
+        bloques.append((2, 1, QUAD, elems))
+        NELEM   = sum(np.shape(b[3])[0] for b in bloques)
+        msh.write(b'$Elements\n')
+        msh.write(_size_t(len(bloques), NELEM, 1, NELEM))
+        tag = 1
+        for (dim, entidad, tipo, nodos) in bloques:
+            n       = np.shape(nodos)[0]
+            block   = np.empty((n, np.shape(nodos)[1] + 1), dtype='<u8')
+            block[:, 0]     = np.arange(tag, tag + n)
+            block[:, 1:]    = nodos + 1
+            msh.write(struct.pack('<iii', dim, entidad, tipo) + _size_t(n))
+            msh.write(block.tobytes())
+            tag += n
+        msh.write(b'\n$EndElements\n')
+
+    return
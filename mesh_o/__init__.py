@@ -13,7 +13,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 from mesh import mesh
+from mesh.mesh_metric import _tensor
 import mesh_su2
+import mesh_gmsh
 import sys
 
 np.set_printoptions(threshold=np.sys.maxsize)
@@ -55,8 +57,13 @@ class mesh_O(mesh):
                     aa=0, cc=0, linea_eta=0):
         Genera la malla mediante la solucion de la ecuacion de Poisson
         Utiliza la libreria numba para acelerar la ejecucion
+    redistribute(weight, smooth=2, it_max=5000, error=1e-6):
+        Redistribuye los nodos en xi para equidistribuir una funcion de peso
+        en el perfil
     to_su2(filename):
         Convierte la malla a formato de SU2
+    to_gmsh(filename):
+        Convierte la malla a formato de gmsh (MSH 4.1 binario)
     """
 
     def __init__(self, R, N, airfoil, from_file=False):
@@ -68,6 +75,7 @@ class mesh_O(mesh):
     # importación de métodos de vectorizado y con librería numba
     from .mesh_o_poisson_performance import gen_Poisson_v_, gen_Poisson_n
     from .mesh_o_laplace_performance import gen_Laplace_v_, gen_Laplace_n
+    from .mesh_o_adapt import redistribute
 
     def fronteras(self, airfoil_x, airfoil_y):
         """
@@ -841,52 +849,7 @@ class mesh_O(mesh):
                 y_eta
         '''
 
-        # se definen vairables de la malla
-        X       = self.X
-        Y       = self.Y
-        M       = self.M
-        N       = self.N
-        d_xi    = self.d_xi
-        d_eta   = self.d_eta
-
-        x_xi    = np.zeros((M, N))
-        x_eta   = np.zeros((M, N))
-        y_xi    = np.zeros((M, N))
-        y_eta   = np.zeros((M, N))
-
-        # cálculo de derivadas parciales
-        # nodos internos
-        x_eta[:-1, 1:-1] = (X[:-1, 2:] - X[:-1, :-2]) / 2 / d_eta
-        y_eta[:-1, 1:-1] = (Y[:-1, 2:] - Y[:-1, :-2]) / 2 / d_eta
-
-        x_eta[:-1, 0]   = (X[:-1, 1] - X[:-1, 0]) / d_eta
-        x_eta[:-1, -1]  = (X[:-1, -1] - X[:-1, -2]) / d_eta
-        x_eta[-1, :]    = x_eta[0, :]
-        y_eta[:-1, 0]   = (Y[:-1, 1] - Y[:-1, 0]) / d_eta
-        y_eta[:-1, -1]  = (Y[:-1, -1] - Y[:-1, -2]) / d_eta
-        y_eta[-1, :]    = y_eta[0, :]
-
-        x_xi[1:-1, :] = (X[2:, :] - X[:-2, :]) / 2 / d_xi
-        y_xi[1:-1, :] = (Y[2:, :] - Y[:-2, :]) / 2 / d_xi
-        x_xi[0, :]  = (X[1, :] - X[-2, :]) / 2 / d_xi
-        y_xi[0, :]  = (Y[1, :] - Y[-2, :]) / 2 / d_xi
-        x_xi[-1, :] = x_xi[0, :]
-        y_xi[-1, :] = y_xi[0, :]
-
-        # obteniendo los tensores de la métrica
-        J       = (x_xi * y_eta) - (x_eta * y_xi)
-        g11I    = x_xi ** 2 + y_xi ** 2
-        g12I    = x_xi * x_eta + y_xi * y_eta
-        g22I    = x_eta ** 2 + y_eta ** 2
-        g11     = g22I / J ** 2
-        g12     = -g12I / J ** 2
-        g22     = g11I / J ** 2
-
-        C1      = g11I
-        A       = g22I
-        B       = g12I
-
-        return (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, A, B, C1)
+        return _tensor(self.X, self.Y, self.d_xi, self.d_eta, periodic=True)
 
     def to_su2(self, filename):
         """
@@ -910,3 +873,23 @@ class mesh_O(mesh):
             mesh_su2.to_su2_mesh_o_airfoil_n_flap(self, filename)
 
         return
+
+    def to_gmsh(self, filename):
+        """
+        Exporta la malla a un archivo binario en formato MSH 4.1 de gmsh.
+        ...
+
+        Parametros
+        ----------
+        filename : str
+            nombre del archivo en el cual se exportara la malla.
+            Debe incluir el path (relativo o absoluto)
+
+        Return
+        ------
+        None
+        """
+
+        mesh_gmsh.to_gmsh(self, filename)
+
+        return
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Extiende subclase mesh_O.
+
+Redistribucion de los nodos de una malla tipo O en la direccion xi, a partir
+    de una funcion de peso definida en el perfil (adaptacion a la solucion).
+
+Equidistribucion: las nuevas posiciones de los nodos, en el espacio de
+    indices de la malla actual, son tales que la integral del peso entre dos
+    nodos consecutivos es la misma. Con un peso constante la malla no
+    cambia. Todas las lineas eta se remapean con el mismo cambio de indices
+    (splines cubicos a lo largo de xi), de modo que M x N no cambia y la
+    distribucion en eta se conserva.
+
+Despues se resuelve la ecuacion de Poisson
+        alpha (r_xixi + P r_xi) - 2 beta r_xieta + gamma (r_etaeta + Q r_eta)
+        = 0
+    con funciones de control derivadas del peso. En la malla actual se
+    calculan P0 y Q0 tales que la malla es solucion exacta de la ecuacion
+    discreta. Con el cambio de indices t(xi) la misma ecuacion en las nuevas
+    coordenadas tiene
+        P = P0(t) t' - t'' / t',    Q = Q0(t)
+    donde -t'' / t' = w' / w es el termino de equidistribucion. El generador
+    suaviza la malla remapeada y conserva la distribucion de la malla
+    original mas la del peso.
+"""
+
+import numpy as np
+from numba import jit
+from scipy.interpolate import CubicSpline
+
+
+def _equidistribucion(weight, smooth=2):
+    """
+    Posiciones de los nodos, en el espacio de indices de la malla actual,
+        que equidistribuyen el peso. weight (M, ) en los nodos, periodico
+        (weight[0] = weight[-1])
+    """
+
+    M = np.size(weight)
+    w = np.array(weight[:-1], dtype=float)
+    # suavizado periodico [1, 2, 1] / 4
+    for _ in range(smooth):
+        w = 0.25 * (np.roll(w, 1) + 2 * w + np.roll(w, -1))
+
+    # peso en cada celda (i, i + 1) e integral acumulada
+    celda       = 0.5 * (w + np.roll(w, -1))
+    acumulada   = np.concatenate(([0], np.cumsum(celda)))
+    objetivo    = np.linspace(0, acumulada[-1], M)
+
+    return np.interp(objetivo, acumulada, np.arange(M))
+
+
+def _control(X, Y):
+    """
+    Funciones de control P y Q (M, N) con las que la malla es solucion de la
+        ecuacion discreta de _gen_Poisson_tm en los nodos internos
+    """
+
+    # derivadas centrales, periodicas en xi (el nodo M-1 es el nodo 0)
+    Xp = np.concatenate((X[1:], X[1:2]))
+    Xm = np.concatenate((X[-2:-1], X[:-1]))
+    Yp = np.concatenate((Y[1:], Y[1:2]))
+    Ym = np.concatenate((Y[-2:-1], Y[:-1]))
+    s  = (slice(None), slice(1, -1))
+    n  = (slice(None), slice(2, None))
+    o  = (slice(None), slice(0, -2))
+
+    x_xi    = (Xp[s] - Xm[s]) / 2
+    y_xi    = (Yp[s] - Ym[s]) / 2
+    x_eta   = (X[n] - X[o]) / 2
+    y_eta   = (Y[n] - Y[o]) / 2
+    alpha   = x_eta ** 2 + y_eta ** 2
+    beta    = x_xi * x_eta + y_xi * y_eta
+    gamma   = x_xi ** 2 + y_xi ** 2
+    J       = x_xi * y_eta - x_eta * y_xi
+
+    Rx = - (alpha * (Xp[s] - 2 * X[s] + Xm[s])
+            + gamma * (X[n] - 2 * X[s] + X[o])
+            - beta / 2 * (Xp[n] - Xp[o] + Xm[o] - Xm[n]))
+    Ry = - (alpha * (Yp[s] - 2 * Y[s] + Ym[s])
+            + gamma * (Y[n] - 2 * Y[s] + Y[o])
+            - beta / 2 * (Yp[n] - Yp[o] + Ym[o] - Ym[n]))
+
+    P       = np.zeros(np.shape(X))
+    Q       = np.zeros(np.shape(X))
+    P[s]    = (Rx * y_eta - Ry * x_eta) / J / alpha
+    Q[s]    = (x_xi * Ry - y_xi * Rx) / J / gamma
+
+    return (P, Q)
+
+
+@jit
+def _gen_Poisson_tm(X, Y, M, N, P, Q):
+    """
+    Un barrido de Gauss-Seidel de la ecuacion de Poisson con funciones de
+        control P y Q (M, N) en cada nodo, ver _gen_Poisson_n
+    ...
+
+    Parametros
+    ----------
+    X, Y : numpy.array
+        coordenadas de la malla, se actualizan en el lugar
+    M, N : int
+        numero de nodos en xi y en eta
+    P, Q : numpy.array
+        funciones de control en xi y en eta
+
+    Return
+    ------
+    err : float64
+        maximo cambio de las coordenadas
+    """
+
+    err = 0.
+    for j in range(N-2, 0, -1):
+        for i in range(1, M):
+            ip = 1 if i == M-1 else i+1
+            x_eta = (X[i, j+1] - X[i, j-1]) / 2
+            y_eta = (Y[i, j+1] - Y[i, j-1]) / 2
+            x_xi = (X[ip, j] - X[i-1, j]) / 2
+            y_xi = (Y[ip, j] - Y[i-1, j]) / 2
+
+            alpha = x_eta ** 2 + y_eta ** 2
+            beta = x_xi * x_eta + y_xi * y_eta
+            gamma = x_xi ** 2 + y_xi ** 2
+
+            x = (alpha * (X[ip, j] + X[i-1, j] + P[i, j] * x_xi)
+                 + gamma * (X[i, j+1] + X[i, j-1] + Q[i, j] * x_eta)
+                 - beta / 2 * (X[ip, j+1] - X[ip, j-1] + X[i-1, j-1]
+                               - X[i-1, j+1])) / (2 * (alpha + gamma))
+            y = (alpha * (Y[ip, j] + Y[i-1, j] + P[i, j] * y_xi)
+                 + gamma * (Y[i, j+1] + Y[i, j-1] + Q[i, j] * y_eta)
+                 - beta / 2 * (Y[ip, j+1] - Y[ip, j-1] + Y[i-1, j-1]
+                               - Y[i-1, j+1])) / (2 * (alpha + gamma))
+            err = max(err, abs(x - X[i, j]), abs(y - Y[i, j]))
+            X[i, j] = x
+            Y[i, j] = y
+        X[0, j] = X[M-1, j]
+        Y[0, j] = Y[M-1, j]
+
+    return err
+
+
+def redistribute(self, weight, smooth=2, it_max=5000, error=1e-6):
+    """
+    Redistribuye los nodos de la malla en xi para equidistribuir una funcion
+        de peso, conservando M x N y la distribucion en eta
+    ...
+
+    Parametros
+    ----------
+    weight : numpy.array
+        funcion de peso positiva en los nodos del perfil (M, ), en la
+        orientacion de la malla. Los nodos se concentran donde el peso es
+        mayor; con un peso constante la malla no cambia
+    smooth : int
+        numero de pasadas del filtro [1, 2, 1] / 4 sobre el peso, para
+        limitar el cambio de tamaño entre celdas vecinas
+    it_max : int
+        numero maximo de barridos del generador de Poisson. 0 para solo
+        remapear las lineas eta
+    error : float64
+        cambio maximo de las coordenadas entre barridos
+
+    Return
+    ------
+    (X, Y) : (numpy.array, numpy.array)
+        coordenadas de la malla redistribuida
+    """
+
+    M       = self.M
+    N       = self.N
+    t       = _equidistribucion(weight, smooth)
+    xi      = np.arange(M)
+    (P0, Q0) = _control(self.X, self.Y)
+
+    # remapeo de las lineas eta. El perfil tiene una esquina en el borde de
+    # salida (nodos 0 y M-1), por lo que no se interpola como periodico
+    X = np.empty((M, N))
+    Y = np.empty((M, N))
+    P = np.empty((M, N))
+    Q = np.empty((M, N))
+    for j in range(N):
+        bc = 'natural' if j == 0 else 'periodic'
+        X[:, j] = CubicSpline(xi, self.X[:, j], bc_type=bc)(t)
+        Y[:, j] = CubicSpline(xi, self.Y[:, j], bc_type=bc)(t)
+        P[:, j] = np.interp(t, xi, P0[:, j])
+        Q[:, j] = np.interp(t, xi, Q0[:, j])
+    X[-1] = X[0]
+    Y[-1] = Y[0]
+
+    # funciones de control en las nuevas coordenadas
+    tp  = np.concatenate((t[1:], t[1:2] + t[-1]))
+    tm  = np.concatenate((t[-2:-1] - t[-1], t[:-1]))
+    t1  = (tp - tm) / 2
+    t2  = tp - 2 * t + tm
+    P   = P * t1[:, np.newaxis] - (t2 / t1)[:, np.newaxis]
+
+    for it in range(it_max):
+        if _gen_Poisson_tm(X, Y, M, N, P, Q) < error:
+            break
+
+    self.X = X
+    self.Y = Y
+
+    return (self.X, self.Y)
@@ -17,6 +17,9 @@ from numba import jit
 
 from mesh import mesh
 import mesh_su2
+from util.anderson import anderson
+from util.checkpoint import save_checkpoint, load_checkpoint, \
+    checkpoint_timer
 
 def gen_Poisson_v_(self, metodo='SOR', omega=1, a=0, c=0, linea_xi=0,
                 aa=0, cc=0, linea_eta=0):
@@ -236,7 +239,8 @@ def gen_Poisson_v_(self, metodo='SOR', omega=1, a=0, c=0, linea_xi=0,
 
 
 def gen_Poisson_n(self, metodo='SOR', omega=1, a=0, c=0, linea_xi=0,
-                aa=0, cc=0, linea_eta=0):
+                aa=0, cc=0, linea_eta=0, checkpoint=None, checkpoint_every=600,
+                resume=None, depth=5, tfi=True):
     """
     Resuelve la ecuacion de Poisson para generar la malla.
 
@@ -247,11 +251,11 @@ def gen_Poisson_n(self, metodo='SOR', omega=1, a=0, c=0, linea_xi=0,
     Parametros
     ----------
     metodo : str
-        Metodo iterativo de solucion. Jacobi (J), Gauss Seidel (GS) y
-        sobrerelajacion (SOR)
+        Metodo iterativo de solucion. Jacobi (J), Gauss Seidel (GS),
+        sobrerelajacion (SOR) y Gauss Seidel con aceleracion de Anderson (AA)
     omega : float64
         Valor utilizado para acelerar o suavizar la solucion. Solo se
-        utiliza si metodo == 'SOR'
+        utiliza si metodo == 'SOR' o metodo == 'AA' (amortiguamiento)
         omega < 1 ---> suaviza la solucion
         omega = 1 ---> metodod Gauss Seidel
         omega > 1 ---> acelera la solucion
@@ -265,14 +269,44 @@ def gen_Poisson_n(self, metodo='SOR', omega=1, a=0, c=0, linea_xi=0,
     linea_eta : int
         linea  en el eje eta hacia la cual se realiza el forzado.
         0 <= linea_eta <= self.N
+    checkpoint : str
+        archivo (.npz) en el que se guarda periodicamente el estado del
+        metodo iterativo: X, Y, iteracion, historial de residuos y
+        parametros del metodo. None para no guardar
+    checkpoint_every : float64
+        tiempo en segundos entre checkpoints
+    resume : str
+        checkpoint desde el cual se continua la solucion. Se utilizan los
+        parametros de esta llamada, lo que permite cambiar omega a la mitad
+        de una solucion
+    depth : int
+        numero de iteraciones anteriores utilizadas por la aceleracion de
+        Anderson, ver util.anderson. Solo se utiliza si metodo == 'AA'
+    tfi : boolean
+        aproximacion inicial por TFI. Con False se parte de la malla actual,
+        por ejemplo de una malla remapeada con resample o refine
 
     Return
     ------
     None
     """
 
-    # aproximacion inicial
-    self.gen_TFI()
+    # aproximacion inicial, o estado guardado en un checkpoint
+    it0     = 0
+    history = []
+    if resume is not None:
+        state   = load_checkpoint(resume)
+        self.X  = state['X']
+        self.Y  = state['Y']
+        it0     = state['it']
+        history = list(state['history'])
+        print('Continuando desde ' + resume + ', it = ' + str(it0))
+    elif tfi:
+        self.gen_TFI()
+    settings = {'metodo': metodo, 'omega': omega, 'a': a, 'c': c,
+                'linea_xi': linea_xi, 'aa': aa, 'cc': cc,
+                'linea_eta': linea_eta}
+    timer = checkpoint_timer(checkpoint_every)
 
     # asiganicion de variable para método
     Xn = self.X
@@ -310,12 +344,14 @@ def gen_Poisson_n(self, metodo='SOR', omega=1, a=0, c=0, linea_xi=0,
 
     mesh.it_max = 750000
     mesh.err_max = 1e-6
+    # aceleracion de Anderson, G(x) es un barrido de Gauss-Seidel
+    acel = anderson(depth, omega) if metodo == 'AA' else None
     # inicio del método iterativo, separa el metodo para perfil con y sin flap
     print(f"Generando malla tipo O.\nDimensiones M: {self.M} N: {self.N}")
     if self.airfoil_alone:
         print("Perfil")
         print("Poisson numba:")
-        for it in range(mesh.it_max):
+        for it in range(it0, mesh.it_max):
             if (it % 150e3 == 0):
                 self.X = np.copy(Xn)
                 self.Y = np.copy(Yn)
@@ -344,6 +380,13 @@ def gen_Poisson_n(self, metodo='SOR', omega=1, a=0, c=0, linea_xi=0,
             if metodo == 'SOR':
                 Xn = omega * Xn + (1 - omega) * Xo
                 Yn = omega * Yn + (1 - omega) * Yo
+            elif metodo == 'AA':
+                (Xn, Yn) = acel.update((Xo, Yo), (Xn, Yn))
+
+            history.append(max(abs(Xn - Xo).max(), abs(Yn - Yo).max()))
+            if checkpoint is not None and timer.due():
+                save_checkpoint(checkpoint, X=Xn, Y=Yn, it=it + 1,
+                                history=np.array(history), **settings)
 
             if abs(Xn -Xo).max() < mesh.err_max\
                     and abs(Yn - Yo).max() < mesh.err_max and it > 10:
@@ -353,7 +396,7 @@ def gen_Poisson_n(self, metodo='SOR', omega=1, a=0, c=0, linea_xi=0,
     else:
         print("Perfil con flap")
         print("Poisson numba:")
-        for it in range(mesh.it_max):
+        for it in range(it0, mesh.it_max):
             if (it % 650e3 == 0):
                 self.X = np.copy(Xn)
                 self.Y = np.copy(Yn)
@@ -383,8 +426,15 @@ def gen_Poisson_n(self, metodo='SOR', omega=1, a=0, c=0, linea_xi=0,
             if metodo == 'SOR':
                 Xn = omega * Xn + (1 - omega) * Xo
                 Yn = omega * Yn + (1 - omega) * Yo
+            elif metodo == 'AA':
+                (Xn, Yn) = acel.update((Xo, Yo), (Xn, Yn))
 
 
+            history.append(max(abs(Xn - Xo).max(), abs(Yn - Yo).max()))
+            if checkpoint is not None and timer.due():
+                save_checkpoint(checkpoint, X=Xn, Y=Yn, it=it + 1,
+                                history=np.array(history), **settings)
+
             if abs(Xn -Xo).max() < mesh.err_max\
                     and abs(Yn - Yo).max() < mesh.err_max:
                 print('Poisson: ' + metodo + ': saliendo...')
@@ -392,6 +442,10 @@ def gen_Poisson_n(self, metodo='SOR', omega=1, a=0, c=0, linea_xi=0,
                 break
 
 
+    if checkpoint is not None:
+        save_checkpoint(checkpoint, X=Xn, Y=Yn, it=it + 1,
+                        history=np.array(history), **settings)
+
     self.X = Xn
     self.Y = Yn
 
@@ -12,6 +12,16 @@ import numpy as np
 import matplotlib.pyplot as plt
 import time
 from .potential_performance import *
+from .potential_solver import PotentialSolver
+from .potential_c import PotentialSolverC
+from .potential_batch import solve_batch
+from .potential_adapt import adapt
+from .potential_convergence import grid_convergence, gci
+from .potential_transfer import transfer
+from .potential_panel import panel_method, panel_guess
+from .potential_superposition import superposition
+from .potential_sweep import sweep, flow_conditions
+from .potential_post import postprocess, surface
 
 def potential_flow_o(d0, H0, gamma, mach_inf, v_inf, alfa, mesh):
     """
@@ -45,83 +55,22 @@ def potential_flow_o(d0, H0, gamma, mach_inf, v_inf, alfa, mesh):
     """
 
     # se definen variables de la malla
-    X = np.copy(mesh.X)
-    Y = np.copy(mesh.Y)
     M = mesh.M
     N = mesh.N
     d_xi = mesh.d_xi
     d_eta = mesh.d_eta
 
-    # se definen matrices de valores en mallas intercaladas
-    x_xiV = np.zeros((M, N-1))
-    x_etaV = np.zeros((M, N-1))
-    y_xiV = np.zeros((M, N-1))
-    y_etaV = np.zeros((M, N-1))
-    g11V = np.zeros((M, N-1))
-    g12V = np.zeros((M, N-1))
-    g22V = np.zeros((M, N-1))
-    JV = np.zeros((M, N-1))
-
-    x_xiH = np.zeros((M-1, N))
-    x_etaH = np.zeros((M-1, N))
-    y_xiH = np.zeros((M-1, N))
-    y_etaH = np.zeros((M-1, N))
-    g11H = np.zeros((M-1, N))
-    g12H = np.zeros((M-1, N))
-    g22H = np.zeros((M-1, N))
-    JH = np.zeros((M-1, N))
-
-    mesh.X = np.flip(mesh.X)
-    mesh.Y = np.flip(mesh.Y)
-    X = np.copy(mesh.X)
-    Y = np.copy(mesh.Y)
-
-    # calculo del tensor de la métrica
-    (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, _, _, _) = mesh.tensor()
-    mesh.X = np.flip(mesh.X)
-    mesh.Y = np.flip(mesh.Y)
-
-    # cálculo de términos en mallas intercaladas promediando los valores de los
-    # nodos vecinos
-    # malla vertical
-    # for j in range(N-1):
-    #     g11V[:, j] = 0.5 * (g11[:, j] + g11[:, j+1])
-    #     g12V[:, j] = 0.5 * (g12[:, j] + g12[:, j+1])
-    #     g22V[:, j] = 0.5 * (g22[:, j] + g22[:, j+1])
-    #     JV[:, j] = 0.5 * (J[:, j] + J[:, j+1])
-    #     x_xiV[:, j] = 0.5 * (x_xi[:, j] + x_xi[:, j+1])
-    #     x_etaV[:, j] = 0.5 * (x_eta[:, j] + x_eta[:, j+1])
-    #     y_xiV[:, j] = 0.5 * (y_xi[:, j] + y_xi[:, j+1])
-    #     y_etaV[:, j] = 0.5 * (y_eta[:, j] + y_eta[:, j+1])
-
-    g11V[:, :]    = 0.5 * (g11[:, :-1] + g11[:, 1:])
-    g12V[:, :]    = 0.5 * (g12[:, :-1] + g12[:, 1:])
-    g22V[:, :]    = 0.5 * (g22[:, :-1] + g22[:, 1:])
-    JV[:, :]      = 0.5 * (J[:, :-1] + J[:, 1:])
-    x_xiV[:, :]   = 0.5 * (x_xi[:, :-1] + x_xi[:, 1:])
-    x_etaV[:, :]  = 0.5 * (x_eta[:, :-1] + x_eta[:, 1:])
-    y_xiV[:, :]   = 0.5 * (y_xi[:, :-1] + y_xi[:, 1:])
-    y_etaV[:, :]  = 0.5 * (y_eta[:, :-1] + y_eta[:, 1:])
-
-    # malla horizontal
-    # for i in range(M-1):
-    #     g11H[i, :] = 0.5 * (g11[i, :] + g11[i+1, :])
-    #     g12H[i, :] = 0.5 * (g12[i, :] + g12[i+1, :])
-    #     g22H[i, :] = 0.5 * (g22[i, :] + g22[i+1, :])
-    #     JH[i, :] = 0.5 * (J[i, :] + J[i+1, :])
-    #     x_xiH[i, :] = 0.5 * (x_xi[i, :] + x_xi[i+1, :])
-    #     x_etaH[i, :] = 0.5 * (x_eta[i, :] + x_eta[i+1, :])
-    #     y_xiH[i, :] = 0.5 * (y_xi[i, :] + y_xi[i+1, :])
-    #     y_etaH[i, :] = 0.5 * (y_eta[i, :] + y_eta[i+1, :])
-
-    g11H[:, :]    = 0.5 * (g11[:-1, :] + g11[1:, :])
-    g12H[:, :]    = 0.5 * (g12[:-1, :] + g12[1:, :])
-    g22H[:, :]    = 0.5 * (g22[:-1, :] + g22[1:, :])
-    JH[:, :]      = 0.5 * (J[:-1, :] + J[1:, :])
-    x_xiH[:, :]   = 0.5 * (x_xi[:-1, :] + x_xi[1:, :])
-    x_etaH[:, :]  = 0.5 * (x_eta[:-1, :] + x_eta[1:, :])
-    y_xiH[:, :]   = 0.5 * (y_xi[:-1, :] + y_xi[1:, :])
-    y_etaH[:, :]  = 0.5 * (y_eta[:-1, :] + y_eta[1:, :])
+    # tensor de la metrica sobre la malla invertida y valores en las mallas
+    # intercaladas (promedio de los nodos vecinos), guardados en la malla
+    metric = mesh.metric()
+    (X, Y) = metric.coords(flip=True)
+    (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, _, _, _) = \
+        metric.tensor(flip=True)
+    (V, H) = metric.staggered(flip=True)
+    (g11V, g12V, g22V, JV, x_xiV, x_etaV, y_xiV, y_etaV) = \
+        [V[k] for k in metric.CAMPOS]
+    (g11H, g12H, g22H, JH, x_xiH, x_etaH, y_xiH, y_etaH) = \
+        [H[k] for k in metric.CAMPOS]
 
     # se calcula el ángulo theta de cada nodo, resultado en ángulos absolutos
     # desde 0 hasta 2 * pi
@@ -335,84 +284,13 @@ def velocity(alfa, C, mach_inf, theta, mesh, phi, v_inf):
         Matrices X y Y que describen la malla. Actualizadas.
     """
 
-    mesh.X = np.flip(mesh.X)
-    mesh.Y = np.flip(mesh.Y)
-    theta = np.flip(theta)
-    phi = np.flip(phi)
-    M = mesh.M
-    N = mesh.N
+    from .potential_post import _velocidad
 
-    u = np.zeros((M, N))
-    v = np.zeros((M, N))
+    # se resuelve sobre la malla invertida, con el tensor guardado en la malla
+    (u, v) = _velocidad(mesh.metric(), np.flip(phi), C, alfa * np.pi / 180,
+                        mach_inf, np.flip(theta), v_inf)
 
-    # se obtiene el tensor de la malla
-    (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, _, _, _) = \
-        mesh.tensor()
-    X = np.copy(mesh.X)
-    Y = np.copy(mesh.Y)
-    mesh.X = np.flip(mesh.X)
-    mesh.Y = np.flip(mesh.Y)
-
-    # condición de frontera exterior
-    alfa = alfa * np.pi / 180
-
-    for i in range(M):
-        j = 0
-        # u[i, j] = v_inf * np.cos(alfa) + (C / 2 / np.pi)\
-        #             * (1 - mach_inf ** 2) ** 0.5\
-        #             * (1 + np.tan(theta[i, j] - alfa) ** 2)\
-        #             * (1 / (1 + (Y[i, j] / X[i, j]) ** 2))\
-        #             * (-Y[i, j] / (X[i, j]) ** 2)\
-        #             / (1 + (1 - mach_inf ** 2)\
-        #                 * np.tan(theta[i, j] - alfa) ** 2)
-        u[i, j] = v_inf * np.cos(alfa) + (C / 2 / np.pi)\
-                    * (1 - mach_inf ** 2) ** 0.5\
-                    * (1 + np.tan(theta[i, j] - alfa) ** 2)\
-                    * (1 / (1 + (Y[i, j] / X[i, j]) ** 2))\
-                    * (-Y[i, j] / X[i, j])\
-                    / (1 + (1 - mach_inf ** 2)\
-                        * np.tan(theta[i, j] - alfa) ** 2)
-        v[i, j] = v_inf * np.sin(alfa) + (C / 2 / np.pi)\
-                    * (1 - mach_inf ** 2) ** 0.5\
-                    * (1 + np.tan(theta[i, j] - alfa) ** 2)\
-                    * (1 / (1 + (Y[i, j] / X[i, j]) ** 2))\
-                    * (1 / X[i, j])\
-                    / (1 + (1 - mach_inf ** 2)\
-                        * np.tan(theta[i, j] - alfa) ** 2)
-
-    # condición nodos interiores de la malla
-    for i in range(1, M-1):
-        for j in range(1, N-1):
-            u[i, j] = (1 / J[i, j]) * (((phi[i+1, j] - phi[i-1, j]) / 2)\
-                            * y_eta[i, j] - ((phi[i, j+1] - phi[i, j-1]) / 2)\
-                            * y_xi[i, j])
-            v[i, j] = (1 / J[i, j]) * (((phi[i, j+1] - phi[i, j-1]) / 2)
-                            * x_xi[i, j] - ((phi[i+1, j] - phi[i-1, j]) / 2)
-                            * x_eta[i, j])
-
-    for j in range(1, N-1):
-        u[0, j] = (1 / J[0, j]) * (((phi[1, j] - phi[-2, j] + C) / 2)\
-                            * y_eta[0, j] - ((phi[0, j+1] - phi[0, j-1]) / 2)\
-                            * y_xi[0, j])
-        v[0, j] = (1 / J[0, j]) * (((phi[0, j+1] - phi[0, j-1]) / 2)\
-                            * x_xi[0, j] - ((phi[1, j] - phi[-2, j] + C) / 2)\
-                            * x_eta[0, j])
-
-    u[-1, :] = u[0, :]
-    v[-1, :] = v[0, :]
-
-    # condición en frontera interior
-    j = -1
-    for i in range(1, M-1):
-        u[i, j] = (((phi[i+1, j] - phi[i-1, j]) / 2) / J[i, j]) * (y_eta[i, j]
-                    + y_xi[i, j] * g12[i, j] / g22[i, j])
-        v[i, j] = - (((phi[i+1, j] - phi[i-1, j]) / 2) / J[i, j]) * (x_eta[i, j]
-                    + x_xi[i, j] * g12[i, j] / g22[i, j])
-
-    u = np.flip(u)
-    v = np.flip(v)
-
-    return (u, v)
+    return (np.flip(u), np.flip(v))
 
 def pressure(u, v, v_inf, d_inf, gamma, p_inf, p0, d0, h0):
     """
@@ -486,43 +364,24 @@ def streamlines(u, v, gamma, h0, d0, p, mesh):
         mach: numero de mach
     """
 
-    M = mesh.M
-    N = mesh.N
-    mesh.X = np.flip(mesh.X)
-    mesh.Y = np.flip(mesh.Y)
+    from .potential_post import _corriente
+
     u = np.flip(u)
     v = np.flip(v)
     p = np.flip(p)
 
-    psi = np.zeros((M, N))
-    JU = np.zeros((M, N))
-    c_ = np.zeros((M, N))
-    mach = np.zeros((M, N))
-
-    (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, _, _, _) = \
-        mesh.tensor()
-    X = np.copy(mesh.X)
-    Y = np.copy(mesh.Y)
-    mesh.X = np.flip(mesh.X)
-    mesh.Y = np.flip(mesh.Y)
+    (_, _, _, _, _, x_eta, _, y_eta, _, _, _) = \
+        mesh.metric().tensor(flip=True)
 
     d = d0 * (1 - (u ** 2 + v ** 2) / 2 / h0) ** (1 / (gamma - 1))
 
-    JU = u * y_eta - v * x_eta
-
-    for i in range(M):
-        for j in range(N-1, 0, -1):
-            psi[i, j-1] = psi[i, j] + JU[i, j] * d[i, j]
+    # integracion a lo largo de eta desde la pared
+    psi = _corriente(u, v, d, x_eta, y_eta)
 
     c_ = (gamma * p / d) ** 0.5
     mach = (u ** 2 + v ** 2) ** 0.5 / c_
 
-    psi = np.flip(psi)
-    mach = np.flip(mach)
-    u = np.flip(u)
-    v = np.flip(v)
-
-    return (psi, mach)
+    return (np.flip(psi), np.flip(mach))
 
 def lift_n_drag(mesh, cp, alfa, c):
     """
@@ -548,29 +407,10 @@ def lift_n_drag(mesh, cp, alfa, c):
         D: coeficiente de resistencia aerodinamica
     """
 
-    M = mesh.M
-    N = mesh.N
-    mesh.X = np.flip(mesh.X)
-    mesh.Y = np.flip(mesh.Y)
+    from .potential_post import _coeficientes
+
     cp = np.flip(cp)
     (_, _, _, _, x_xi, _, y_xi, _, _, _, _) = \
-        mesh.tensor()
-    mesh.X = np.flip(mesh.X)
-    mesh.Y = np.flip(mesh.Y)
-
-    alfa = alfa * np.pi / 180
-
-    kx = np.zeros((M,))
-    ky = np.zeros((M,))
-
-    kx = cp[:, -1] * y_xi[:, -1] / c
-    ky = cp[:, -1] * x_xi[:, -1] / c
-
-    xi = np.linspace(1, M, M)
-    cl_x = -np.trapz(kx, xi)
-    cl_y = np.trapz(ky, xi)
-
-    L = -cl_x * np.sin(alfa) + cl_y * np.cos(alfa)
-    D = cl_x * np.cos(alfa) + cl_y * np.sin(alfa)
+        mesh.metric().tensor(flip=True)
 
-    return (L, D)
+    return _coeficientes(cp, x_xi, y_xi, alfa * np.pi / 180, c)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Adaptacion de mallas tipo O a la solucion de flujo potencial.
+
+En cada ciclo se resuelve el flujo potencial, se construye una funcion de
+    peso en el perfil a partir del gradiente de cp o de |grad phi| y se
+    redistribuyen los nodos de la malla en xi (mesh_O.redistribute:
+    equidistribucion del peso y generador de Poisson con funciones de
+    control derivadas del peso). M x N no cambia, de modo que la succion
+    del borde de ataque se resuelve con mallas mas gruesas.
+
+La redistribucion se aplica siempre a la malla inicial. De otro modo la
+    concentracion de nodos se acumula en cada ciclo y no existe un punto
+    fijo.
+
+El peso en cada nodo de la malla inicial es
+    w = 1 + strength * (M - 1) * |dq| / sum(|dq|)
+    donde dq es la variacion de q (cp o |grad phi| / v_inf) entre nodos
+    vecinos de la malla inicial (sin las celdas del borde de salida). q se
+    calcula en la malla adaptada y se interpola a la malla inicial por
+    longitud de arco, de modo que el peso no depende de la malla en la que
+    se calcula. Con strength = 1 la mitad de los nodos se distribuye como en
+    la malla inicial y la otra mitad de acuerdo a q.
+
+El peso de cada ciclo se subrelaja con el del ciclo anterior,
+    w = w_prev + relax * (w_nuevo - w_prev), partiendo de w = 1 (malla
+    inicial). Sin subrelajacion la malla alterna entre dos distribuciones:
+    el peso calculado en una malla concentra los nodos donde la otra los
+    habia retirado, y CL y cp_min no se asientan. Los ciclos terminan
+    cuando el cambio relativo de CL y de cp_min entre dos soluciones es
+    menor que tol.
+
+La circulacion en mallas tipo O depende del tamaño de las celdas del borde
+    de salida (condicion de Kutta), por lo que CL cambia con la
+    redistribucion aun cuando la succion se resuelve mejor. Conviene revisar
+    la historia de CL entre ciclos y utilizar strength moderado.
+"""
+
+import copy
+
+import numpy as np
+
+from .potential_post import surface
+from .potential_solver import PotentialSolver
+from .potential_transfer import transfer
+
+
+def _arco(mesh):
+    """
+    Longitud de arco del perfil, normalizada, en los nodos (M, )
+    """
+
+    ds = np.hypot(np.diff(mesh.X[:, 0]), np.diff(mesh.Y[:, 0]))
+    s  = np.concatenate(([0], np.cumsum(ds)))
+
+    return s / s[-1]
+
+
+def _peso(mesh, inicial, phi, C, alfa, flow, weight, strength):
+    """
+    Funcion de peso en los nodos del perfil de la malla inicial (M, ), a
+        partir de la solucion en la malla mesh
+    """
+
+    res = surface(mesh, phi, C, alfa, flow)
+    if weight == 'cp':
+        q = res['cp']
+    elif weight == 'velocity':
+        q = np.hypot(res['u'], res['v']) / flow['v_inf']
+    else:
+        raise ValueError("weight debe ser 'cp' o 'velocity'")
+    q = np.interp(_arco(inicial), _arco(mesh), q)
+
+    # variacion de q en cada celda del perfil, repartida en sus dos nodos.
+    # En el borde de salida la velocidad es cero por construccion, por lo
+    # que no se toman en cuenta las celdas que lo tocan
+    dq      = np.abs(np.diff(q))
+    dq[[0, -1]] = 0
+    nodo    = 0.5 * (dq + np.roll(dq, 1))
+    M       = np.size(q)
+    w       = 1 + strength * (M - 1) * nodo / np.sum(dq)
+
+    return np.append(w, w[0])
+
+
+def adapt(mesh, alfa, flow, cycles=8, weight='cp', strength=0.5, smooth=2,
+          relax=0.5, tol=1e-3, mesh_it_max=5000, warm=True, report=False,
+          **kwargs):
+    """
+    Ciclos de solucion del flujo potencial y redistribucion de la malla
+    ...
+
+    Parametros
+    ----------
+    mesh : mesh_O
+        malla tipo O inicial. No se modifica, se trabaja sobre una copia
+    alfa : float64
+        angulo de ataque en grados
+    flow : dict
+        condiciones de flujo, ver flow_conditions
+    cycles : int
+        numero maximo de redistribuciones de la malla. La solucion se
+        calcula hasta cycles + 1 veces
+    weight : str
+        'cp' (gradiente de cp en el perfil) o 'velocity' (gradiente de
+        |grad phi|)
+    strength : float64
+        intensidad de la adaptacion, ver la descripcion del modulo
+    smooth : int
+        pasadas de suavizado del peso, ver mesh_O.redistribute
+    relax : float64
+        factor de subrelajacion del peso entre ciclos. 1 para utilizar solo
+        el peso de la ultima solucion
+    tol : float64
+        cambio relativo maximo de CL y de cp_min entre dos soluciones para
+        terminar los ciclos. 0 para ejecutar todos los ciclos
+    mesh_it_max : int
+        numero maximo de barridos del generador de Poisson en cada ciclo
+    warm : boolean
+        cada ciclo inicia con la solucion del ciclo anterior, interpolada a
+        la malla redistribuida (potential_transfer)
+    report : boolean
+        imprime CL y cp minimo de cada ciclo
+    kwargs :
+        argumentos de PotentialSolver.solve (omega, it_max, error,
+        accel_every, density_every, ...)
+
+    Return
+    ------
+    (mesh, phi, C, history) : (mesh_O, numpy.array, float64, list)
+        mesh: malla adaptada
+        phi, C: solucion sobre la malla adaptada, en la orientacion de la
+            malla
+        history: un dict por solucion con 'CL', 'CD', 'cp_min', 'C', 'it' y
+            'err'
+    """
+
+    inicial = mesh
+    mesh    = copy.deepcopy(inicial)
+    history = []
+    phi     = None
+    C       = 0.
+    # con peso constante la redistribucion no cambia la malla inicial
+    w       = np.ones((inicial.M, ))
+    for ciclo in range(cycles + 1):
+        solver = PotentialSolver(flow['d0'], flow['h0'], flow['gamma'],
+                                 flow['mach'], flow['v_inf'], mesh)
+        (phi, C, _, _) = solver.solve(alfa, phi=phi, C=C, **kwargs)
+        res = surface(mesh, phi, C, alfa, flow)
+        history.append({'CL': res['CL'], 'CD': res['CD'],
+                        'cp_min': np.min(res['cp']), 'C': C,
+                        'it': solver.it, 'err': solver.err})
+        if report:
+            print('ciclo = ' + str(ciclo) + ' CL = '
+                  + '{:.5f}'.format(res['CL']) + ' cp_min = '
+                  + '{:.5f}'.format(np.min(res['cp'])) + ' it = '
+                  + str(solver.it))
+        if ciclo == cycles:
+            break
+        if ciclo > 0:
+            (previo, actual) = history[-2:]
+            if abs(actual['CL'] - previo['CL']) <= tol * abs(actual['CL']) \
+                    and abs(actual['cp_min'] - previo['cp_min']) \
+                    <= tol * abs(actual['cp_min']):
+                break
+
+        w = w + relax * (_peso(mesh, inicial, phi, C, alfa, flow, weight,
+                               strength) - w)
+        previa  = mesh
+        mesh    = copy.deepcopy(inicial)
+        mesh.redistribute(w, smooth=smooth, it_max=mesh_it_max)
+        if warm:
+            (phi, C) = transfer(previa, mesh, phi, C)
+        else:
+            (phi, C) = (None, 0.)
+
+    return (mesh, phi, C, history)
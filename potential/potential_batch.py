@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Solucion simultanea de varios casos de flujo potencial (angulo de ataque y
+    numero de Mach) sobre la misma malla tipo O.
+
+phi, C y la densidad llevan una dimension adicional por caso. solve_batch
+    recibe y regresa phi como (B, M, N); dentro de las funciones compiladas
+    la dimension de los casos es la ultima (M, N, B), de modo que el ciclo
+    sobre los casos es el mas interno y contiguo en memoria: las metricas de
+    cada nodo se leen una sola vez por iteracion para todos los casos, y el
+    ciclo sobre los casos no tiene dependencias entre si. Los casos iteran
+    juntos; al converger, un caso se intercambia con el ultimo caso activo
+    y deja de iterarse. El ciclo termina cuando todos convergieron o se
+    alcanzo it_max.
+
+Cada caso sigue el mismo esquema que PotentialSolver con density_every = 1
+    (potential_kernels._solve). La mayor parte del costo de una iteracion es
+    la potencia 1 / (gamma - 1) de la densidad; con gamma = 1.4 en todos los
+    casos se calcula como r * r * sqrt(r), que se vectoriza sobre los casos,
+    por lo que el resultado difiere del solver por separado solo por
+    redondeo. Con otros valores de gamma el resultado es identico.
+"""
+
+import numpy as np
+from numba import njit
+
+from .potential_kernels import G11, G12, G22, JAC, QXX, QEE, QXE, P_, U_, \
+    V_, RHO
+from .potential_solver import PotentialSolver
+
+
+@njit
+def _intercambia(a, k, l):
+    """
+    Intercambia los casos k y l del arreglo a (..., B)
+    """
+
+    v = a.reshape((-1, a.shape[-1]))
+    for n in range(v.shape[0]):
+        (v[n, k], v[n, l]) = (v[n, l], v[n, k])
+
+    return
+
+
+@njit
+def _density_batch(phi, C, nb, metricV, metricH, workV, workH, H0,
+                   exponente, d0, IMA):
+    """
+    Terminos cruzados, velocidades y densidad en las mallas intercaladas de
+        los primeros nb casos, ver potential_kernels._density
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    g11V = metricV[G11]
+    g12V = metricV[G12]
+    g22V = metricV[G22]
+    qxxV = metricV[QXX]
+    qeeV = metricV[QEE]
+    qxeV = metricV[QXE]
+    g11H = metricH[G11]
+    g12H = metricH[G12]
+    g22H = metricH[G22]
+    qxxH = metricH[QXX]
+    qeeH = metricH[QEE]
+    qxeH = metricH[QXE]
+    PV = workV[P_]
+    UV = workV[U_]
+    VV = workV[V_]
+    rhoV = workV[RHO]
+    PH = workH[P_]
+    UH = workH[U_]
+    VH = workH[V_]
+    rhoH = workH[RHO]
+
+    # terminos cruzados, ver potential_kernels._cross_terms
+    for j in range(N-1):
+        for b in range(nb):
+            PV[0, j, b] = 0.25 * (phi[1, j+1, b] - phi[M-2, j+1, b]
+                                  + phi[1, j, b] - phi[M-2, j, b] + 2 * C[b])
+        for i in range(1, M-1):
+            for b in range(nb):
+                PV[i, j, b] = 0.25 * (phi[i+1, j+1, b] - phi[i-1, j+1, b]
+                                      + phi[i+1, j, b] - phi[i-1, j, b])
+        for b in range(nb):
+            PV[M-1, j, b] = PV[0, j, b]
+
+    for i in range(M-1):
+        for j in range(1, N-2):
+            for b in range(nb):
+                PH[i, j, b] = 0.25 * (phi[i+1, j+1, b] - phi[i+1, j-1, b]
+                                      + phi[i, j+1, b] - phi[i, j-1, b])
+
+    # con gamma = 1.4 en todos los casos la potencia 2.5 se calcula con
+    # multiplicaciones y una raiz cuadrada, que se vectorizan sobre los casos
+    aire = True
+    for b in range(nb):
+        IMA[b] = 0
+        aire = aire and abs(exponente[b] - 2.5) < 1e-12
+
+    for i in range(M):
+        for j in range(N-1):
+            for b in range(nb):
+                UV[i, j, b] = g11V[i, j] * PV[i, j, b] + g12V[i, j] \
+                    * (phi[i, j+1, b] - phi[i, j, b])
+                VV[i, j, b] = g12V[i, j] * PV[i, j, b] + g22V[i, j] \
+                    * (phi[i, j+1, b] - phi[i, j, b])
+                rho = 1 - ((UV[i, j, b]**2 * qxxV[i, j]
+                            + VV[i, j, b]**2 * qeeV[i, j]
+                            + 2 * UV[i, j, b] * VV[i, j, b] * qxeV[i, j])
+                           / 2 / H0[b])
+                IMA[b] |= rho < 0
+                r = np.abs(rho)
+                if aire:
+                    rhoV[i, j, b] = d0[b] * (r * r * np.sqrt(r))
+                else:
+                    rhoV[i, j, b] = d0[b] * r ** exponente[b]
+
+    for i in range(M-1):
+        for j in range(1, N-1):
+            for b in range(nb):
+                UH[i, j, b] = g11H[i, j] * (phi[i+1, j, b] - phi[i, j, b]) \
+                    + g12H[i, j] * PH[i, j, b]
+                VH[i, j, b] = g12H[i, j] * (phi[i+1, j, b] - phi[i, j, b]) \
+                    + g22H[i, j] * PH[i, j, b]
+                rho = 1 - ((UH[i, j, b]**2 * qxxH[i, j]
+                            + VH[i, j, b]**2 * qeeH[i, j]
+                            + 2 * UH[i, j, b] * VH[i, j, b] * qxeH[i, j])
+                           / 2 / H0[b])
+                IMA[b] |= rho < 0
+                r = np.abs(rho)
+                if aire:
+                    rhoH[i, j, b] = d0[b] * (r * r * np.sqrt(r))
+                else:
+                    rhoH[i, j, b] = d0[b] * r ** exponente[b]
+
+    return
+
+
+@njit
+def _gauss_seidel_batch(phi, C, nb, metricV, metricH, workV, workH):
+    """
+    Un barrido de Gauss-Seidel sobre los nodos internos de los primeros nb
+        casos, ver potential_kernels._gauss_seidel y _stencil
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    g11H = metricH[G11]
+    g12H = metricH[G12]
+    JH = metricH[JAC]
+    g12V = metricV[G12]
+    g22V = metricV[G22]
+    JV = metricV[JAC]
+    PV = workV[P_]
+    rhoV = workV[RHO]
+    PH = workH[P_]
+    rhoH = workH[RHO]
+
+    for i in range(M-1):
+        # en i = 0 el vecino anterior es i = M-2, con el salto C
+        im = M-2 if i == 0 else i-1
+        for j in range(1, N-1):
+            for b in range(nb):
+                salto = C[b] if i == 0 else 0.
+                nterm = rhoH[i, j, b] * JH[i, j] \
+                    * (g12H[i, j] * PH[i, j, b]
+                       + g11H[i, j] * phi[i+1, j, b]) \
+                    - rhoH[im, j, b] * JH[im, j] \
+                    * (g12H[im, j] * PH[im, j, b]
+                       - g11H[im, j] * (phi[im, j, b] - salto)) \
+                    + rhoV[i, j, b] * JV[i, j] \
+                    * (g12V[i, j] * PV[i, j, b]
+                       + g22V[i, j] * phi[i, j+1, b]) \
+                    - rhoV[i, j-1, b] * JV[i, j-1] \
+                    * (g12V[i, j-1] * PV[i, j-1, b]
+                       - g22V[i, j-1] * phi[i, j-1, b])
+                diag = rhoH[i, j, b] * JH[i, j] * g11H[i, j] \
+                    + rhoH[im, j, b] * JH[im, j] * g11H[im, j] \
+                    + rhoV[i, j, b] * JV[i, j] * g22V[i, j] \
+                    + rhoV[i, j-1, b] * JV[i, j-1] * g22V[i, j-1]
+                phi[i, j, b] = nterm / diag
+
+    return
+
+
+@njit
+def _solve_batch(phi, phi_old, X0, Y0, arcotan, v_inf, alfa, C, omega,
+                 it_max, error, H0, gamma, d0, metricV, metricH, wall, workV,
+                 workH, caso, it, err, IMA, history, nb):
+    """
+    Ciclo iterativo de varios casos a la vez, ver potential_kernels._solve
+    ...
+
+    Parametros
+    ----------
+    phi, phi_old : numpy.array
+        funcion de potencial de cada caso (M, N, B), se actualiza en el lugar,
+        y arreglo de trabajo
+    X0, Y0 : numpy.array
+        coordenadas de la frontera externa
+    arcotan : numpy.array
+        parte de la ecuacion de potencial en la frontera externa (M, B)
+    v_inf, alfa, C : numpy.array
+        velocidad de corriente libre, angulo de ataque (radianes) y
+        circulacion de cada caso (B, ). C se actualiza en el lugar
+    omega, it_max, error : float64, int, float64
+        parametros del metodo iterativo, comunes a todos los casos
+    H0, gamma, d0 : numpy.array
+        entalpia de estancamiento, relacion de calores especificos y densidad
+        de estancamiento de cada caso (B, )
+    metricV, metricH, wall : numpy.array
+        metricas en las mallas intercaladas y en la superficie, comunes a
+        todos los casos
+    workV, workH : numpy.array
+        arreglos de trabajo (4, M, N-1, B) y (4, M-1, N, B)
+    caso : numpy.array
+        numero de caso de cada posicion (B, )
+    it, err, IMA : numpy.array
+        iteraciones, error e indicador de densidad negativa de cada posicion
+        (B, )
+    history : numpy.array
+        error de cada iteracion y caso (it_max, B), por numero de caso
+    nb : int
+        numero de casos activos (las primeras nb posiciones)
+
+    Todos los arreglos por caso se reordenan en el lugar: al converger, un
+        caso se intercambia con el ultimo caso activo y deja de iterarse. Una
+        llamada posterior con el nb regresado continua la solucion.
+
+    Return
+    ------
+    (n, nb) : (int, int)
+        iteraciones del ciclo y numero de casos que no convergieron (las
+        primeras nb posiciones)
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    cos_a = np.cos(alfa)
+    sin_a = np.sin(alfa)
+    exponente = 1 / (gamma - 1)
+
+    n = 0
+    while n < it_max and nb > 0:
+        n += 1
+        for i in range(M):
+            for j in range(N):
+                for b in range(nb):
+                    phi_old[i, j, b] = phi[i, j, b]
+
+        # frontera externa, ver potential_kernels._farfield
+        for i in range(M):
+            for b in range(nb):
+                phi[i, 0, b] = v_inf[b] * (X0[i] * cos_a[b]
+                                           + Y0[i] * sin_a[b]) \
+                    + C[b] * arcotan[i, b] / 2 / np.pi
+
+        _density_batch(phi, C, nb, metricV, metricH, workV, workH, H0,
+                       exponente, d0, IMA)
+        _gauss_seidel_batch(phi, C, nb, metricV, metricH, workV, workH)
+
+        # condicion de pared y de Kutta, ver potential_kernels._wall y _kutta
+        for i in range(M-2, 0, -1):
+            for b in range(nb):
+                phi[i, N-1, b] = 1 / 3 * (4 * phi[i, N-2, b] - phi[i, N-3, b]
+                                          - wall[1, i] / wall[2, i]
+                                          * (phi[i+1, N-1, b]
+                                             - phi[i-1, N-1, b]))
+        for b in range(nb):
+            phi[0, N-1, b] = 1 / 3 * (4 * phi[0, N-2, b] - phi[0, N-3, b]
+                                      - wall[1, 0] / wall[2, 0]
+                                      * (phi[1, N-1, b] - phi[M-2, N-1, b]
+                                         + C[b]))
+        for j in range(N):
+            for b in range(nb):
+                phi[M-1, j, b] = phi[0, j, b] + C[b]
+        for b in range(nb):
+            C[b] = phi[M-2, N-1, b] - phi[1, N-1, b] - wall[1, 0] * \
+                (phi[0, N-3, b] - 4 * phi[0, N-2, b] + 3 * phi[0, N-1, b]) \
+                / wall[0, 0]
+
+        # sobrerelajacion y error
+        for b in range(nb):
+            err[b] = 0.
+        for i in range(M):
+            for j in range(N):
+                for b in range(nb):
+                    phi[i, j, b] = omega * phi[i, j, b] \
+                        + (1 - omega) * phi_old[i, j, b]
+                    dif = abs(phi[i, j, b] - phi_old[i, j, b])
+                    if dif > err[b]:
+                        err[b] = dif
+
+        # los casos que convergen se mueven al final
+        for b in range(nb-1, -1, -1):
+            it[b] += 1
+            history[n-1, caso[b]] = err[b]
+            if err[b] < error:
+                nb -= 1
+                _intercambia(phi, b, nb)
+                _intercambia(arcotan, b, nb)
+                _intercambia(workV, b, nb)
+                _intercambia(workH, b, nb)
+                _intercambia(v_inf, b, nb)
+                _intercambia(cos_a, b, nb)
+                _intercambia(sin_a, b, nb)
+                _intercambia(C, b, nb)
+                _intercambia(alfa, b, nb)
+                _intercambia(H0, b, nb)
+                _intercambia(gamma, b, nb)
+                _intercambia(exponente, b, nb)
+                _intercambia(d0, b, nb)
+                _intercambia(err, b, nb)
+                _intercambia(caso, b, nb)
+                _intercambia(it, b, nb)
+                _intercambia(IMA, b, nb)
+
+    return (n, nb)
+
+
+def solve_batch(mesh, alfas, flows, omega=0.9, it_max=600000, error=1e-6,
+                phi=None, C=None, init='zero', block=10000):
+    """
+    Resuelve la ecuacion de flujo potencial para varios casos a la vez sobre
+        la misma malla tipo O
+    ...
+
+    Parametros
+    ----------
+    mesh : mesh
+        malla tipo O
+    alfas : numpy.array
+        angulo de ataque de cada caso en grados (B, )
+    flows : list
+        condiciones de flujo de cada caso (B dict), ver flow_conditions. Un
+        solo dict se utiliza para todos los casos
+    omega, it_max, error : float64, int, float64
+        parametros del metodo iterativo, ver PotentialSolver.solve
+    phi : numpy.array
+        aproximacion inicial de la funcion de potencial (B, M, N), en la
+        orientacion de la malla. None para utilizar init
+    C : numpy.array
+        aproximacion inicial de la circulacion (B, )
+    init : str
+        aproximacion inicial de cada caso cuando phi es None, ver
+        PotentialSolver.start
+    block : int
+        iteraciones por llamada a la funcion compilada; el historial de
+        error crece por bloques en lugar de reservarse para it_max
+
+    Return
+    ------
+    results : dict
+        phi : numpy.array (B, M, N), en la orientacion de la malla
+        C, it, err : numpy.array (B, )
+        IMA, converged : numpy.array (B, ) de tipo bool
+        history : numpy.array (n, B), error de cada iteracion (NaN despues
+            de que el caso convergio)
+    """
+
+    alfas   = np.atleast_1d(np.asarray(alfas, dtype=float))
+    B       = np.size(alfas)
+    if isinstance(flows, dict):
+        flows = [flows] * B
+    if len(flows) != B:
+        raise ValueError('se requiere una condicion de flujo por caso')
+
+    M = mesh.M
+    N = mesh.N
+
+    # las metricas, el angulo theta y la aproximacion inicial se toman de
+    # un solver por caso; todos comparten el cache de metricas de la malla
+    phi_b       = np.empty((M, N, B))
+    C_b         = np.empty((B, ))
+    arcotan     = np.empty((M, B))
+    for (b, (alfa, flow)) in enumerate(zip(alfas, flows)):
+        solver = PotentialSolver(flow['d0'], flow['h0'], flow['gamma'],
+                                 flow['mach'], flow['v_inf'], mesh)
+        solver.start(alfa, None if phi is None else phi[b],
+                     0 if C is None else C[b], init=init)
+        phi_b[:, :, b]  = solver.phi
+        C_b[b]          = solver.C
+        arcotan[:, b]   = solver.arcotan
+
+    v_inf   = np.array([flow['v_inf'] for flow in flows], dtype=float)
+    H0      = np.array([flow['h0'] for flow in flows], dtype=float)
+    gamma   = np.array([flow['gamma'] for flow in flows], dtype=float)
+    d0      = np.array([flow['d0'] for flow in flows], dtype=float)
+
+    caso    = np.arange(B)
+    it      = np.zeros((B, ), dtype=np.int64)
+    err     = np.zeros((B, ))
+    IMA     = np.zeros((B, ), dtype=np.int64)
+    alfa_r  = alfas * np.pi / 180
+    phi_old = np.empty_like(phi_b)
+    workV   = np.zeros((4, M, N-1, B))
+    workH   = np.zeros((4, M-1, N, B))
+
+    # el historial crece por bloques, igual que en PotentialSolver.solve
+    historias   = [np.empty((0, B))]
+    n           = 0
+    nb          = B
+    while n < it_max and nb > 0:
+        history = np.full((min(block, it_max - n), B), np.nan)
+        (k, nb) = _solve_batch(phi_b, phi_old, solver.X[:, 0],
+                               solver.Y[:, 0], arcotan, v_inf, alfa_r, C_b,
+                               omega, history.shape[0], error, H0, gamma, d0,
+                               solver.metricV, solver.metricH, solver.wall,
+                               workV, workH, caso, it, err, IMA, history, nb)
+        historias.append(history[:k])
+        n += k
+
+    # orden original de los casos
+    orden       = np.argsort(caso)
+    converged   = np.arange(B) >= nb
+
+    return {'phi': np.moveaxis(np.flip(phi_b[:, :, orden], axis=(0, 1)), 2,
+                               0).copy(),
+            'C': C_b[orden], 'it': it[orden], 'err': err[orden],
+            'IMA': IMA[orden].astype(bool), 'converged': converged[orden],
+            'history': np.concatenate(historias)}
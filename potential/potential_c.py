@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Solver de flujo potencial para mallas tipo C.
+
+La malla se utiliza en su orientacion: j = 0 es la frontera interna (estela
+    inferior, perfil y estela superior) y j = N-1 la frontera externa. Los
+    nodos de la estela inferior i y superior M-1-i son el mismo punto; el
+    potencial es discontinuo a traves de la estela:
+        phi[M-1-i, 0] = phi[i, 0] - C,   i = 0 .. i_te
+    donde i_te es el borde de salida del lado inferior. Solo los nodos de la
+    estela inferior son incognitas; su vecino j - 1 es el nodo (M-1-i, 1)
+    del otro lado de la estela, mas C. La cara intercalada entre ambos es la
+    cara vertical (M-1-i, 0), con las derivadas en xi y eta con signo
+    contrario (los tensores g11, g12, g22 y J no cambian).
+
+Las fronteras j = N-1, i = 0 e i = M-1 son de tipo Dirichlet (corriente libre
+    mas vortice, igual que en mallas tipo O). En el perfil la condicion de
+    pared se impone en forma conservativa: cada nodo de la superficie es el
+    centro de media celda cuyo flujo a traves del perfil es nulo, y se
+    actualiza en el mismo barrido que los nodos internos. Una actualizacion
+    explicita con diferencias de un solo lado amplifica el modo par-impar
+    cuando las celdas cercanas al borde de salida son altas y muy oblicuas.
+    El borde de salida del lado inferior i_te se resuelve con el corte de la
+    estela mas la mitad de las caras de la superficie inferior y superior.
+    La condicion de Kutta iguala la velocidad tangencial de las primeras
+    celdas de la superficie inferior y superior.
+
+Se resuelve el mismo esquema conservativo que PotentialSolver (mallas
+    intercaladas, densidad retrasada una iteracion y sobrerelajacion), de
+    modo que postprocess y surface se aplican igual a ambos tipos de malla.
+"""
+
+import numpy as np
+from numba import njit
+
+from mesh.mesh_resample import _borde_de_salida
+
+from .potential_circulation import aitken_kutta
+from .potential_kernels import G11, G12, G22, JAC, QXX, QEE, QXE, P_, U_, \
+    V_, RHO, _stencil
+from .potential_solver import _arcotan
+
+
+def _metricas_c(mesh):
+    """
+    Tensor metrico de una malla tipo C, con las derivadas en eta de los
+        nodos de la estela y del borde de salida centradas a traves del corte
+    ...
+
+    Return
+    ------
+    (i_te, g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta) : (int, numpy.array)
+    """
+
+    metric  = mesh.metric()
+    (X, Y)  = metric.coords()
+    (_, _, _, _, x_xi, x_eta, y_xi, y_eta, _, _, _) = metric.tensor()
+    M       = mesh.M
+    i_te    = _borde_de_salida(X, Y)
+
+    x_eta   = np.copy(x_eta)
+    y_eta   = np.copy(y_eta)
+    i       = np.arange(i_te + 1)
+    k       = M - 1 - i
+    x_eta[i, 0] = (X[i, 1] - X[k, 1]) / 2 / mesh.d_eta
+    y_eta[i, 0] = (Y[i, 1] - Y[k, 1]) / 2 / mesh.d_eta
+    x_eta[k, 0] = - x_eta[i, 0]
+    y_eta[k, 0] = - y_eta[i, 0]
+
+    J       = (x_xi * y_eta) - (x_eta * y_xi)
+    g11     = (x_eta ** 2 + y_eta ** 2) / J ** 2
+    g12     = - (x_xi * x_eta + y_xi * y_eta) / J ** 2
+    g22     = (x_xi ** 2 + y_xi ** 2) / J ** 2
+
+    return (i_te, g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta)
+
+
+def _theta_c(X, Y, i_te):
+    """
+    Angulo de cada nodo, desde 0 hasta 2 * pi, con el corte sobre la estela:
+        2 * pi en la estela inferior y 0 en la superior
+    """
+
+    M       = np.shape(X)[0]
+    theta   = np.arctan2(Y, X)
+    theta[theta < 0] += 2 * np.pi
+    theta[:i_te + 1, 0]     = 2 * np.pi
+    theta[M-1-i_te:, 0]     = 0
+
+    return theta
+
+
+@njit
+def _farfield_c(phi, bi, bj, xb, yb, arcotan, v_inf, cos_a, sin_a, C):
+    """
+    Función potencial en las fronteras de tipo Dirichlet ec 4.18
+    """
+
+    for k in range(bi.shape[0]):
+        phi[bi[k], bj[k]] = v_inf * (xb[k] * cos_a + yb[k] * sin_a) \
+            + C * arcotan[k] / 2 / np.pi
+
+    return
+
+
+@njit
+def _density_c(phi, C, i_te, metricV, metricH, workV, workH, H0, gamma, d0):
+    """
+    Terminos cruzados, velocidades y densidad en las mallas intercaladas.
+        En la estela inferior (j = 0) el vecino j - 1 es el nodo del otro
+        lado del corte. Regresa IMA = 1 si la densidad es negativa en algun
+        nodo
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    PV = workV[P_]
+    UV = workV[U_]
+    VV = workV[V_]
+    rhoV = workV[RHO]
+    PH = workH[P_]
+    UH = workH[U_]
+    VH = workH[V_]
+    rhoH = workH[RHO]
+    exponente = 1 / (gamma - 1)
+
+    # terminos cruzados, diferencias de un solo lado en las fronteras
+    for j in range(N-1):
+        PV[0, j] = 0.5 * (phi[1, j+1] - phi[0, j+1] + phi[1, j] - phi[0, j])
+        for i in range(1, M-1):
+            PV[i, j] = 0.25 * (phi[i+1, j+1] - phi[i-1, j+1]
+                               + phi[i+1, j] - phi[i-1, j])
+        PV[M-1, j] = 0.5 * (phi[M-1, j+1] - phi[M-2, j+1]
+                            + phi[M-1, j] - phi[M-2, j])
+
+    for i in range(M-1):
+        if i < i_te:
+            PH[i, 0] = 0.25 * (phi[i+1, 1] - phi[M-2-i, 1] - C
+                               + phi[i, 1] - phi[M-1-i, 1] - C)
+        else:
+            PH[i, 0] = 0.5 * (phi[i+1, 1] - phi[i+1, 0]
+                              + phi[i, 1] - phi[i, 0])
+        for j in range(1, N-1):
+            PH[i, j] = 0.25 * (phi[i+1, j+1] - phi[i+1, j-1]
+                               + phi[i, j+1] - phi[i, j-1])
+        PH[i, N-1] = 0.5 * (phi[i+1, N-1] - phi[i+1, N-2]
+                            + phi[i, N-1] - phi[i, N-2])
+
+    IMA = 0
+    for i in range(M):
+        for j in range(N-1):
+            UV[i, j] = metricV[G11, i, j] * PV[i, j] + metricV[G12, i, j] \
+                * (phi[i, j+1] - phi[i, j])
+            VV[i, j] = metricV[G12, i, j] * PV[i, j] + metricV[G22, i, j] \
+                * (phi[i, j+1] - phi[i, j])
+            rho = 1 - ((UV[i, j]**2 * metricV[QXX, i, j]
+                        + VV[i, j]**2 * metricV[QEE, i, j]
+                        + 2 * UV[i, j] * VV[i, j] * metricV[QXE, i, j])
+                       / 2 / H0)
+            if rho < 0:
+                IMA = 1
+            rhoV[i, j] = d0 * np.abs(rho) ** exponente
+
+    for i in range(M-1):
+        for j in range(N):
+            UH[i, j] = metricH[G11, i, j] * (phi[i+1, j] - phi[i, j]) \
+                + metricH[G12, i, j] * PH[i, j]
+            VH[i, j] = metricH[G12, i, j] * (phi[i+1, j] - phi[i, j]) \
+                + metricH[G22, i, j] * PH[i, j]
+            rho = 1 - ((UH[i, j]**2 * metricH[QXX, i, j]
+                        + VH[i, j]**2 * metricH[QEE, i, j]
+                        + 2 * UH[i, j] * VH[i, j] * metricH[QXE, i, j])
+                       / 2 / H0)
+            if rho < 0:
+                IMA = 1
+            rhoH[i, j] = d0 * np.abs(rho) ** exponente
+
+    return IMA
+
+
+@njit
+def _gauss_seidel_c(phi, C, i_te, metricV, metricH, workV, workH):
+    """
+    Un barrido de Gauss-Seidel sobre los nodos internos, los nodos de la
+        estela inferior, el borde de salida y la superficie del perfil. La
+        estela superior se actualiza con la discontinuidad C
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    g11H = metricH[G11]
+    g12H = metricH[G12]
+    JH = metricH[JAC]
+    g12V = metricV[G12]
+    g22V = metricV[G22]
+    JV = metricV[JAC]
+    PV = workV[P_]
+    rhoV = workV[RHO]
+    PH = workH[P_]
+    rhoH = workH[RHO]
+
+    for i in range(1, M-1):
+        if i <= i_te:
+            # cara vertical del otro lado del corte, derivadas con signo
+            # contrario
+            k = M-1-i
+            nterm = rhoH[i, 0] * JH[i, 0] \
+                * (g12H[i, 0] * PH[i, 0] + g11H[i, 0] * phi[i+1, 0]) \
+                - rhoH[i-1, 0] * JH[i-1, 0] \
+                * (g12H[i-1, 0] * PH[i-1, 0] - g11H[i-1, 0] * phi[i-1, 0]) \
+                + rhoV[i, 0] * JV[i, 0] \
+                * (g12V[i, 0] * PV[i, 0] + g22V[i, 0] * phi[i, 1]) \
+                + rhoV[k, 0] * JV[k, 0] \
+                * (g12V[k, 0] * PV[k, 0] + g22V[k, 0] * (phi[k, 1] + C))
+            diag = rhoH[i, 0] * JH[i, 0] * g11H[i, 0] \
+                + rhoH[i-1, 0] * JH[i-1, 0] * g11H[i-1, 0] \
+                + rhoV[i, 0] * JV[i, 0] * g22V[i, 0] \
+                + rhoV[k, 0] * JV[k, 0] * g22V[k, 0]
+            if i == i_te:
+                # borde de salida: mitad de la cara de la superficie
+                # inferior y mitad de la cara de la superficie superior
+                nterm = nterm - 0.5 * rhoH[i, 0] * JH[i, 0] \
+                    * (g12H[i, 0] * PH[i, 0] + g11H[i, 0] * phi[i+1, 0]) \
+                    + 0.5 * rhoH[k-1, 0] * JH[k-1, 0] \
+                    * (g11H[k-1, 0] * (phi[k-1, 0] + C)
+                       - g12H[k-1, 0] * PH[k-1, 0])
+                diag = diag - 0.5 * rhoH[i, 0] * JH[i, 0] * g11H[i, 0] \
+                    + 0.5 * rhoH[k-1, 0] * JH[k-1, 0] * g11H[k-1, 0]
+            phi[i, 0] = nterm / diag
+            phi[k, 0] = phi[i, 0] - C
+        elif i < M-1-i_te:
+            # superficie del perfil: media celda con flujo nulo a traves de
+            # la pared
+            nterm = 0.5 * rhoH[i, 0] * JH[i, 0] \
+                * (g12H[i, 0] * PH[i, 0] + g11H[i, 0] * phi[i+1, 0]) \
+                - 0.5 * rhoH[i-1, 0] * JH[i-1, 0] \
+                * (g12H[i-1, 0] * PH[i-1, 0] - g11H[i-1, 0] * phi[i-1, 0]) \
+                + rhoV[i, 0] * JV[i, 0] \
+                * (g12V[i, 0] * PV[i, 0] + g22V[i, 0] * phi[i, 1])
+            diag = 0.5 * rhoH[i, 0] * JH[i, 0] * g11H[i, 0] \
+                + 0.5 * rhoH[i-1, 0] * JH[i-1, 0] * g11H[i-1, 0] \
+                + rhoV[i, 0] * JV[i, 0] * g22V[i, 0]
+            phi[i, 0] = nterm / diag
+        for j in range(1, N-1):
+            (nterm, diag) = _stencil(phi, i, j, i-1, 0., metricV, metricH,
+                                     workV, workH)
+            phi[i, j] = nterm / diag
+
+    return
+
+
+@njit
+def _kutta_c(phi, i_te, te):
+    """
+    Cálculo de la Circulación, condicion de Kutta: la velocidad tangencial
+        en la primera celda de la superficie superior es igual a la de la
+        primera celda de la superficie inferior. te = d_sup / d_inf
+    """
+
+    M = phi.shape[0]
+
+    return phi[i_te, 0] - phi[M-2-i_te, 0] \
+        - te * (phi[i_te, 0] - phi[i_te+1, 0])
+
+
+@njit
+def _corte(phi, C, i_te):
+    """
+    Discontinuidad del potencial en la estela y el borde de salida
+    """
+
+    M = phi.shape[0]
+    for i in range(1, i_te + 1):
+        phi[M-1-i, 0] = phi[i, 0] - C
+
+    return
+
+
+@njit
+def _solve_c(phi, phi_old, i_te, bi, bj, xb, yb, arcotan, v_inf, alfa, C,
+             omega, it_max, error, H0, gamma, d0, metricV, metricH, te, workV,
+             workH, history):
+    """
+    Ciclo iterativo completo de la solucion de flujo potencial en mallas
+        tipo C, ver potential_kernels._solve
+    ...
+
+    Return
+    ------
+    (C, it, err, IMA) : float64, int, float64, int
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    cos_a = np.cos(alfa)
+    sin_a = np.sin(alfa)
+
+    err = 0.
+    IMA = 0
+    it = 0
+    while it < it_max:
+        it += 1
+        for i in range(M):
+            for j in range(N):
+                phi_old[i, j] = phi[i, j]
+
+        _farfield_c(phi, bi, bj, xb, yb, arcotan, v_inf, cos_a, sin_a, C)
+        IMA = _density_c(phi, C, i_te, metricV, metricH, workV, workH, H0,
+                         gamma, d0)
+        _gauss_seidel_c(phi, C, i_te, metricV, metricH, workV, workH)
+        C = _kutta_c(phi, i_te, te)
+        _corte(phi, C, i_te)
+
+        # sobrerelajacion y error
+        err = 0.
+        for i in range(M):
+            for j in range(N):
+                phi[i, j] = omega * phi[i, j] + (1 - omega) * phi_old[i, j]
+        _corte(phi, C, i_te)
+        for i in range(M):
+            for j in range(N):
+                dif = abs(phi[i, j] - phi_old[i, j])
+                if dif > err:
+                    err = dif
+        history[it-1] = err
+
+        # err es nan si la solucion diverge
+        if err < error or not err < np.inf:
+            break
+
+    return (C, it, err, IMA)
+
+
+class PotentialSolverC(object):
+    """
+    Solver de la ecuacion de flujo potencial para mallas tipo C
+    ...
+
+    Atributos
+    ----------
+    d0, H0, gamma, mach_inf, v_inf : float64
+        condiciones de flujo, ver PotentialSolver
+    mesh : mesh_C
+        malla tipo C con un solo perfil
+    i_te : int
+        indice del borde de salida en el lado inferior de la frontera interna
+    metricV, metricH : numpy.array
+        metricas en las mallas intercaladas vertical (7, M, N-1) y horizontal
+        (7, M-1, N), en el mismo orden que PotentialSolver
+    te : float64
+        relacion entre la longitud de la primera celda de la superficie
+        superior y la de la superficie inferior (condicion de Kutta)
+    theta : numpy.array
+        angulo entre el eje X y todos los nodos de la malla, con el corte
+        sobre la estela
+    phi, C, IMA, it, err, history, aitken :
+        estado de la solucion actual, ver PotentialSolver
+    status : str
+        estado de la ultima llamada a solve: 'converged', 'it_max' o
+        'aborted' (la solucion diverge)
+
+    Metodos
+    -------
+    start(alfa, phi=None, C=0):
+        Inicia una solucion para un angulo de ataque
+    run(k, omega=0.9, error=1e-6):
+        Ejecuta hasta k iteraciones desde el estado actual
+    solve(alfa, omega=0.9, it_max=600000, error=1e-6, phi=None, C=0,
+          report_every=0, accel_every=0, tol_C=0., tol_CL=0.):
+        Resuelve el flujo potencial para un angulo de ataque
+    """
+
+    def __init__(self, d0, H0, gamma, mach_inf, v_inf, mesh):
+        self.d0         = d0
+        self.H0         = H0
+        self.gamma      = gamma
+        self.mach_inf   = mach_inf
+        self.v_inf      = v_inf
+        self.mesh       = mesh
+        self.alfa       = 0
+        self.C          = 0.
+        self.IMA        = 0
+        self.it         = 0
+        self.err        = 0
+        self.history    = np.zeros((0, ))
+        self.aitken     = None
+        self.status     = None
+
+        M = mesh.M
+        N = mesh.N
+        (self.X, self.Y) = mesh.metric().coords()
+        (self.i_te, g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta) = \
+            _metricas_c(mesh)
+        i_te = self.i_te
+
+        # metricas en mallas intercaladas: la derivada normal a la cara es
+        # la diferencia entre los nodos de la cara y la otra el promedio de
+        # los nodos vecinos. Las lineas eta de la malla cambian de direccion
+        # en la estela, por lo que el promedio de las metricas de los nodos
+        # no conserva la corriente libre
+        (X, Y) = (self.X, self.Y)
+        (d_xi, d_eta) = (mesh.d_xi, mesh.d_eta)
+        caras = ((0.5 * (x_xi[:, :-1] + x_xi[:, 1:]),
+                  np.diff(X, axis=1) / d_eta,
+                  0.5 * (y_xi[:, :-1] + y_xi[:, 1:]),
+                  np.diff(Y, axis=1) / d_eta),
+                 (np.diff(X, axis=0) / d_xi,
+                  0.5 * (x_eta[:-1] + x_eta[1:]),
+                  np.diff(Y, axis=0) / d_xi,
+                  0.5 * (y_eta[:-1] + y_eta[1:])))
+        self.metricV = np.empty((7, M, N-1))
+        self.metricH = np.empty((7, M-1, N))
+        for (metric, (xx, xe, yx, ye)) in zip((self.metricV, self.metricH),
+                                              caras):
+            jac = xx * ye - xe * yx
+            metric[G11] = (xe ** 2 + ye ** 2) / jac ** 2
+            metric[G12] = - (xx * xe + yx * ye) / jac ** 2
+            metric[G22] = (xx ** 2 + yx ** 2) / jac ** 2
+            metric[JAC] = jac
+            metric[QXX] = xx ** 2 + yx ** 2
+            metric[QEE] = xe ** 2 + ye ** 2
+            metric[QXE] = xx * xe + yx * ye
+
+        # longitud de las primeras celdas de la superficie inferior y
+        # superior a partir del borde de salida
+        d_inf   = np.hypot(self.X[i_te+1, 0] - self.X[i_te, 0],
+                           self.Y[i_te+1, 0] - self.Y[i_te, 0])
+        d_sup   = np.hypot(self.X[M-1-i_te, 0] - self.X[M-2-i_te, 0],
+                           self.Y[M-1-i_te, 0] - self.Y[M-2-i_te, 0])
+        self.te = d_sup / d_inf
+
+        # fronteras de tipo Dirichlet: frontera externa, salida inferior y
+        # salida superior
+        (bi, bj) = np.nonzero(np.pad(np.zeros((M-2, N-1), dtype=bool),
+                                     ((1, 1), (0, 1)), constant_values=True))
+        self.bi     = bi
+        self.bj     = bj
+        self.theta  = _theta_c(self.X, self.Y, i_te)
+
+        # cuerda del perfil
+        perfil      = self.X[i_te:M-i_te, 0]
+        self.c      = np.max(perfil) - np.min(perfil)
+
+        # arreglos de trabajo
+        self.workV  = np.zeros((4, M, N-1))
+        self.workH  = np.zeros((4, M-1, N))
+        self.phi    = np.zeros((M, N))
+        self.phi_old = np.zeros((M, N))
+
+        return
+
+    def start(self, alfa, phi=None, C=0):
+        """
+        Inicia una solucion: angulo de ataque, aproximacion inicial de la
+            funcion de potencial y de la circulacion
+        ...
+
+        Parametros
+        ----------
+        alfa : float64
+            angulo de ataque en grados
+        phi : numpy.array
+            aproximacion inicial de la funcion de potencial (M, N). None para
+            iniciar con la corriente libre mas un vortice de circulacion C
+        C : float64
+            aproximacion inicial de la circulacion
+
+        Return
+        ------
+        None
+        """
+
+        alfa_r          = alfa * np.pi / 180
+        self.alfa       = alfa
+        self.arcotan    = _arcotan(self.theta[self.bi, self.bj], alfa_r,
+                                   self.mach_inf)
+        self.C          = float(C)
+        self.IMA        = 0
+        self.it         = 0
+        self.err        = 0
+        self.history    = np.zeros((0, ))
+        self.status     = None
+
+        if phi is None:
+            self.phi[:, :] = self.v_inf * (self.X * np.cos(alfa_r)
+                                           + self.Y * np.sin(alfa_r)) \
+                + self.C * self.theta / 2 / np.pi
+        else:
+            self.phi[:, :] = phi
+
+        return
+
+    def _run(self, k, omega, error):
+        """
+        Ejecuta hasta k iteraciones sobre el estado actual. Regresa el
+            historial de error de las iteraciones ejecutadas
+        """
+
+        history = np.empty((k, ))
+        (self.C, n, self.err, self.IMA) = _solve_c(
+                        self.phi, self.phi_old, self.i_te, self.bi, self.bj,
+                        self.X[self.bi, self.bj], self.Y[self.bi, self.bj],
+                        self.arcotan, self.v_inf, self.alfa * np.pi / 180,
+                        self.C, omega, k, error, self.H0, self.gamma, self.d0,
+                        self.metricV, self.metricH, self.te, self.workV,
+                        self.workH, history)
+        self.it += n
+
+        return history[:n]
+
+    def run(self, k, omega=0.9, error=1e-6):
+        """
+        Ejecuta hasta k iteraciones (o hasta alcanzar la tolerancia) a partir
+            del estado actual. Se debe llamar antes a start
+        ...
+
+        Parametros
+        ----------
+        k : int
+            numero maximo de iteraciones
+        omega : float64
+            factor de sobrerelajacion
+        error : float64
+            error maximo permitido entre iteraciones
+
+        Return
+        ------
+        (phi, C, IMA, history) : (numpy.array, float64, int, numpy.array)
+        """
+
+        history         = self._run(k, omega, error)
+        self.history    = np.concatenate((self.history, history))
+
+        return (self.phi.copy(), self.C, self.IMA, history)
+
+    def solve(self, alfa, omega=0.9, it_max=600000, error=1e-6, phi=None,
+              C=0, report_every=0, accel_every=0, tol_C=0., tol_CL=0.):
+        """
+        Resuelve la ecuacion de flujo potencial
+        ...
+
+        Parametros
+        ----------
+        alfa : float64
+            angulo de ataque en grados
+        omega : float64
+            factor de sobrerelajacion
+        it_max : int
+            numero maximo de iteraciones
+        error : float64
+            error maximo permitido entre iteraciones
+        phi : numpy.array
+            aproximacion inicial de la funcion de potencial (M, N)
+        C : float64
+            aproximacion inicial de la circulacion
+        report_every : int
+            cada cuantas iteraciones se imprime el estado de la solucion.
+            0 para no imprimir
+        accel_every, tol_C, tol_CL :
+            extrapolacion de la circulacion, ver PotentialSolver.solve
+
+        Return
+        ------
+        (phi, C, theta, IMA) : (numpy.array, float64, numpy.array, int)
+            Phi: valores de la funcion de potencial en todos los nodos
+            C: circulacion alrededor del perfil
+            theta: angulo entre el eje X y todos los nodos de la malla
+            IMA: indica si la densidad es negativa en algun nodo
+        """
+
+        self.start(alfa, phi, C)
+
+        k           = report_every if report_every > 0 else it_max
+        aitken      = None
+        if accel_every > 0:
+            k       = accel_every
+            aitken  = aitken_kutta(accel_every, self.v_inf, self.c, tol_C,
+                                   tol_CL)
+            aitken.update(self.phi, self.C)
+        self.aitken = aitken
+        historias   = []
+        self.status = 'it_max'
+        while self.it < it_max:
+            historias.append(self._run(min(k, it_max - self.it), omega,
+                                       error))
+            if report_every > 0:
+                print('it =  ' + str(self.it), end=' ')
+                print('err = ' + '{0:.4e}'.format(self.err), end=' ')
+                print('C = ' + '{:.5e}'.format(self.C), end=' ')
+                print('\t', end='\r')
+            if not np.isfinite(self.err):
+                self.status = 'aborted'
+                break
+            if self.err < error:
+                self.status = 'converged'
+                break
+            if aitken is not None:
+                (self.C, converged) = aitken.update(self.phi, self.C)
+                if converged:
+                    self.status = 'converged'
+                    break
+        if report_every > 0:
+            print()
+        self.history = np.concatenate(historias)
+
+        return (self.phi.copy(), self.C, self.theta.copy(), self.IMA)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Aceleracion de la circulacion para los metodos iterativos de flujo
+    potencial (Gauss-Seidel / SOR).
+
+La circulacion C se actualiza en cada iteracion con la condicion de Kutta y
+    converge linealmente con un factor muy cercano a 1, lo que determina el
+    numero total de iteraciones. Cada k iteraciones se compara el cambio de C
+    con el del bloque anterior; cuando el factor de convergencia p se
+    estabiliza se extrapola C (y phi, con el mismo factor) al limite de la
+    serie geometrica, que es la extrapolacion delta cuadrada de Aitken sobre
+    la sucesion de bloques.
+
+El factor se considera estable cuando |p - p_anterior| < 0.1 (1 - p) se
+    cumple en dos bloques consecutivos. Solo entonces se estima el error
+    restante de C y de CL (CL = -2 C / (v_inf c), Kutta-Joukowski), que se
+    utilizan como criterio de paro; con un solo bloque el estimado puede
+    ser varios ordenes de magnitud menor que el error real. El estimado
+    solo considera el modo dominante: partiendo de la aproximacion de
+    paneles los primeros bloques pueden ser un transitorio rapido con
+    factor estable, por lo que tol_C y tol_CL son confiables partiendo de
+    cero.
+"""
+
+import numpy as np
+
+
+class aitken_kutta(object):
+    """
+    Extrapolacion de Aitken de la circulacion cada every iteraciones
+    ...
+
+    Atributos
+    ----------
+    every : int
+        numero de iteraciones de cada bloque
+    v_inf, c : float64
+        velocidad de corriente libre y cuerda, para estimar CL
+    tol_C, tol_CL : float64
+        error estimado maximo de C y de CL para considerar convergida la
+        solucion. 0 para no utilizar el criterio
+    p : float64
+        ultimo factor de convergencia estimado
+    err_C, err_CL : float64
+        error estimado de C y de CL con el ultimo factor estable
+    extrapolations : int
+        numero de extrapolaciones aplicadas
+
+    Metodos
+    -------
+    update(phi, C):
+        Se llama al final de cada bloque. Regresa la circulacion (extrapolada
+        o no) y si se cumplen los criterios de paro
+    """
+
+    def __init__(self, every, v_inf, c=1, tol_C=0., tol_CL=0.):
+        self.every          = every
+        self.v_inf          = v_inf
+        self.c              = c
+        self.tol_C          = tol_C
+        self.tol_CL         = tol_CL
+        self.p              = None
+        self.err_C          = np.inf
+        self.err_CL         = np.inf
+        self.extrapolations = 0
+        self._phi_ref       = None
+        self._C_ref         = None
+        self._dC            = None
+        self._estables      = 0
+
+        return
+
+    def update(self, phi, C):
+        """
+        Fin de un bloque de iteraciones
+        ...
+
+        Parametros
+        ----------
+        phi : numpy.array
+            funcion de potencial, se modifica en el lugar si se extrapola
+        C : float64
+            circulacion actual
+
+        Return
+        ------
+        (C, converged) : (float64, boolean)
+        """
+
+        if self._phi_ref is None:
+            self._phi_ref   = np.copy(phi)
+            self._C_ref     = C
+            return (C, False)
+
+        dC = C - self._C_ref
+        p  = None
+        if self._dC is not None and self._dC != 0:
+            p = dC / self._dC
+
+        # bloques consecutivos con el factor estable
+        if p is not None and self.p is not None and 0 < p < 1 \
+                and np.abs(p - self.p) < 0.1 * (1 - p):
+            self._estables += 1
+        else:
+            self._estables = 0
+
+        converged = False
+        if self._estables >= 2:
+            # error restante de la serie geometrica
+            self.err_C  = np.abs(dC) * p / (1 - p)
+            self.err_CL = 2 * self.err_C / (self.v_inf * self.c)
+            converged   = (self.tol_C > 0 or self.tol_CL > 0) \
+                and (self.tol_C == 0 or self.err_C <= self.tol_C) \
+                and (self.tol_CL == 0 or self.err_CL <= self.tol_CL)
+
+            if not converged:
+                f       = p / (1 - p)
+                C       = C + f * dC
+                phi    += f * (phi - self._phi_ref)
+                self.extrapolations += 1
+                # se reinicia la estimacion del factor
+                p       = None
+                dC      = None
+                self._estables = 0
+
+        self.p          = p
+        self._dC        = dC
+        self._phi_ref[:, :] = phi
+        self._C_ref     = C
+
+        return (C, converged)
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Estudio de convergencia de malla con extrapolacion de Richardson.
+
+Se genera una familia de mallas tipo O o tipo C con una razon de refinamiento
+    fija: en el nivel k el numero de celdas en xi (sobre el perfil) y en eta
+    se multiplica por ratio ** k. En cada malla se resuelve el flujo
+    potencial y se calculan CL y CD en la pared.
+
+Con las tres mallas mas finas se calcula el orden observado, el valor
+    extrapolado y el indice de convergencia de malla (GCI) de la malla fina,
+    con el procedimiento de Celik et al. (2008), que admite razones de
+    refinamiento distintas entre niveles. El tamaño representativo de cada
+    malla es h = (1 / celdas) ** (1 / 2). El GCI solo se reporta si las tres
+    soluciones convergieron sin densidad negativa y el orden observado de CL
+    esta dentro de p_range; en otro caso se regresa nan y el motivo.
+
+Los tres primeros niveles se resuelven en paralelo. Despues se agrega un
+    nivel a la vez, solo mientras el GCI de CL sea mayor que target, de modo
+    que no se genera una malla mas fina de lo necesario. En mallas tipo O
+    cada nivel que se resuelve despues de otro inicia con la solucion del
+    nivel anterior interpolada (potential_transfer).
+
+Ejemplo:
+    perfil = airfoil.NACA4(2, 4, 12, 1)
+    res = grid_convergence(perfil, 4, flow_conditions(0.5), points=51,
+                           N=51, target=0.005)
+"""
+
+import copy
+import inspect
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import mesh_c
+import mesh_o
+from .potential_c import PotentialSolverC
+from .potential_post import surface
+from .potential_solver import PotentialSolver
+from .potential_transfer import transfer
+
+
+def gci(h, f, Fs=1.25, it_max=50):
+    """
+    Orden observado, extrapolacion de Richardson e indice de convergencia de
+        malla a partir de tres mallas
+    ...
+
+    Parametros
+    ----------
+    h : list
+        tamaños representativos (h1, h2, h3), h1 de la malla mas fina
+    f : list
+        valores de la variable (f1, f2, f3) en las mismas mallas
+    Fs : float64
+        factor de seguridad
+    it_max : int
+        iteraciones de punto fijo para el orden observado
+
+    Return
+    ------
+    res : dict
+        p: orden observado
+        f_ext: valor extrapolado
+        e21: error relativo entre las dos mallas mas finas
+        e_ext: error relativo de la malla fina respecto al valor extrapolado
+        gci21, gci32: indice de convergencia de las mallas fina y media
+        asymptotic: gci32 / (r21 ** p gci21), cercano a 1 en el rango
+            asintotico
+        oscillatory: la convergencia es oscilatoria
+    """
+
+    (h1, h2, h3) = h
+    (f1, f2, f3) = f
+    r21 = h2 / h1
+    r32 = h3 / h2
+    e21 = f2 - f1
+    e32 = f3 - f2
+
+    res = {'p': np.nan, 'f_ext': f1, 'e21': abs(e21 / f1), 'e_ext': np.nan,
+           'gci21': np.nan, 'gci32': np.nan, 'asymptotic': np.nan,
+           'oscillatory': e21 * e32 < 0}
+    if e21 == 0:
+        # la malla fina ya no cambia el resultado
+        res['e_ext'] = 0.
+        res['gci21'] = 0.
+        return res
+    if e32 == 0:
+        return res
+
+    s = np.sign(e32 / e21)
+    p = abs(np.log(abs(e32 / e21))) / np.log(r21)
+    for _ in range(it_max):
+        q = np.log((r21 ** p - s) / (r32 ** p - s))
+        p = abs(np.log(abs(e32 / e21)) + q) / np.log(r21)
+
+    f_ext   = (r21 ** p * f1 - f2) / (r21 ** p - 1)
+    gci21   = Fs * abs(e21 / f1) / (r21 ** p - 1)
+    gci32   = Fs * abs(e32 / f2) / (r32 ** p - 1)
+    res.update({'p': p, 'f_ext': f_ext, 'e_ext': abs((f_ext - f1) / f_ext),
+                'gci21': gci21, 'gci32': gci32,
+                'asymptotic': gci32 / (r21 ** p * gci21)})
+
+    return res
+
+
+def _dimensiones(points, N, tipo, ratio, k):
+    """
+    Numero de puntos del perfil y de lineas eta del nivel k. El numero de
+        puntos del perfil es impar; en mallas tipo C ademas points % 4 = 3,
+        para que la estela tenga el mismo numero de nodos en ambos lados
+    """
+
+    (paso, resto) = (2, 0) if tipo == 'O' else (4, 2)
+    celdas  = int(round(((points - 1) * ratio ** k - resto) / paso)) * paso \
+        + resto
+    N_k     = int(round((N - 1) * ratio ** k)) + 1
+
+    return (celdas + 1, N_k)
+
+
+def _nivel(perfil, distribution, R, points, N, tipo, generator, gen_kwargs,
+           alfa, flow, c, method, kwargs, semilla=None):
+    """
+    Genera la malla de un nivel y resuelve el flujo potencial sobre ella.
+        Se ejecuta en los procesos del pool. semilla es el resultado de otro
+        nivel (mallas tipo O), cuya solucion se interpola como aproximacion
+        inicial
+    """
+
+    perfil = copy.deepcopy(perfil)
+    if distribution == 'sin':
+        perfil.create_sin(points)
+    else:
+        perfil.create_linear(points)
+    t0 = time.time()
+    if tipo == 'O':
+        mesh = mesh_o.mesh_O(R, N, perfil)
+    else:
+        mesh = mesh_c.mesh_C(R, N, perfil)
+    if generator == 'laplace':
+        mesh.gen_Laplace_n(**gen_kwargs)
+    else:
+        mesh.gen_Poisson_n(**gen_kwargs)
+    t_mesh = time.time() - t0
+
+    t0 = time.time()
+    if tipo == 'O':
+        solver = PotentialSolver(flow['d0'], flow['h0'], flow['gamma'],
+                                 flow['mach'], flow['v_inf'], mesh)
+    else:
+        solver = PotentialSolverC(flow['d0'], flow['h0'], flow['gamma'],
+                                  flow['mach'], flow['v_inf'], mesh)
+    (phi, C) = (None, 0.)
+    if semilla is not None:
+        (phi, C) = transfer(semilla['mesh'], mesh, semilla['phi'],
+                            semilla['C'])
+    if method == 'multigrid':
+        (phi, C, _, _) = solver.solve_multigrid(alfa, phi=phi, C=C, **kwargs)
+    else:
+        (phi, C, _, _) = solver.solve(alfa, phi=phi, C=C, **kwargs)
+    res = surface(mesh, phi, C, alfa, flow, c)
+    status = solver.status
+    if status is None:
+        # solve_multigrid no registra el estado
+        status = 'converged' if solver.err < kwargs.get('error', 1e-6) \
+            else 'it_max'
+
+    celdas = (mesh.M - 1) * (mesh.N - 1)
+    return {'points': points, 'M': mesh.M, 'N': mesh.N, 'cells': celdas,
+            'h': celdas ** -0.5, 'CL': res['CL'], 'CD': res['CD'], 'C': C,
+            'it': solver.it, 'err': solver.err, 'status': status,
+            'IMA': solver.IMA, 'time_mesh': t_mesh,
+            'time': time.time() - t0, 'mesh': mesh, 'phi': phi}
+
+
+def _invalido(levels, res, p_range):
+    """
+    Motivo por el que no se reporta el GCI de las tres mallas mas finas, o
+        None si es valido
+    """
+
+    for r in levels[-3:]:
+        if r['status'] != 'converged':
+            return 'la malla M = {:d} N = {:d} no convergio ({})'.format(
+                r['M'], r['N'], r['status'])
+        if r['IMA']:
+            return 'densidad negativa en la malla M = {:d} N = {:d}'.format(
+                r['M'], r['N'])
+    # con gci21 = 0 la malla fina no cambia CL y el orden no esta definido
+    if res['gci21'] != 0 and not p_range[0] <= res['p'] <= p_range[1]:
+        return 'orden observado de CL fuera de p_range (p = {:.3f})'.format(
+            res['p'])
+
+    return None
+
+
+def grid_convergence(perfil, alfa, flow, points=51, N=51, R=20, tipo='O',
+                     ratio=2 ** 0.5, target=0.01, max_levels=5,
+                     distribution=None, generator='laplace',
+                     gen_kwargs=None, method='sor', c=1, Fs=1.25,
+                     p_range=(0.5, 4.), jobs=None, warm=True, report=True,
+                     **kwargs):
+    """
+    Estudio de convergencia de malla de CL y CD, refinando hasta que el GCI
+        de CL en la malla mas fina sea menor que target
+    ...
+
+    Parametros
+    ----------
+    perfil : airfoil
+        perfil NACA4. Se crea de nuevo en cada nivel con el numero de puntos
+        del nivel
+    alfa : float64
+        angulo de ataque en grados
+    flow : dict
+        condiciones de flujo, ver flow_conditions
+    points, N : int
+        puntos del perfil y lineas eta de la malla mas gruesa
+    R : float64
+        radio de la frontera externa
+    tipo : str
+        'O' o 'C'
+    ratio : float64
+        razon de refinamiento entre niveles, en cada direccion. Se recomienda
+        ratio >= 1.3
+    target : float64
+        GCI maximo de CL en la malla mas fina (fraccion, 0.01 = 1 %)
+    max_levels : int
+        numero maximo de mallas
+    distribution : str
+        distribucion de los puntos del perfil, 'sin' (create_sin) o 'linear'
+        (create_linear). None para 'sin' en mallas tipo O y 'linear' en
+        mallas tipo C: con 'sin' las celdas del borde de salida son mucho
+        menores que las de la estela
+    generator : str
+        'laplace' (gen_Laplace_n) o 'poisson' (gen_Poisson_n). Con Poisson
+        los parametros de gen_kwargs son los mismos en todos los niveles
+    gen_kwargs : dict
+        argumentos del generador. None para {'metodo': 'SOR', 'omega': 1.4}
+    method : str
+        'sor' (solve) o 'multigrid' (solve_multigrid, solo mallas tipo O)
+    c : float64
+        cuerda aerodinamica del perfil
+    Fs : float64
+        factor de seguridad del GCI
+    p_range : tuple
+        orden observado de CL aceptable (p_min, p_max). Fuera de este
+        intervalo las mallas no estan en el rango asintotico y no se
+        reporta el GCI
+    jobs : int
+        numero de procesos. None para usar todos los procesadores, 1 para
+        ejecutar en el proceso actual
+    warm : boolean
+        en mallas tipo O, los niveles que se resuelven despues de otro
+        inician con su solucion interpolada (potential_transfer). Los
+        niveles iniciales en paralelo parten de cero
+    report : boolean
+        imprime cada nivel terminado y el GCI
+    kwargs :
+        argumentos del metodo de solucion (error, omega, density_every, ...).
+        Se rechazan los que no acepta el metodo del tipo de malla, por
+        ejemplo density_every en mallas tipo C
+
+    Return
+    ------
+    results : dict
+        levels: un dict por malla, de la mas gruesa a la mas fina, con
+            points, M, N, cells, h, CL, CD, C, it, err, status, IMA,
+            time_mesh, time, mesh y phi
+        CL, CD: resultado de gci con las tres mallas mas finas. Si no es
+            valido f_ext, e_ext, gci21, gci32 y asymptotic son nan
+        reason: motivo por el que no se reporta el GCI, None si es valido
+        converged: el GCI de CL es valido y menor que target
+    """
+
+    if tipo not in ('O', 'C'):
+        raise ValueError("tipo debe ser 'O' o 'C'")
+    if distribution is None:
+        distribution = 'sin' if tipo == 'O' else 'linear'
+    if distribution not in ('sin', 'linear'):
+        raise ValueError("distribution debe ser 'sin' o 'linear'")
+    if generator not in ('laplace', 'poisson'):
+        raise ValueError("generator debe ser 'laplace' o 'poisson'")
+    if method not in ('sor', 'multigrid'):
+        raise ValueError("method debe ser 'sor' o 'multigrid'")
+    if method == 'multigrid' and tipo == 'C':
+        raise ValueError('multigrid solo esta disponible en mallas tipo O')
+    # alfa, phi y C los asigna cada nivel
+    metodo = PotentialSolver.solve_multigrid if method == 'multigrid' \
+        else PotentialSolver.solve if tipo == 'O' else PotentialSolverC.solve
+    validos = set(inspect.signature(metodo).parameters) \
+        - {'self', 'alfa', 'phi', 'C'}
+    invalidos = sorted(set(kwargs) - validos)
+    if invalidos:
+        raise ValueError('argumentos no validos para el metodo de solucion: '
+                         + ', '.join(invalidos))
+    if gen_kwargs is None:
+        gen_kwargs = {'metodo': 'SOR', 'omega': 1.4}
+    if jobs is None:
+        jobs = os.cpu_count()
+    jobs = max(1, min(jobs, 3))
+
+    def tarea(k):
+        (points_k, N_k) = _dimensiones(points, N, tipo, ratio, k)
+        semilla = levels[-1] if warm and tipo == 'O' and levels else None
+        return (perfil, distribution, R, points_k, N_k, tipo, generator,
+                gen_kwargs, alfa, flow, c, method, kwargs, semilla)
+
+    def imprime(r):
+        if report:
+            print('M = {:d} N = {:d} CL = {:.6f} CD = {:+.6f} it = {:d} '
+                  '{} t = {:.2f} s'.format(r['M'], r['N'], r['CL'], r['CD'],
+                                           r['it'], r['status'],
+                                           r['time_mesh'] + r['time']))
+
+    # tres niveles iniciales en paralelo, despues un nivel a la vez
+    pool    = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    levels  = []
+    try:
+        if pool is None:
+            for k in range(3):
+                levels.append(_nivel(*tarea(k)))
+                imprime(levels[-1])
+        else:
+            futures = [pool.submit(_nivel, *tarea(k)) for k in range(3)]
+            # levels esta vacia, los niveles iniciales parten de cero
+            for future in futures:
+                levels.append(future.result())
+                imprime(levels[-1])
+
+        while True:
+            h   = [r['h'] for r in levels[:-4:-1]]
+            res = {key: gci(h, [r[key] for r in levels[:-4:-1]], Fs)
+                   for key in ('CL', 'CD')}
+            reason = _invalido(levels, res['CL'], p_range)
+            if reason is not None:
+                for key in ('CL', 'CD'):
+                    res[key].update({k: np.nan for k in (
+                        'f_ext', 'e_ext', 'gci21', 'gci32', 'asymptotic')})
+            converged = res['CL']['gci21'] <= target
+            if report and reason is not None:
+                print('GCI no valido: ' + reason)
+            elif report:
+                print('GCI CL = {:.3e} p = {:.3f} CL_ext = {:.6f}'.format(
+                    res['CL']['gci21'], res['CL']['p'], res['CL']['f_ext']))
+            if converged or len(levels) >= max_levels:
+                break
+            if pool is None:
+                levels.append(_nivel(*tarea(len(levels))))
+            else:
+                levels.append(pool.submit(_nivel,
+                                          *tarea(len(levels))).result())
+            imprime(levels[-1])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return {'levels': levels, 'CL': res['CL'], 'CD': res['CD'],
+            'reason': reason, 'converged': converged}
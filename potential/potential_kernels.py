@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Funciones compiladas con numba del solver de flujo potencial
+    (PotentialSolver). Cada funcion corresponde a una parte del esquema de
+    potential_flow_o_n, de manera que se puedan combinar en distintos metodos
+    iterativos (Gauss-Seidel, multimalla).
+"""
+
+import numpy as np
+from numba import njit
+
+# indices de los bloques de metricas (estructura de arreglos)
+G11     = 0
+G12     = 1
+G22     = 2
+JAC     = 3
+QXX     = 4     # x_xi ** 2 + y_xi ** 2
+QEE     = 5     # x_eta ** 2 + y_eta ** 2
+QXE     = 6     # x_xi * x_eta + y_xi * y_eta
+
+# indices de los bloques de trabajo
+P_      = 0
+U_      = 1
+V_      = 2
+RHO     = 3
+
+
+@njit
+def _farfield(phi, X0, Y0, arcotan, v_inf, cos_a, sin_a, C):
+    """
+    Función potencial en la frontera externa ec 4.18
+    """
+
+    for i in range(phi.shape[0]):
+        phi[i, 0] = v_inf * (X0[i] * cos_a + Y0[i] * sin_a) \
+            + C * arcotan[i] / 2 / np.pi
+
+    return
+
+
+@njit
+def _cross_terms(phi, C, PV, PH):
+    """
+    Terminos cruzados P de las velocidades en las mallas intercaladas. PH en
+        j = N-2 no se calcula en el esquema original (permanece en cero), se
+        conserva igual
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    for j in range(N-1):
+        PV[0, j] = 0.25 * (phi[1, j+1] - phi[-2, j+1]
+                           + phi[1, j] - phi[-2, j] + 2 * C)
+        for i in range(1, M-1):
+            PV[i, j] = 0.25 * (phi[i+1, j+1] - phi[i-1, j+1]
+                               + phi[i+1, j] - phi[i-1, j])
+        PV[M-1, j] = PV[0, j]
+
+    for i in range(M-1):
+        for j in range(1, N-2):
+            PH[i, j] = 0.25 * (phi[i+1, j+1] - phi[i+1, j-1]
+                               + phi[i, j+1] - phi[i, j-1])
+
+    return
+
+
+@njit
+def _density(phi, C, metricV, metricH, workV, workH, H0, gamma, d0):
+    """
+    Velocidades y densidad en las mallas intercaladas a partir de phi.
+        Regresa IMA = 1 si la densidad es negativa en algun nodo
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    g11V = metricV[G11]
+    g12V = metricV[G12]
+    g22V = metricV[G22]
+    qxxV = metricV[QXX]
+    qeeV = metricV[QEE]
+    qxeV = metricV[QXE]
+    g11H = metricH[G11]
+    g12H = metricH[G12]
+    g22H = metricH[G22]
+    qxxH = metricH[QXX]
+    qeeH = metricH[QEE]
+    qxeH = metricH[QXE]
+    PV = workV[P_]
+    UV = workV[U_]
+    VV = workV[V_]
+    rhoV = workV[RHO]
+    PH = workH[P_]
+    UH = workH[U_]
+    VH = workH[V_]
+    rhoH = workH[RHO]
+    exponente = 1 / (gamma - 1)
+
+    _cross_terms(phi, C, PV, PH)
+
+    IMA = 0
+    for i in range(M):
+        for j in range(N-1):
+            UV[i, j] = g11V[i, j] * PV[i, j] + g12V[i, j] \
+                * (phi[i, j+1] - phi[i, j])
+            VV[i, j] = g12V[i, j] * PV[i, j] + g22V[i, j] \
+                * (phi[i, j+1] - phi[i, j])
+            rho = 1 - ((UV[i, j]**2 * qxxV[i, j]
+                        + VV[i, j]**2 * qeeV[i, j]
+                        + 2 * UV[i, j] * VV[i, j] * qxeV[i, j])
+                       / 2 / H0)
+            if rho < 0:
+                IMA = 1
+            rhoV[i, j] = d0 * np.abs(rho) ** exponente
+
+    for i in range(M-1):
+        for j in range(1, N-1):
+            UH[i, j] = g11H[i, j] * (phi[i+1, j] - phi[i, j]) \
+                + g12H[i, j] * PH[i, j]
+            VH[i, j] = g12H[i, j] * (phi[i+1, j] - phi[i, j]) \
+                + g22H[i, j] * PH[i, j]
+            rho = 1 - ((UH[i, j]**2 * qxxH[i, j]
+                        + VH[i, j]**2 * qeeH[i, j]
+                        + 2 * UH[i, j] * VH[i, j] * qxeH[i, j])
+                       / 2 / H0)
+            if rho < 0:
+                IMA = 1
+            rhoH[i, j] = d0 * np.abs(rho) ** exponente
+
+    return IMA
+
+
+@njit
+def _sonic(metricV, metricH, workV, workH, H0, gamma, out):
+    """
+    Diagnostico de la densidad a partir de las velocidades de la ultima
+        llamada a _density, sin calcular potencias. Se llena out (6, ):
+        nodos con densidad negativa, nodos supersonicos, Mach local maximo,
+        malla del nodo con Mach maximo (0 vertical, 1 horizontal) y sus
+        indices i, j
+    """
+
+    # M^2 = 2 (1 - r) / ((gamma - 1) r), con r = 1 - V^2 / 2 / H0
+    r_sonico = 2 / (gamma + 1)
+    negativos = 0
+    supersonicos = 0
+    r_min = np.inf
+    malla = 0
+    i_min = 0
+    j_min = 0
+    for k in range(2):
+        metric = metricV if k == 0 else metricH
+        work = workV if k == 0 else workH
+        j0 = 0 if k == 0 else 1
+        j1 = work.shape[2] if k == 0 else work.shape[2] - 1
+        for i in range(work.shape[1]):
+            for j in range(j0, j1):
+                U = work[U_, i, j]
+                V = work[V_, i, j]
+                r = 1 - ((U**2 * metric[QXX, i, j] + V**2 * metric[QEE, i, j]
+                          + 2 * U * V * metric[QXE, i, j]) / 2 / H0)
+                # una solucion divergente (nan) cuenta como densidad negativa
+                if r != r:
+                    r = -np.inf
+                if r < 0:
+                    negativos += 1
+                if r < r_sonico:
+                    supersonicos += 1
+                if r < r_min:
+                    r_min = r
+                    malla = k
+                    i_min = i
+                    j_min = j
+
+    out[0] = negativos
+    out[1] = supersonicos
+    out[2] = (2 * (1 - r_min) / ((gamma - 1) * r_min)) ** 0.5 \
+        if r_min > 0 else np.inf
+    out[3] = malla
+    out[4] = i_min
+    out[5] = j_min
+
+    return
+
+
+@njit
+def _stencil(phi, i, j, im, salto, metricV, metricH, workV, workH):
+    """
+    Terminos de la ecuacion discreta en el nodo (i, j):
+        L(phi) = nterm - diag * phi[i, j]
+        im es el nodo anterior en xi y salto la discontinuidad del potencial
+        entre ambos (C en i = 0)
+    """
+
+    g11H = metricH[G11]
+    g12H = metricH[G12]
+    JH = metricH[JAC]
+    g12V = metricV[G12]
+    g22V = metricV[G22]
+    JV = metricV[JAC]
+    PV = workV[P_]
+    rhoV = workV[RHO]
+    PH = workH[P_]
+    rhoH = workH[RHO]
+
+    nterm = rhoH[i, j] * JH[i, j] \
+        * (g12H[i, j] * PH[i, j] + g11H[i, j] * phi[i+1, j]) \
+        - rhoH[im, j] * JH[im, j] \
+        * (g12H[im, j] * PH[im, j] - g11H[im, j] * (phi[im, j] - salto)) \
+        + rhoV[i, j] * JV[i, j] \
+        * (g12V[i, j] * PV[i, j] + g22V[i, j] * phi[i, j+1]) \
+        - rhoV[i, j-1] * JV[i, j-1] \
+        * (g12V[i, j-1] * PV[i, j-1] - g22V[i, j-1] * phi[i, j-1])
+    diag = rhoH[i, j] * JH[i, j] * g11H[i, j] \
+        + rhoH[im, j] * JH[im, j] * g11H[im, j] \
+        + rhoV[i, j] * JV[i, j] * g22V[i, j] \
+        + rhoV[i, j-1] * JV[i, j-1] * g22V[i, j-1]
+
+    return (nterm, diag)
+
+
+@njit
+def _gauss_seidel(phi, C, metricV, metricH, workV, workH):
+    """
+    Un barrido de Gauss-Seidel sobre los nodos internos
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    for i in range(M-1):
+        # en i = 0 el vecino anterior es i = M-2, con el salto C
+        im = M-2 if i == 0 else i-1
+        salto = C if i == 0 else 0.
+        for j in range(1, N-1):
+            (nterm, diag) = _stencil(phi, i, j, im, salto, metricV, metricH,
+                                     workV, workH)
+            phi[i, j] = nterm / diag
+
+    return
+
+
+@njit
+def _frozen(metricV, metricH, workV, workH, coefV, coefH, diag_inv):
+    """
+    Coeficientes congelados rho * J * g a partir de la densidad actual, para
+        los barridos sin actualizar la densidad:
+        coefV = (rho J g12, rho J g22) en la malla vertical
+        coefH = (rho J g11, rho J g12) en la malla horizontal
+        diag_inv = inverso del coeficiente diagonal de cada nodo interno
+    """
+
+    M = diag_inv.shape[0] + 1
+    N = diag_inv.shape[1]
+    rhoV = workV[RHO]
+    rhoH = workH[RHO]
+    for i in range(M):
+        for j in range(N-1):
+            rJ = rhoV[i, j] * metricV[JAC, i, j]
+            coefV[0, i, j] = rJ * metricV[G12, i, j]
+            coefV[1, i, j] = rJ * metricV[G22, i, j]
+    for i in range(M-1):
+        for j in range(N):
+            rJ = rhoH[i, j] * metricH[JAC, i, j]
+            coefH[0, i, j] = rJ * metricH[G11, i, j]
+            coefH[1, i, j] = rJ * metricH[G12, i, j]
+
+    for i in range(M-1):
+        im = M-2 if i == 0 else i-1
+        for j in range(1, N-1):
+            diag_inv[i, j] = 1 / (coefH[0, i, j] + coefH[0, im, j]
+                                  + coefV[1, i, j] + coefV[1, i, j-1])
+
+    return
+
+
+@njit
+def _gauss_seidel_frozen(phi, C, workV, workH, coefV, coefH, diag_inv):
+    """
+    Un barrido de Gauss-Seidel con los coeficientes congelados (_frozen).
+        Los terminos cruzados P se deben calcular antes con phi actual
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    PV = workV[P_]
+    PH = workH[P_]
+    aV = coefV[0]
+    bV = coefV[1]
+    aH = coefH[0]
+    bH = coefH[1]
+    for i in range(M-1):
+        im = M-2 if i == 0 else i-1
+        salto = C if i == 0 else 0.
+        for j in range(1, N-1):
+            phi[i, j] = (bH[i, j] * PH[i, j] + aH[i, j] * phi[i+1, j]
+                         - bH[im, j] * PH[im, j]
+                         + aH[im, j] * (phi[im, j] - salto)
+                         + aV[i, j] * PV[i, j] + bV[i, j] * phi[i, j+1]
+                         - aV[i, j-1] * PV[i, j-1]
+                         + bV[i, j-1] * phi[i, j-1]) * diag_inv[i, j]
+
+    return
+
+
+@njit
+def _velocity_change(phi, phi_rho):
+    """
+    Cambio maximo de las diferencias de phi entre nodos vecinos (velocidad
+        en la malla computacional) desde la ultima actualizacion de la
+        densidad
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    dif = 0.
+    for i in range(M-1):
+        for j in range(N-1):
+            d = phi[i, j] - phi_rho[i, j]
+            dx = abs(phi[i+1, j] - phi_rho[i+1, j] - d)
+            de = abs(phi[i, j+1] - phi_rho[i, j+1] - d)
+            if dx > dif:
+                dif = dx
+            if de > dif:
+                dif = de
+
+    return dif
+
+
+@njit
+def _wall(phi, C, wall):
+    """
+    Condición en la superficie del perfil y discontinuidad del potencial
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    for i in range(M-2, 0, -1):
+        phi[i, N-1] = 1 / 3 * (4 * phi[i, N-2] - phi[i, N-3] - wall[1, i]
+                               / wall[2, i]
+                               * (phi[i+1, N-1] - phi[i-1, N-1]))
+    phi[0, N-1] = 1 / 3 * (4 * phi[0, N-2] - phi[0, N-3] - wall[1, 0]
+                           / wall[2, 0]
+                           * (phi[1, N-1] - phi[M-2, N-1] + C))
+
+    for j in range(N):
+        phi[M-1, j] = phi[0, j] + C
+
+    return
+
+
+@njit
+def _kutta(phi, wall):
+    """
+    Cálculo de la Circulación, condicion de Kutta
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+
+    return phi[M-2, N-1] - phi[1, N-1] - wall[1, 0] * \
+        (phi[0, N-3] - 4 * phi[0, N-2] + 3 * phi[0, N-1]) / wall[0, 0]
+
+
+@njit
+def _solve(phi, phi_old, X0, Y0, arcotan, v_inf, alfa, C, omega, it_max,
+           error, H0, gamma, d0, metricV, metricH, wall, workV, workH,
+           history, density_every, density_tol, phi_rho, coefV, coefH,
+           diag_inv, updates):
+    """
+    Ciclo iterativo completo de la solucion de flujo potencial
+    ...
+
+    Parametros
+    ----------
+    phi, phi_old : numpy.array
+        funcion de potencial (se actualiza en el lugar) y arreglo de trabajo
+    X0, Y0 : numpy.array
+        coordenadas de la frontera externa
+    arcotan : numpy.array
+        parte de la ecuacion de potencial en la frontera externa
+    v_inf, alfa, C : float64
+        velocidad de corriente libre, angulo de ataque (radianes) y
+        circulacion inicial
+    omega, it_max, error : float64, int, float64
+        parametros del metodo iterativo
+    H0, gamma, d0 : float64
+        entalpia de estancamiento, relacion de calores especificos y densidad
+        de estancamiento
+    metricV, metricH, wall : numpy.array
+        metricas en las mallas intercaladas y en la superficie
+    workV, workH : numpy.array
+        arreglos de trabajo
+    history : numpy.array
+        error de cada iteracion (it_max, ). Se llenan los primeros it valores
+    density_every, density_tol : int, float64
+        la densidad se actualiza cada density_every iteraciones o antes, si
+        density_tol > 0 y el cambio de la velocidad (_velocity_change)
+        supera density_tol. Entre actualizaciones se utilizan los
+        coeficientes congelados. Con density_every = 1 y density_tol = 0 se
+        actualiza en todas las iteraciones (esquema original)
+    phi_rho, coefV, coefH, diag_inv : numpy.array
+        arreglos de trabajo de los coeficientes congelados: phi de la ultima
+        actualizacion de la densidad y salidas de _frozen
+    updates : numpy.array
+        indica en que iteraciones se actualizo la densidad (it_max, )
+
+    Return
+    ------
+    (C, it, err, IMA) : float64, int, float64, int
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    cos_a = np.cos(alfa)
+    sin_a = np.sin(alfa)
+
+    congelado = density_every > 1 or density_tol > 0
+    retraso = density_every
+
+    err = 0.
+    IMA = 0
+    it = 0
+    while it < it_max:
+        it += 1
+        for i in range(M):
+            for j in range(N):
+                phi_old[i, j] = phi[i, j]
+
+        _farfield(phi, X0, Y0, arcotan, v_inf, cos_a, sin_a, C)
+
+        actualiza = retraso >= density_every
+        if not actualiza and density_tol > 0:
+            actualiza = _velocity_change(phi, phi_rho) > density_tol
+        updates[it-1] = actualiza
+        if actualiza:
+            IMA = _density(phi, C, metricV, metricH, workV, workH, H0, gamma,
+                           d0)
+            retraso = 0
+        retraso += 1
+
+        if not congelado:
+            _gauss_seidel(phi, C, metricV, metricH, workV, workH)
+        else:
+            if actualiza:
+                _frozen(metricV, metricH, workV, workH, coefV, coefH,
+                        diag_inv)
+                for i in range(M):
+                    for j in range(N):
+                        phi_rho[i, j] = phi[i, j]
+            else:
+                _cross_terms(phi, C, workV[P_], workH[P_])
+            _gauss_seidel_frozen(phi, C, workV, workH, coefV, coefH,
+                                 diag_inv)
+        _wall(phi, C, wall)
+        C = _kutta(phi, wall)
+
+        # sobrerelajacion y error
+        err = 0.
+        for i in range(M):
+            for j in range(N):
+                phi[i, j] = omega * phi[i, j] + (1 - omega) * phi_old[i, j]
+                dif = abs(phi[i, j] - phi_old[i, j])
+                if dif > err:
+                    err = dif
+        history[it-1] = err
+
+        if err < error:
+            break
+
+    return (C, it, err, IMA)
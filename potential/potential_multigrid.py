@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Multimalla (multigrid) para la ecuacion de flujo potencial completo en
+    mallas tipo O.
+
+Esquema tipo FAS: en cada ciclo se congela la densidad a partir de la
+    solucion en la malla fina. Con la densidad congelada el problema es
+    lineal, por lo que en las mallas gruesas se resuelve la ecuacion de la
+    correccion (esquema de correccion, equivalente a FAS para un operador
+    lineal). La circulacion C y la condicion de vortice en la frontera
+    externa solo se actualizan en la malla fina, al final de cada ciclo; la
+    convergencia de C se acelera con extrapolacion de Aitken.
+
+Las mallas gruesas se forman con un subconjunto de los nodos de la malla
+    fina (aproximadamente uno de cada dos en cada direccion), por lo que no
+    es necesario que M-1 y N-1 sean potencias de 2. La prolongacion es
+    interpolacion lineal en el espacio computacional y la restriccion es su
+    transpuesta (la ecuacion discreta es una suma de flujos).
+
+Se agrega como metodo solve_multigrid a la clase PotentialSolver.
+"""
+
+import copy
+
+import numpy as np
+from numba import njit
+
+from .potential_kernels import _farfield, _cross_terms, _density, \
+    _stencil, _wall, _kutta, P_, RHO, G22, JAC
+
+
+class nivel(object):
+    """
+    Nivel de la jerarquia de mallas
+    ...
+
+    Atributos
+    ----------
+    solver : PotentialSolver
+        metricas y arreglos de trabajo del nivel
+    u, f, r : numpy.array
+        solucion (potencial en la malla fina, correccion en las gruesas),
+        lado derecho y residuo
+    ik, iw, jk, jw : numpy.array
+        interpolacion desde este nivel hacia el nivel mas fino: para cada
+        nodo fino el nodo grueso anterior y su peso
+    I, J : numpy.array
+        indices de los nodos de este nivel dentro del nivel mas fino
+    """
+
+    def __init__(self, solver, I=None, J=None, M_fino=0, N_fino=0):
+        M           = solver.mesh.M
+        N           = solver.mesh.N
+        self.solver = solver
+        self.u      = solver.phi
+        self.f      = np.zeros((M, N))
+        self.r      = np.zeros((M, N))
+        self.u_old  = np.zeros((M, N))
+        # arreglos de trabajo del algoritmo de Thomas
+        self.tri    = np.zeros((4, N))
+        self.I      = I
+        self.J      = J
+        if I is not None:
+            (self.ik, self.iw) = _pesos(I, M_fino)
+            (self.jk, self.jw) = _pesos(J, N_fino)
+
+        return
+
+
+def _subconjunto(n):
+    """
+    Indices de la malla gruesa: aproximadamente la mitad de los intervalos,
+        incluyendo los extremos
+    """
+
+    intervalos = n // 2
+
+    return np.unique(np.rint(np.linspace(0, n - 1, intervalos + 1))
+                     .astype(np.int64))
+
+
+def _pesos(K, n):
+    """
+    Interpolacion lineal 1D desde los nodos K hacia los nodos 0..n-1. Para
+        cada nodo fino regresa el nodo grueso anterior k y el peso de k
+        (el nodo k+1 tiene peso 1 - w)
+    """
+
+    i = np.arange(n)
+    k = np.clip(np.searchsorted(K, i, side='right') - 1, 0, np.size(K) - 2)
+    w = 1 - (i - K[k]) / (K[k+1] - K[k])
+
+    return (k.astype(np.int64), w)
+
+
+def niveles(self, min_size=9):
+    """
+    Construye (una sola vez) la jerarquia de mallas para multimalla
+    ...
+
+    Parametros
+    ----------
+    min_size : int
+        numero minimo de nodos en cada direccion de la malla mas gruesa
+
+    Return
+    ------
+    niveles : list
+        lista de objetos nivel, el primero es la malla fina
+    """
+
+    if getattr(self, '_niveles', None) is not None:
+        return self._niveles
+
+    lista   = [nivel(self)]
+    X       = self.X
+    Y       = self.Y
+    while True:
+        (M, N) = np.shape(X)
+        I = _subconjunto(M)
+        J = _subconjunto(N)
+        if np.size(I) < min_size or np.size(J) < min_size \
+                or (np.size(I) == M and np.size(J) == N):
+            break
+        X = X[I, :][:, J]
+        Y = Y[I, :][:, J]
+
+        # malla gruesa, en la orientacion original de la malla
+        mesh        = copy.copy(self.mesh)
+        mesh.X      = np.flip(X).copy()
+        mesh.Y      = np.flip(Y).copy()
+        mesh.M      = np.size(I)
+        mesh.N      = np.size(J)
+        solver      = type(self)(self.d0, self.H0, self.gamma,
+                                      self.mach_inf, self.v_inf, mesh)
+        lista.append(nivel(solver, I, J, M, N))
+
+    self._niveles = lista
+
+    return lista
+
+
+def solve_multigrid(self, alfa, cycles=100, error=1e-6, phi=None, C=0,
+                    nu1=2, nu2=2, nu_coarse=20, smoother='line', omega=1.,
+                    report=False, init='panel'):
+    """
+    Resuelve la ecuacion de flujo potencial con ciclos V de multimalla
+    ...
+
+    Parametros
+    ----------
+    alfa : float64
+        angulo de ataque en grados
+    cycles : int
+        numero maximo de ciclos
+    error : float64
+        cambio maximo permitido de phi en un ciclo
+    phi : numpy.array
+        aproximacion inicial de la funcion de potencial (M, N), en la
+        orientacion de la malla. None para utilizar init
+    C : float64
+        aproximacion inicial de la circulacion
+    nu1, nu2 : int
+        barridos de suavizado antes y despues de la correccion gruesa
+    nu_coarse : int
+        barridos en la malla mas gruesa
+    smoother : str
+        'line' para relajacion por lineas en eta (Gauss-Seidel en xi),
+        'point' para Gauss-Seidel por puntos
+    omega : float64
+        factor de relajacion del suavizador
+    report : boolean
+        imprime el estado al final de cada ciclo
+    init : str
+        aproximacion inicial cuando phi es None, ver PotentialSolver.start
+
+    Return
+    ------
+    (phi, C, theta, IMA) : (numpy.array, float64, numpy.array, int)
+        Phi: valores de la funcion de potencial en todos los nodos
+        C: circulacion alrededor del perfil
+        theta: angulo entre el eje X y todos los nodos de la malla
+        IMA: indica si la densidad es negativa en algun nodo
+    """
+
+    lista   = self.niveles()
+    fino    = lista[0]
+    line    = smoother == 'line'
+    self.start(alfa, phi, C, init)
+
+    alfa_r  = alfa * np.pi / 180
+    cos_a   = np.cos(alfa_r)
+    sin_a   = np.sin(alfa_r)
+    phi     = self.phi
+    history = []
+
+    # pares (C, C de Kutta) de ciclos anteriores para la extrapolacion
+    C_prev      = None
+    K_prev      = None
+    pend_prev   = None
+    for cycle in range(cycles):
+        fino.u_old[:, :] = phi
+
+        # condicion de frontera externa y densidad congelada en cada nivel
+        _farfield(phi, self.X[:, 0], self.Y[:, 0], self.arcotan, self.v_inf,
+                  cos_a, sin_a, self.C)
+        _wall(phi, self.C, self.wall)
+        self.IMA = _density(phi, self.C, self.metricV, self.metricH,
+                            self.workV, self.workH, self.H0, self.gamma,
+                            self.d0)
+        for l in range(1, len(lista)):
+            lev = lista[l]
+            s   = lev.solver
+            # se inyecta el potencial de la malla fina
+            s.phi_old[:, :] = lista[l-1].solver.phi_old[lev.I, :][:, lev.J] \
+                if l > 1 else phi[lev.I, :][:, lev.J]
+            _density(s.phi_old, self.C, s.metricV, s.metricH, s.workV,
+                     s.workH, self.H0, self.gamma, self.d0)
+
+        _ciclo_v(lista, 0, self.C, nu1, nu2, nu_coarse, line, omega)
+
+        # circulacion en la malla fina. La condicion de Kutta converge
+        # linealmente con un factor cercano a 1 (pend). Cuando el factor se
+        # estabiliza entre dos ciclos se extrapola C y el modo dominante de
+        # phi hasta el limite de la serie geometrica
+        K       = _kutta(phi, self.wall)
+        C_new   = K
+        pend    = None
+        if C_prev is not None and self.C != C_prev:
+            pend = (K - K_prev) / (self.C - C_prev)
+        if pend is not None and pend_prev is not None \
+                and abs(pend - pend_prev) < 0.1 * (1 - pend):
+            C_new   = self.C + (K - self.C) / (1 - pend)
+            phi    += pend / (1 - pend) * (phi - fino.u_old)
+            # se reinicia la estimacion del factor
+            (C_prev, K_prev, pend_prev) = (None, None, None)
+        else:
+            (C_prev, K_prev, pend_prev) = (self.C, K, pend)
+        self.C = C_new
+        for j in range(self.mesh.N):
+            phi[-1, j] = phi[0, j] + self.C
+
+        self.err = np.abs(phi - fino.u_old).max()
+        self.it = cycle + 1
+        history.append(self.err)
+        if report:
+            print('ciclo = ' + str(self.it), end=' ')
+            print('err = ' + '{0:.4e}'.format(self.err), end=' ')
+            print('C = ' + '{:.5e}'.format(self.C))
+        if self.err < error:
+            break
+
+    self.history = np.array(history)
+    self.density_updates = np.ones(np.shape(self.history), dtype=bool)
+
+    return (np.flip(phi).copy(), self.C, np.flip(self.theta).copy(),
+            self.IMA)
+
+
+def _ciclo_v(lista, l, C, nu1, nu2, nu_coarse, line, omega):
+    """
+    Ciclo V recursivo a partir del nivel l
+    """
+
+    lev = lista[l]
+    s   = lev.solver
+    u   = lev.u
+
+    if l == len(lista) - 1:
+        _suavizado(u, lev.f, C, s.metricV, s.metricH, s.workV, s.workH,
+                   s.wall, nu_coarse, line, omega, lev.u_old, lev.tri)
+        return
+
+    _suavizado(u, lev.f, C, s.metricV, s.metricH, s.workV, s.workH, s.wall,
+               nu1, line, omega, lev.u_old, lev.tri)
+
+    grueso = lista[l+1]
+    _residuo(u, lev.f, C, s.metricV, s.metricH, s.workV, s.workH, lev.r)
+    _restriccion(lev.r, grueso.f, grueso.ik, grueso.iw, grueso.jk, grueso.jw)
+    grueso.solver.phi[:, :] = 0
+
+    _ciclo_v(lista, l+1, 0., nu1, nu2, nu_coarse, line, omega)
+
+    _prolongacion(grueso.solver.phi, u, C, grueso.ik, grueso.iw, grueso.jk,
+                  grueso.jw)
+    _suavizado(u, lev.f, C, s.metricV, s.metricH, s.workV, s.workH, s.wall,
+               nu2, line, omega, lev.u_old, lev.tri)
+
+    return
+
+
+@njit
+def _residuo(phi, f, C, metricV, metricH, workV, workH, r):
+    """
+    Residuo r = f - L(phi) en los nodos internos
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    _cross_terms(phi, C, workV[P_], workH[P_])
+    for i in range(M-1):
+        im = M-2 if i == 0 else i-1
+        salto = C if i == 0 else 0.
+        for j in range(1, N-1):
+            (nterm, diag) = _stencil(phi, i, j, im, salto, metricV, metricH,
+                                     workV, workH)
+            r[i, j] = f[i, j] - (nterm - diag * phi[i, j])
+
+    return
+
+
+@njit
+def _suavizado(phi, f, C, metricV, metricH, workV, workH, wall, sweeps, line,
+               omega, phi_old, tri):
+    """
+    Barridos de suavizado para L(phi) = f con densidad congelada.
+        Relajacion por lineas en eta (line = True) o Gauss-Seidel por puntos
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    g22V = metricV[G22]
+    JV = metricV[JAC]
+    rhoV = workV[RHO]
+    a = tri[0]
+    b = tri[1]
+    c = tri[2]
+    d = tri[3]
+
+    for sweep in range(sweeps):
+        if omega != 1:
+            for i in range(M):
+                for j in range(N):
+                    phi_old[i, j] = phi[i, j]
+
+        _cross_terms(phi, C, workV[P_], workH[P_])
+        for i in range(M-1):
+            im = M-2 if i == 0 else i-1
+            salto = C if i == 0 else 0.
+            if not line:
+                for j in range(1, N-1):
+                    (nterm, diag) = _stencil(phi, i, j, im, salto, metricV,
+                                             metricH, workV, workH)
+                    phi[i, j] = (nterm - f[i, j]) / diag
+                continue
+
+            # sistema tridiagonal en la linea i, nodos j = 1 .. N-2
+            for j in range(1, N-1):
+                (nterm, diag) = _stencil(phi, i, j, im, salto, metricV,
+                                         metricH, workV, workH)
+                aS = rhoV[i, j-1] * JV[i, j-1] * g22V[i, j-1]
+                aN = rhoV[i, j] * JV[i, j] * g22V[i, j]
+                a[j] = -aS
+                b[j] = diag
+                c[j] = -aN
+                d[j] = nterm - aN * phi[i, j+1] - aS * phi[i, j-1] - f[i, j]
+            d[1] += -a[1] * phi[i, 0]
+            a[1] = 0.
+
+            # condicion de pared: phi[N-1] = (4 phi[N-2] - phi[N-3] - s) / 3
+            if i == 0:
+                s = wall[1, 0] / wall[2, 0] \
+                    * (phi[1, N-1] - phi[M-2, N-1] + C)
+            else:
+                s = wall[1, i] / wall[2, i] \
+                    * (phi[i+1, N-1] - phi[i-1, N-1])
+            aN = -c[N-2]
+            a[N-2] += aN / 3
+            b[N-2] -= 4 * aN / 3
+            d[N-2] -= aN * s / 3
+            c[N-2] = 0.
+
+            # algoritmo de Thomas
+            for j in range(2, N-1):
+                m = a[j] / b[j-1]
+                b[j] -= m * c[j-1]
+                d[j] -= m * d[j-1]
+            phi[i, N-2] = d[N-2] / b[N-2]
+            for j in range(N-3, 0, -1):
+                phi[i, j] = (d[j] - c[j] * phi[i, j+1]) / b[j]
+            phi[i, N-1] = (4 * phi[i, N-2] - phi[i, N-3] - s) / 3
+
+        if not line:
+            _wall(phi, C, wall)
+        for j in range(N):
+            phi[M-1, j] = phi[0, j] + C
+
+        if omega != 1:
+            for i in range(M):
+                for j in range(N):
+                    phi[i, j] = omega * phi[i, j] \
+                        + (1 - omega) * phi_old[i, j]
+
+    return
+
+
+@njit
+def _restriccion(r, f, ik, iw, jk, jw):
+    """
+    Restriccion del residuo a la malla gruesa, transpuesta de la
+        prolongacion. Los nodos gruesos en la frontera no se utilizan
+    """
+
+    M = r.shape[0]
+    N = r.shape[1]
+    Mc = f.shape[0]
+    Nc = f.shape[1]
+    for i in range(Mc):
+        for j in range(Nc):
+            f[i, j] = 0.
+
+    for i in range(M-1):
+        for j in range(1, N-1):
+            for (ki, wi) in ((ik[i], iw[i]), (ik[i] + 1, 1 - iw[i])):
+                if ki == Mc-1:
+                    ki = 0
+                for (kj, wj) in ((jk[j], jw[j]), (jk[j] + 1, 1 - jw[j])):
+                    if kj > 0 and kj < Nc-1:
+                        f[ki, kj] += wi * wj * r[i, j]
+
+    return
+
+
+@njit
+def _prolongacion(e, phi, C, ik, iw, jk, jw):
+    """
+    Interpolacion lineal de la correccion e de la malla gruesa, se suma a
+        phi en los nodos internos y de pared
+    """
+
+    M = phi.shape[0]
+    N = phi.shape[1]
+    for i in range(M-1):
+        k = ik[i]
+        w = iw[i]
+        for j in range(1, N):
+            l = jk[j]
+            v = jw[j]
+            phi[i, j] += w * (v * e[k, l] + (1 - v) * e[k, l+1]) \
+                + (1 - w) * (v * e[k+1, l] + (1 - v) * e[k+1, l+1])
+
+    for j in range(N):
+        phi[M-1, j] = phi[0, j] + C
+
+    return
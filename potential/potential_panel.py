@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Metodo de paneles de vorticidad lineal (Kuethe & Chow) para obtener una
+    aproximacion inicial de la circulacion y de la funcion de potencial en
+    mallas tipo O.
+
+Los coeficientes de influencia se calculan de forma vectorizada. La
+    compresibilidad se considera con la correccion de Prandtl-Glauert o de
+    Karman-Tsien sobre el coeficiente de presion; la hoja de vorticidad se
+    escala con el levantamiento corregido.
+
+El potencial en los nodos de la malla es la suma de la corriente libre y de
+    la hoja de vorticidad del perfil (dos puntos de Gauss por panel). El
+    angulo de cada vortice se recorre de forma continua sobre cada linea eta
+    a partir del corte de la malla, de manera que phi tiene la misma
+    discontinuidad C que utiliza el solver. En la pared phi se extrapola
+    desde el interior.
+"""
+
+import numpy as np
+
+
+def _paneles(x, y, te_cut):
+    """
+    Geometria de los paneles a partir de los nodos del perfil, en sentido
+        horario comenzando en el borde de salida. Se eliminan los nodos a
+        menos de te_cut * c del borde de salida (excepto el borde de salida)
+    """
+
+    if x[0] != x[-1] or y[0] != y[-1]:
+        x = np.append(x, x[0])
+        y = np.append(y, y[0])
+    c       = np.max(x) - np.min(x)
+    dist    = np.hypot(x - x[0], y - y[0])
+    mask    = dist >= te_cut * c
+    mask[[0, -1]] = True
+    x       = x[mask]
+    y       = y[mask]
+    # los paneles deben recorrerse en sentido horario
+    if np.sum(x[:-1] * y[1:] - x[1:] * y[:-1]) > 0:
+        x = np.flip(x)
+        y = np.flip(y)
+
+    S       = np.hypot(np.diff(x), np.diff(y))
+    theta   = np.arctan2(np.diff(y), np.diff(x))
+    xc      = 0.5 * (x[:-1] + x[1:])
+    yc      = 0.5 * (y[:-1] + y[1:])
+
+    return (x, y, S, theta, xc, yc)
+
+
+def _levantamiento(cp, S, th, alfa, c):
+    """
+    Coeficiente de levantamiento por integracion de cp sobre los paneles
+        (recorridos en sentido horario)
+    """
+
+    cx = np.sum(cp * S * np.sin(th)) / c
+    cy = -np.sum(cp * S * np.cos(th)) / c
+
+    return cy * np.cos(alfa) - cx * np.sin(alfa)
+
+
+def panel_method(x, y, alfa, v_inf=1., mach_inf=0.,
+                 correction='karman-tsien', te_cut=0.02):
+    """
+    Metodo de paneles de vorticidad lineal con condicion de Kutta
+    ...
+
+    Parametros
+    ----------
+    x, y : numpy.array
+        coordenadas del perfil, comenzando y terminando en el borde de salida
+    alfa : float64
+        angulo de ataque en grados
+    v_inf : float64
+        velocidad de corriente libre
+    mach_inf : float64
+        numero de Mach de la corriente libre
+    correction : str
+        'karman-tsien' o 'prandtl-glauert'
+    te_cut : float64
+        los nodos a menos de te_cut * c del borde de salida no se utilizan.
+        El cierre del borde de salida en las mallas distorsiona los ultimos
+        paneles y la condicion de Kutta
+
+    Return
+    ------
+    (gamma, cp, C) : (numpy.array, numpy.array, float64)
+        gamma: intensidad de la vorticidad en los nodos de los paneles
+            (positiva en sentido horario), escalada por la correccion de
+            compresibilidad
+        cp: coeficiente de presion en el punto medio de cada panel
+        C: circulacion alrededor del perfil, con la convencion del solver de
+            flujo potencial (positiva en sentido antihorario)
+    """
+
+    (X, Y, S, th, xc, yc) = _paneles(np.asarray(x, dtype=float),
+                                     np.asarray(y, dtype=float), te_cut)
+    n = np.size(S)
+    alfa = alfa * np.pi / 180
+
+    # punto de control i, panel j
+    dx  = xc[:, np.newaxis] - X[np.newaxis, :-1]
+    dy  = yc[:, np.newaxis] - Y[np.newaxis, :-1]
+    ti  = th[:, np.newaxis]
+    tj  = th[np.newaxis, :]
+    Sj  = S[np.newaxis, :]
+
+    A   = -dx * np.cos(tj) - dy * np.sin(tj)
+    B   = dx ** 2 + dy ** 2
+    C   = np.sin(ti - tj)
+    D   = np.cos(ti - tj)
+    E   = dx * np.sin(tj) - dy * np.cos(tj)
+    F   = np.log(1 + Sj * (Sj + 2 * A) / B)
+    G   = np.arctan2(E * Sj, B + A * Sj)
+    P   = dx * np.sin(ti - 2 * tj) + dy * np.cos(ti - 2 * tj)
+    Q   = dx * np.cos(ti - 2 * tj) - dy * np.sin(ti - 2 * tj)
+
+    Cn2 = D + 0.5 * Q * F / Sj - (A * C + D * E) * G / Sj
+    Cn1 = 0.5 * D * F + C * G - Cn2
+    Ct2 = C + 0.5 * P * F / Sj + (A * D - C * E) * G / Sj
+    Ct1 = 0.5 * C * F - D * G - Ct2
+
+    diag = np.diag_indices(n)
+    Cn1[diag] = -1
+    Cn2[diag] = 1
+    Ct1[diag] = 0.5 * np.pi
+    Ct2[diag] = 0.5 * np.pi
+
+    An = np.zeros((n + 1, n + 1))
+    At = np.zeros((n, n + 1))
+    An[:n, :n] = Cn1
+    An[:n, 1:] += Cn2
+    At[:, :n] = Ct1
+    At[:, 1:] += Ct2
+    # condicion de Kutta
+    An[n, 0] = 1
+    An[n, n] = 1
+
+    rhs         = np.zeros((n + 1, ))
+    rhs[:n]     = np.sin(th - alfa)
+    g           = np.linalg.solve(An, rhs)
+
+    V   = np.cos(th - alfa) + At @ g
+    cp  = 1 - V ** 2
+    gamma = 2 * np.pi * v_inf * g
+
+    # correccion por compresibilidad
+    beta = (1 - mach_inf ** 2) ** 0.5
+    if correction == 'prandtl-glauert':
+        cp_c = cp / beta
+    else:
+        cp_c = cp / (beta + mach_inf ** 2 / (1 + beta) * cp / 2)
+
+    # la hoja de vorticidad se escala con la relacion entre el levantamiento
+    # corregido y el incompresible. La circulacion es la de la hoja
+    c       = np.max(X) - np.min(X)
+    CL_i    = _levantamiento(cp, S, th, alfa, c)
+    CL_c    = _levantamiento(cp_c, S, th, alfa, c)
+    gamma   = gamma * (CL_c / CL_i if np.abs(CL_i) > 1e-6 else 1 / beta)
+    C       = -np.sum(0.5 * S * (gamma[:-1] + gamma[1:]))
+
+    return (gamma, cp, C)
+
+
+def panel_guess(mesh, alfa, v_inf, mach_inf=0., correction='karman-tsien',
+                te_cut=0.02, chunk=64):
+    """
+    Aproximacion inicial de phi y C para el solver de flujo potencial a
+        partir del metodo de paneles, sobre los nodos de una malla tipo O
+    ...
+
+    Parametros
+    ----------
+    mesh : mesh
+        malla tipo O. La pared (j = 0) define los paneles
+    alfa : float64
+        angulo de ataque en grados
+    v_inf : float64
+        velocidad de corriente libre
+    mach_inf : float64
+        numero de Mach de la corriente libre
+    correction : str
+        'karman-tsien' o 'prandtl-glauert'
+    te_cut : float64
+        ver panel_method
+    chunk : int
+        numero de vortices procesados a la vez
+
+    Return
+    ------
+    (phi, C) : (numpy.array, float64)
+        phi: funcion de potencial (M, N) en la orientacion de la malla
+        C: circulacion alrededor del perfil
+    """
+
+    x = mesh.X[:, 0]
+    y = mesh.Y[:, 0]
+    (gamma, _, C) = panel_method(x, y, alfa, v_inf, mach_inf, correction,
+                                 te_cut)
+    (X, Y, S, _, _, _) = _paneles(x, y, te_cut)
+
+    # hoja de vorticidad: dos puntos de Gauss por panel, gamma lineal
+    g = 0.5 / 3 ** 0.5
+    puntos  = []
+    for s in (0.5 - g, 0.5 + g):
+        puntos.append((X[:-1] + s * np.diff(X), Y[:-1] + s * np.diff(Y),
+                       0.5 * S * ((1 - s) * gamma[:-1] + s * gamma[1:])))
+    xv  = np.concatenate([p[0] for p in puntos])
+    yv  = np.concatenate([p[1] for p in puntos])
+    Gv  = np.concatenate([p[2] for p in puntos])
+
+    # potencial de los vortices (horario): -G * angulo / (2 pi). El angulo
+    # se recorre de forma continua sobre cada linea eta desde el corte
+    phi = np.zeros((mesh.M, mesh.N))
+    for k in range(0, np.size(Gv), chunk):
+        ang = np.arctan2(mesh.Y[np.newaxis] - yv[k: k + chunk, None, None],
+                         mesh.X[np.newaxis] - xv[k: k + chunk, None, None])
+        ang = np.unwrap(ang, axis=1)
+        phi -= np.tensordot(Gv[k: k + chunk], ang, axes=1) / 2 / np.pi
+
+    # los nodos de la pared estan sobre la hoja de vorticidad, se
+    # extrapolan desde el interior
+    phi[:, 0] = 2 * phi[:, 1] - phi[:, 2]
+
+    alfa = alfa * np.pi / 180
+    phi += v_inf * (mesh.X * np.cos(alfa) + mesh.Y * np.sin(alfa))
+
+    return (phi, C)
@@ -15,8 +15,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 import time
 
+from util.checkpoint import save_checkpoint, load_checkpoint, \
+    checkpoint_timer
+from util.anderson import anderson
+from .potential_circulation import aitken_kutta
 
-def potential_flow_o_n(d0, H0, gamma, mach_inf, v_inf, alfa, mesh):
+
+def potential_flow_o_n(d0, H0, gamma, mach_inf, v_inf, alfa, mesh,
+                       checkpoint=None, checkpoint_every=600, resume=None,
+                       accel_every=0, tol_C=0., tol_CL=0., depth=0):
     """
     Resuelve la ecuacion de flujo potencial.
     se apoya de libreria numba
@@ -39,6 +46,25 @@ def potential_flow_o_n(d0, H0, gamma, mach_inf, v_inf, alfa, mesh):
     mesh : mesh
         Objeto mesh, que contiene toda la informacion relativa a la malla
         sobre la cual se resolvera el flujo potencial
+    checkpoint : str
+        archivo (.npz) en el que se guarda periodicamente el estado del
+        metodo iterativo: phi, C, iteracion, historial de residuos y
+        condiciones de flujo. None para no guardar
+    checkpoint_every : float64
+        tiempo en segundos entre checkpoints
+    resume : str
+        checkpoint desde el cual se continua la solucion
+    accel_every : int
+        cada cuantas iteraciones se extrapola la circulacion (Aitken, ver
+        potential_circulation). 0 para no extrapolar
+    tol_C, tol_CL : float64
+        error estimado maximo de la circulacion y del coeficiente de
+        levantamiento, criterio de paro adicional. Requieren accel_every > 0.
+        0 para no utilizarlos
+    depth : int
+        numero de iteraciones anteriores de la aceleracion de Anderson sobre
+        (phi, C), con omega como amortiguamiento (ver util.anderson). 0 para
+        utilizar sobrerelajacion
 
     Return
     ------
@@ -50,83 +76,22 @@ def potential_flow_o_n(d0, H0, gamma, mach_inf, v_inf, alfa, mesh):
     """
 
     # se definen variables de la malla
-    X = np.copy(mesh.X)
-    Y = np.copy(mesh.Y)
     M = mesh.M
     N = mesh.N
     d_xi = mesh.d_xi
     d_eta = mesh.d_eta
 
-    # se definen matrices de valores en mallas intercaladas
-    x_xiV = np.zeros((M, N-1))
-    x_etaV = np.zeros((M, N-1))
-    y_xiV = np.zeros((M, N-1))
-    y_etaV = np.zeros((M, N-1))
-    g11V = np.zeros((M, N-1))
-    g12V = np.zeros((M, N-1))
-    g22V = np.zeros((M, N-1))
-    JV = np.zeros((M, N-1))
-
-    x_xiH = np.zeros((M-1, N))
-    x_etaH = np.zeros((M-1, N))
-    y_xiH = np.zeros((M-1, N))
-    y_etaH = np.zeros((M-1, N))
-    g11H = np.zeros((M-1, N))
-    g12H = np.zeros((M-1, N))
-    g22H = np.zeros((M-1, N))
-    JH = np.zeros((M-1, N))
-
-    mesh.X = np.flip(mesh.X)
-    mesh.Y = np.flip(mesh.Y)
-    X = np.copy(mesh.X)
-    Y = np.copy(mesh.Y)
-
-    # calculo del tensor de la métrica
-    (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, _, _, _) = mesh.tensor()
-    mesh.X = np.flip(mesh.X)
-    mesh.Y = np.flip(mesh.Y)
-
-    # cálculo de términos en mallas intercaladas promediando los valores de los
-    # nodos vecinos
-    # malla vertical
-    for j in range(N-1):
-        g11V[:, j] = 0.5 * (g11[:, j] + g11[:, j+1])
-        g12V[:, j] = 0.5 * (g12[:, j] + g12[:, j+1])
-        g22V[:, j] = 0.5 * (g22[:, j] + g22[:, j+1])
-        JV[:, j] = 0.5 * (J[:, j] + J[:, j+1])
-        x_xiV[:, j] = 0.5 * (x_xi[:, j] + x_xi[:, j+1])
-        x_etaV[:, j] = 0.5 * (x_eta[:, j] + x_eta[:, j+1])
-        y_xiV[:, j] = 0.5 * (y_xi[:, j] + y_xi[:, j+1])
-        y_etaV[:, j] = 0.5 * (y_eta[:, j] + y_eta[:, j+1])
-
-    # g11V[:, :]    = 0.5 * (g11[:, :-1] + g11[:, 1:])
-    # g12V[:, :]    = 0.5 * (g12[:, :-1] + g12[:, 1:])
-    # g22V[:, :]    = 0.5 * (g22[:, :-1] + g22[:, 1:])
-    # JV[:, :]      = 0.5 * (J[:, :-1] + J[:, 1:])
-    # x_xiV[:, :]   = 0.5 * (x_xi[:, :-1] + x_xi[:, 1:])
-    # x_etaV[:, :]  = 0.5 * (x_eta[:, :-1] + x_eta[:, 1:])
-    # y_xiV[:, :]   = 0.5 * (y_xi[:, :-1] + y_xi[:, 1:])
-    # y_etaV[:, :]  = 0.5 * (y_eta[:, :-1] + y_eta[:, 1:])
-
-    # malla horizontal
-    for i in range(M-1):
-        g11H[i, :] = 0.5 * (g11[i, :] + g11[i+1, :])
-        g12H[i, :] = 0.5 * (g12[i, :] + g12[i+1, :])
-        g22H[i, :] = 0.5 * (g22[i, :] + g22[i+1, :])
-        JH[i, :] = 0.5 * (J[i, :] + J[i+1, :])
-        x_xiH[i, :] = 0.5 * (x_xi[i, :] + x_xi[i+1, :])
-        x_etaH[i, :] = 0.5 * (x_eta[i, :] + x_eta[i+1, :])
-        y_xiH[i, :] = 0.5 * (y_xi[i, :] + y_xi[i+1, :])
-        y_etaH[i, :] = 0.5 * (y_eta[i, :] + y_eta[i+1, :])
-
-    # g11H[:, :]    = 0.5 * (g11[:-1, :] + g11[1:, :])
-    # g12H[:, :]    = 0.5 * (g12[:-1, :] + g12[1:, :])
-    # g22H[:, :]    = 0.5 * (g22[:-1, :] + g22[1:, :])
-    # JH[:, :]      = 0.5 * (J[:-1, :] + J[1:, :])
-    # x_xiH[:, :]   = 0.5 * (x_xi[:-1, :] + x_xi[1:, :])
-    # x_etaH[:, :]  = 0.5 * (x_eta[:-1, :] + x_eta[1:, :])
-    # y_xiH[:, :]   = 0.5 * (y_xi[:-1, :] + y_xi[1:, :])
-    # y_etaH[:, :]  = 0.5 * (y_eta[:-1, :] + y_eta[1:, :])
+    # tensor de la metrica sobre la malla invertida y valores en las mallas
+    # intercaladas (promedio de los nodos vecinos), guardados en la malla
+    metric = mesh.metric()
+    (X, Y) = metric.coords(flip=True)
+    (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, _, _, _) = \
+        metric.tensor(flip=True)
+    (V, H) = metric.staggered(flip=True)
+    (g11V, g12V, g22V, JV, x_xiV, x_etaV, y_xiV, y_etaV) = \
+        [V[k] for k in metric.CAMPOS]
+    (g11H, g12H, g22H, JH, x_xiH, x_etaH, y_xiH, y_etaH) = \
+        [H[k] for k in metric.CAMPOS]
 
     # se calcula el ángulo theta de cada nodo, resultado en ángulos absolutos
     # desde 0 hasta 2 * pi
@@ -172,14 +137,41 @@ def potential_flow_o_n(d0, H0, gamma, mach_inf, v_inf, alfa, mesh):
     it_max = 600000
     error = 1e-6
     err = 0
+
+    # estado guardado en un checkpoint. phi se guarda en la orientacion
+    # utilizada por el metodo iterativo (malla invertida)
+    it0 = 0
+    history = []
+    if resume is not None:
+        state = load_checkpoint(resume)
+        phi = state['phi']
+        C = state['C']
+        it0 = state['it']
+        history = list(state['history'])
+        print('Continuando desde ' + resume + ', it = ' + str(it0))
+    settings = {'alfa': alfa * 180 / np.pi, 'mach_inf': mach_inf,
+                'v_inf': v_inf, 'omega': omega, 'error': error}
+    timer = checkpoint_timer(checkpoint_every)
+
+    # el modo lento de la circulacion requiere pasos de extrapolacion largos
+    acel = anderson(depth, omega, max_step=1e3) if depth > 0 else None
+    aitken = None
+    if accel_every > 0:
+        c = np.max(X[:, -1]) - np.min(X[:, -1])
+        aitken = aitken_kutta(accel_every, v_inf, c, tol_C, tol_CL)
+        aitken.update(phi, C)
+
     print('Potential Flow - Performance')
-    for it in range(it_max):
+    # al continuar con it0 >= it_max no se ejecuta ninguna iteracion
+    it = it0
+    for it in range(it0, it_max):
         print('it =  ' + str(it), end=' ')
         print('err = ' + '{0:.4e}'.format(err), end=' ')
         print('C = ' + '{:.5e}'.format(C), end=' ')
         print('\t', end='\r')
         it += 1
         phi_old = np.copy(phi)
+        C_old = C
 
         # Función potencial en la frontera externa ec 4.18
         (phi, C, IMA) = _potential_flow_o_n(v_inf, phi, X, Y, alfa, C, arcotan,
@@ -191,10 +183,25 @@ def potential_flow_o_n(d0, H0, gamma, mach_inf, v_inf, alfa, mesh):
                                             g22, d0)
 
         # Aplicamos el método SOR de sobrerelajación, ecuación.
-        phi = omega * phi + (1 - omega) * phi_old
+        if acel is None:
+            phi = omega * phi + (1 - omega) * phi_old
+        else:
+            (phi, C) = acel.update((phi_old, C_old), (phi, C))
         err = abs(phi - phi_old).max()
+        history.append(err)
+        if checkpoint is not None and timer.due():
+            save_checkpoint(checkpoint, phi=phi, C=C, it=it,
+                            history=np.array(history), **settings)
         if err < error:
             break
+        if aitken is not None and (it - it0) % accel_every == 0:
+            (C, converged) = aitken.update(phi, C)
+            if converged:
+                break
+
+    if checkpoint is not None:
+        save_checkpoint(checkpoint, phi=phi, C=C, it=it,
+                        history=np.array(history), **settings)
 
     print('\noutside while. it = ' + str(it))
     print('IMA = ' + str(IMA))
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Postproceso vectorizado de la solucion de flujo potencial en mallas tipo O
+    y tipo C.
+
+postprocess calcula en un solo paso la velocidad, densidad, presion,
+    coeficiente de presion, funcion de corriente, numero de Mach, CL y CD.
+    Se utilizan las mismas expresiones que velocity, pressure, streamlines y
+    lift_n_drag, sobre la malla invertida y con las metricas guardadas en la
+    malla (mesh.metric()). La funcion de corriente se obtiene con una suma
+    acumulada a lo largo de eta desde la pared.
+
+surface calcula solo las cantidades en la pared (velocidad tangencial, cp,
+    CL y CD) a partir de la linea de phi en la pared, con costo O(M) por
+    caso; es lo unico que se requiere para generar polares.
+
+En mallas tipo C (PotentialSolverC) se trabaja en la orientacion de la malla:
+    las derivadas en eta de la estela se toman a traves del corte con la
+    discontinuidad C, la velocidad en el perfil con la condicion de pared y
+    en el borde de salida es cero. En la frontera externa se utilizan
+    diferencias de un solo lado.
+"""
+
+import numpy as np
+
+from .potential_c import _metricas_c
+
+
+def _theta(X, Y):
+    """
+    Angulo de cada nodo de la malla invertida, desde 0 hasta 2 * pi, igual
+        que en el solver
+    """
+
+    theta = np.arctan2(Y, X)
+    theta[theta < 0] += 2 * np.pi
+    theta[-1, :] = 2 * np.pi
+    theta[0, :] = 0
+
+    return theta
+
+
+def _velocidad(metric, phi, C, alfa, mach_inf, theta, v_inf):
+    """
+    Componentes de la velocidad sobre la malla invertida, ver velocity.
+        phi y theta en la orientacion de la malla invertida, alfa en radianes
+    """
+
+    (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, _, _, _) = \
+        metric.tensor(flip=True)
+    (X, Y)  = metric.coords(flip=True)
+    (M, N)  = np.shape(phi)
+
+    u = np.zeros((M, N))
+    v = np.zeros((M, N))
+
+    # condición de frontera exterior
+    t   = np.tan(theta[:, 0] - alfa)
+    X0  = X[:, 0]
+    Y0  = Y[:, 0]
+    k   = (C / 2 / np.pi) * (1 - mach_inf ** 2) ** 0.5 * (1 + t ** 2) \
+        * (1 / (1 + (Y0 / X0) ** 2))
+    u[:, 0] = v_inf * np.cos(alfa) + k * (-Y0 / X0) \
+        / (1 + (1 - mach_inf ** 2) * t ** 2)
+    v[:, 0] = v_inf * np.sin(alfa) + k * (1 / X0) \
+        / (1 + (1 - mach_inf ** 2) * t ** 2)
+
+    # derivadas de phi; en i = 0 el vecino i - 1 es phi[M-2] - C
+    dxi         = np.empty((M - 1, N))
+    dxi[1:]     = (phi[2:] - phi[:-2]) / 2
+    dxi[0]      = (phi[1] - phi[-2] + C) / 2
+    deta        = (phi[:M-1, 2:] - phi[:M-1, :-2]) / 2
+
+    # nodos interiores de la malla, incluyendo i = 0
+    s = (slice(0, M - 1), slice(1, N - 1))
+    u[s] = (1 / J[s]) * (dxi[:, 1:-1] * y_eta[s] - deta * y_xi[s])
+    v[s] = (1 / J[s]) * (deta * x_xi[s] - dxi[:, 1:-1] * x_eta[s])
+
+    u[-1, :] = u[0, :]
+    v[-1, :] = v[0, :]
+
+    # condición en frontera interior
+    w = (slice(1, M - 1), N - 1)
+    u[w] = (dxi[1:, -1] / J[w]) * (y_eta[w] + y_xi[w] * g12[w] / g22[w])
+    v[w] = - (dxi[1:, -1] / J[w]) * (x_eta[w] + x_xi[w] * g12[w] / g22[w])
+
+    return (u, v)
+
+
+def _corriente(u, v, d, x_eta, y_eta):
+    """
+    Funcion de corriente sobre la malla invertida, integrada desde la pared
+        (j = N-1) hacia la frontera externa
+    """
+
+    JU          = (u * y_eta - v * x_eta) * d
+    psi         = np.zeros(np.shape(u))
+    psi[:, :-1] = np.flip(np.cumsum(np.flip(JU[:, 1:], axis=1), axis=1),
+                          axis=1)
+
+    return psi
+
+
+def _coeficientes(cp, x_xi, y_xi, alfa, c):
+    """
+    CL y CD por integracion de cp en la pared de la malla invertida, ver
+        lift_n_drag. alfa en radianes
+    """
+
+    M   = np.shape(cp)[0]
+    kx  = cp[:, -1] * y_xi[:, -1] / c
+    ky  = cp[:, -1] * x_xi[:, -1] / c
+
+    xi      = np.linspace(1, M, M)
+    cl_x    = -np.trapz(kx, xi)
+    cl_y    = np.trapz(ky, xi)
+
+    L = -cl_x * np.sin(alfa) + cl_y * np.cos(alfa)
+    D = cl_x * np.cos(alfa) + cl_y * np.sin(alfa)
+
+    return (L, D)
+
+
+def _velocidad_c(mesh, phi, C):
+    """
+    Componentes de la velocidad sobre una malla tipo C, en la orientacion de
+        la malla. Regresa tambien las metricas de los nodos, ver _metricas_c
+    """
+
+    metricas = _metricas_c(mesh)
+    (i_te, _, g22, g12, J, x_xi, x_eta, y_xi, y_eta) = metricas
+    (M, N)  = np.shape(phi)
+    i       = np.arange(i_te + 1)
+    k       = M - 1 - i
+
+    dxi     = np.gradient(phi, axis=0)
+    deta    = np.gradient(phi, axis=1)
+    # estela: el vecino j - 1 esta del otro lado del corte
+    deta[i, 0] = (phi[i, 1] - phi[k, 1] - C) / 2
+    deta[k, 0] = - deta[i, 0]
+
+    u = (dxi * y_eta - deta * y_xi) / J
+    v = (deta * x_xi - dxi * x_eta) / J
+
+    # condición en el perfil y en el borde de salida
+    w       = (slice(i_te + 1, M - 1 - i_te), 0)
+    u[w]    = (dxi[w] / J[w]) * (y_eta[w] + y_xi[w] * g12[w] / g22[w])
+    v[w]    = - (dxi[w] / J[w]) * (x_eta[w] + x_xi[w] * g12[w] / g22[w])
+    u[[i_te, M - 1 - i_te], 0] = 0
+    v[[i_te, M - 1 - i_te], 0] = 0
+
+    return (u, v, metricas)
+
+
+def _coeficientes_c(X, Y, cp, x_xi, y_xi, i_te, alfa, c):
+    """
+    CL y CD en una malla tipo C, integrando cp (M, ) sobre los nodos del
+        perfil (i_te .. M-1-i_te). En el borde de salida x_xi y y_xi se toman
+        alrededor del borde de salida
+    """
+
+    M       = np.shape(X)[0]
+    s       = slice(i_te, M - i_te)
+    x_xi    = np.array(x_xi[s, 0])
+    y_xi    = np.array(y_xi[s, 0])
+    x_xi[[0, -1]] = (X[i_te + 1, 0] - X[M - 2 - i_te, 0]) / 2
+    y_xi[[0, -1]] = (Y[i_te + 1, 0] - Y[M - 2 - i_te, 0]) / 2
+
+    # _coeficientes integra sobre la malla invertida
+    return _coeficientes(cp[s, np.newaxis], -x_xi[:, np.newaxis],
+                         -y_xi[:, np.newaxis], alfa, c)
+
+
+def _postprocess_c(mesh, phi, C, alfa, flow, c):
+    """
+    Postproceso en mallas tipo C, ver postprocess
+    """
+
+    (u, v, metricas) = _velocidad_c(mesh, phi, C)
+    (i_te, _, _, _, _, x_xi, x_eta, y_xi, y_eta) = metricas
+
+    gamma   = flow['gamma']
+    d0      = flow['d0']
+    p0      = flow['p0']
+    V2      = u ** 2 + v ** 2
+    d       = d0 * (1 - V2 / 2 / flow['h0']) ** (1 / (gamma - 1))
+    p       = p0 / (d0 / d) ** gamma
+    cp      = (p - flow['p_inf']) / (p0 - flow['p_inf'])
+    mach    = V2 ** 0.5 / (gamma * p / d) ** 0.5
+
+    # funcion de corriente, integrada desde la frontera interna (j = 0)
+    JU          = (u * y_eta - v * x_eta) * d
+    psi         = np.zeros(np.shape(u))
+    psi[:, 1:]  = np.cumsum(JU[:, 1:], axis=1)
+
+    (X, Y)  = mesh.metric().coords()
+    (L, D)  = _coeficientes_c(X, Y, cp[:, 0], x_xi, y_xi, i_te,
+                              alfa * np.pi / 180, c)
+
+    return {'u': u, 'v': v, 'rho': d, 'p': p, 'cp': cp, 'psi': psi,
+            'mach': mach, 'CL': L, 'CD': D}
+
+
+def postprocess(mesh, phi, C, alfa, flow, c=1, theta=None):
+    """
+    Postproceso completo de una solucion de flujo potencial
+    ...
+
+    Parametros
+    ----------
+    mesh : mesh
+        malla tipo O o tipo C sobre la que se resolvio el flujo potencial
+    phi : numpy.array
+        funcion de potencial en todos los nodos, en la orientacion de la malla
+    C : float64
+        circulacion alrededor del perfil
+    alfa : float64
+        angulo de ataque en grados
+    flow : dict
+        condiciones de flujo, ver flow_conditions: mach, v_inf, d_inf, p_inf,
+        h0, d0, p0, gamma
+    c : float64
+        cuerda aerodinamica del perfil
+    theta : numpy.array
+        angulo entre el eje X y todos los nodos de la malla (el que regresa el
+        solver). None para calcularlo. No se utiliza en mallas tipo C
+
+    Return
+    ------
+    results : dict
+        u, v, rho, p, cp, psi, mach : numpy.array (M, N), en la orientacion
+            de la malla
+        CL, CD : float64
+    """
+
+    if mesh.tipo == 'C':
+        return _postprocess_c(mesh, phi, C, alfa, flow, c)
+
+    metric  = mesh.metric()
+    (_, _, _, _, x_xi, x_eta, y_xi, y_eta, _, _, _) = metric.tensor(flip=True)
+    if theta is None:
+        theta = _theta(*metric.coords(flip=True))
+    else:
+        theta = np.flip(theta)
+    alfa_r  = alfa * np.pi / 180
+
+    gamma   = flow['gamma']
+    h0      = flow['h0']
+    d0      = flow['d0']
+    p0      = flow['p0']
+    p_inf   = flow['p_inf']
+
+    (u, v)  = _velocidad(metric, np.flip(phi), C, alfa_r, flow['mach'], theta,
+                         flow['v_inf'])
+    V2      = u ** 2 + v ** 2
+    d       = d0 * (1 - V2 / 2 / h0) ** (1 / (gamma - 1))
+    p       = p0 / (d0 / d) ** gamma
+    cp      = (p - p_inf) / (p0 - p_inf)
+    psi     = _corriente(u, v, d, x_eta, y_eta)
+    mach    = V2 ** 0.5 / (gamma * p / d) ** 0.5
+    (L, D)  = _coeficientes(cp, x_xi, y_xi, alfa_r, c)
+
+    return {'u': np.flip(u), 'v': np.flip(v), 'rho': np.flip(d),
+            'p': np.flip(p), 'cp': np.flip(cp), 'psi': np.flip(psi),
+            'mach': np.flip(mach), 'CL': L, 'CD': D}
+
+
+def surface(mesh, phi, C, alfa, flow, c=1):
+    """
+    Cantidades en la superficie del perfil (j = 0 en la orientacion de la
+        malla), mismos valores que postprocess en la pared
+    ...
+
+    Parametros
+    ----------
+    mesh : mesh
+        malla tipo O o tipo C sobre la que se resolvio el flujo potencial
+    phi : numpy.array
+        funcion de potencial (M, N) o solo su linea en la pared (M, ), en la
+        orientacion de la malla
+    C : float64
+        circulacion alrededor del perfil
+    alfa : float64
+        angulo de ataque en grados
+    flow : dict
+        condiciones de flujo, ver flow_conditions
+    c : float64
+        cuerda aerodinamica del perfil
+
+    Return
+    ------
+    results : dict
+        u, v, cp : numpy.array (M, ) en la pared, en la orientacion de la malla.
+            En mallas tipo C solo los nodos del perfil (i_te .. M-1-i_te)
+        CL, CD : float64
+    """
+
+    if mesh.tipo == 'C':
+        return _surface_c(mesh, phi, alfa, flow, c)
+
+    (g11, g22, g12, J, x_xi, x_eta, y_xi, y_eta, _, _, _) = \
+        mesh.metric().tensor(flip=True)
+    phi     = np.asarray(phi)
+    pared   = np.flip(phi[:, 0] if phi.ndim == 2 else phi)
+    M       = np.size(pared)
+    gamma   = flow['gamma']
+    d0      = flow['d0']
+
+    # velocidad tangencial en la pared, ver _velocidad; en el borde de
+    # salida (i = 0, M-1) la velocidad es cero
+    u       = np.zeros((M, ))
+    v       = np.zeros((M, ))
+    dxi     = (pared[2:] - pared[:-2]) / 2
+    w       = (slice(1, M - 1), -1)
+    u[1:-1] = (dxi / J[w]) * (y_eta[w] + y_xi[w] * g12[w] / g22[w])
+    v[1:-1] = - (dxi / J[w]) * (x_eta[w] + x_xi[w] * g12[w] / g22[w])
+
+    d       = d0 * (1 - (u ** 2 + v ** 2) / 2 / flow['h0']) \
+        ** (1 / (gamma - 1))
+    p       = flow['p0'] / (d0 / d) ** gamma
+    cp      = (p - flow['p_inf']) / (flow['p0'] - flow['p_inf'])
+
+    # _coeficientes integra la ultima columna
+    (L, D)  = _coeficientes(cp[:, np.newaxis], x_xi[:, -1:], y_xi[:, -1:],
+                            alfa * np.pi / 180, c)
+
+    return {'u': np.flip(u), 'v': np.flip(v), 'cp': np.flip(cp), 'CL': L,
+            'CD': D}
+
+
+def _surface_c(mesh, phi, alfa, flow, c):
+    """
+    Cantidades en el perfil de una malla tipo C, ver surface
+    """
+
+    (i_te, _, g22, g12, J, x_xi, x_eta, y_xi, y_eta) = _metricas_c(mesh)
+    phi     = np.asarray(phi)
+    pared   = phi[:, 0] if phi.ndim == 2 else phi
+    M       = np.size(pared)
+    gamma   = flow['gamma']
+    d0      = flow['d0']
+
+    # velocidad tangencial en el perfil, cero en el borde de salida
+    s       = slice(i_te, M - i_te)
+    n       = M - 2 * i_te
+    u       = np.zeros((n, ))
+    v       = np.zeros((n, ))
+    dxi     = (pared[i_te + 2:M - i_te] - pared[i_te:M - 2 - i_te]) / 2
+    w       = (slice(i_te + 1, M - 1 - i_te), 0)
+    u[1:-1] = (dxi / J[w]) * (y_eta[w] + y_xi[w] * g12[w] / g22[w])
+    v[1:-1] = - (dxi / J[w]) * (x_eta[w] + x_xi[w] * g12[w] / g22[w])
+
+    d       = d0 * (1 - (u ** 2 + v ** 2) / 2 / flow['h0']) \
+        ** (1 / (gamma - 1))
+    p       = flow['p0'] / (d0 / d) ** gamma
+    cp      = np.zeros((M, ))
+    cp[s]   = (p - flow['p_inf']) / (flow['p0'] - flow['p_inf'])
+
+    (X, Y)  = mesh.metric().coords()
+    (L, D)  = _coeficientes_c(X, Y, cp, x_xi, y_xi, i_te, alfa * np.pi / 180,
+                              c)
+
+    return {'u': u, 'v': v, 'cp': cp[s], 'CL': L, 'CD': D}
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Solver de flujo potencial con estado.
+
+Las metricas en las mallas intercaladas se calculan una sola vez al crear el
+    objeto y todos los arreglos de trabajo se reservan de antemano. El ciclo
+    iterativo completo (incluyendo la sobrerelajacion y el calculo del error)
+    se ejecuta dentro de una sola funcion compilada con numba, sin reservar
+    memoria en cada iteracion. Las funciones compiladas estan en
+    potential_kernels.
+
+Se resuelve exactamente el mismo esquema que potential_flow_o_n.
+"""
+
+import numpy as np
+
+from .potential_circulation import aitken_kutta
+from .potential_kernels import G11, G12, G22, JAC, QXX, QEE, QXE, _solve, \
+    _sonic
+from .potential_panel import panel_guess
+
+
+def _arcotan(theta, alfa, mach_inf):
+    """
+    Angulo theta (0 a 2 pi) corregido por compresibilidad, para la condicion
+        de frontera externa del potencial. alfa en radianes
+    """
+
+    beta    = (1 - mach_inf ** 2) ** 0.5
+    arcotan = np.arctan(beta * np.tan(theta - alfa))
+    arcosen = np.arcsin(beta * np.sin(theta - alfa))
+
+    mask            = (arcotan > 0) & (arcosen < 0)
+    arcotan[mask]   += np.pi
+    mask            = (arcotan < 0) & (arcosen > 0)
+    arcotan[mask]   = np.pi - np.abs(arcotan[mask])
+    mask            = (arcotan < 0) & (arcosen < 0) & (theta - alfa > 0)
+    arcotan[mask]   += 2 * np.pi
+
+    return arcotan
+
+
+class PotentialSolver(object):
+    """
+    Solver de la ecuacion de flujo potencial para mallas tipo O
+    ...
+
+    Atributos
+    ----------
+    d0 : float64
+        densidad de estancamiento
+    H0 : float64
+        entalpia de estancamiento
+    gamma : float64
+        relacion de calores especificos del fluido
+    mach_inf : float64
+        Numero de mach de la corriente libre
+    v_inf : float64
+        velocidad de corriente libre
+    mesh : mesh
+        Objeto mesh, que contiene toda la informacion relativa a la malla
+        sobre la cual se resolvera el flujo potencial
+    metricV, metricH : numpy.array
+        metricas en las mallas intercaladas vertical (7, M, N-1) y horizontal
+        (7, M-1, N): g11, g12, g22, J, x_xi^2 + y_xi^2, x_eta^2 + y_eta^2,
+        x_xi * x_eta + y_xi * y_eta
+    wall : numpy.array
+        g11, g12, g22 en la superficie del perfil (3, M)
+    workV, workH : numpy.array
+        arreglos de trabajo P, U, V y densidad en las mallas intercaladas
+    theta : numpy.array
+        angulo entre el eje X y todos los nodos de la malla
+    alfa, C, IMA : float64, float64, int
+        angulo de ataque, circulacion e indicador de densidad negativa de la
+        solucion actual
+    it, err : int, float64
+        iteraciones y error de la solucion actual
+    aitken : aitken_kutta
+        estado de la extrapolacion de la circulacion de la ultima llamada a
+        solve (None si no se utilizo)
+    history : numpy.array
+        error de cada iteracion de la solucion actual
+    density_updates : numpy.array
+        indica en que iteraciones de la solucion actual se actualizo la
+        densidad, con el mismo tamaño que history
+    sonic_history : numpy.array
+        diagnosticos de la densidad durante la solucion actual (k, 4):
+        iteracion, nodos con densidad negativa, nodos supersonicos y Mach
+        local maximo, uno por cada revision (ver solve, sonic_every)
+    status : str
+        estado de la ultima llamada a solve: 'converged', 'it_max',
+        'aborted' (densidad negativa) o 'transonic' (region supersonica)
+
+    Metodos
+    -------
+    sonic():
+        Diagnostico de la densidad del estado actual
+    start(alfa, phi=None, C=0, init='panel'):
+        Inicia una solucion para un angulo de ataque
+    run(k, omega=0.9, error=1e-6, density_every=1, density_tol=0.):
+        Ejecuta hasta k iteraciones desde el estado actual
+    solve(alfa, omega=0.9, it_max=600000, error=1e-6, phi=None, C=0,
+          report_every=0, init='zero', accel_every=0, tol_C=0., tol_CL=0.,
+          density_every=1, density_tol=0., sonic_every=0, on_sonic=None,
+          omega_min=0.1):
+        Resuelve el flujo potencial para un angulo de ataque
+    solve_multigrid(alfa, cycles=100, error=1e-6, phi=None, C=0, nu1=2,
+                    nu2=2, nu_coarse=20, smoother='line', omega=1.,
+                    report=False, init='panel'):
+        Resuelve el flujo potencial con ciclos V de multimalla
+    solve_sparse(alfa, it_max=200, error=1e-6, phi=None, C=0, method='splu',
+                 refactor_tol=0.05, report=False, init='panel'):
+        Resuelve el flujo potencial por iteraciones de Picard con matriz
+        dispersa
+    """
+
+    from .potential_multigrid import niveles, solve_multigrid
+    from .potential_sparse import solve_sparse
+
+    def __init__(self, d0, H0, gamma, mach_inf, v_inf, mesh):
+        self.d0         = d0
+        self.H0         = H0
+        self.gamma      = gamma
+        self.mach_inf   = mach_inf
+        self.v_inf      = v_inf
+        self.mesh       = mesh
+        self.alfa       = 0
+        self.C          = 0.
+        self.IMA        = 0
+        self.it         = 0
+        self.err        = 0
+        self.history    = np.zeros((0, ))
+        self.density_updates = np.zeros((0, ), dtype=bool)
+        self.sonic_history = np.zeros((0, 4))
+        self.status     = None
+        self.aitken     = None
+
+        M = mesh.M
+        N = mesh.N
+
+        # el metodo iterativo trabaja sobre la malla invertida. Las metricas
+        # se toman del cache de la malla
+        metric = mesh.metric()
+        (X, Y) = metric.coords(flip=True)
+        self.X = np.copy(X)
+        self.Y = np.copy(Y)
+        (g11, g22, g12, J, _, _, _, _, _, _, _) = metric.tensor(flip=True)
+
+        # metricas en mallas intercaladas, promedio de nodos vecinos
+        self.metricV = np.empty((7, M, N-1))
+        self.metricH = np.empty((7, M-1, N))
+        for (work, st) in zip((self.metricV, self.metricH),
+                              metric.staggered(flip=True)):
+            for (k, var) in ((G11, 'g11'), (G12, 'g12'), (G22, 'g22'),
+                             (JAC, 'J')):
+                work[k] = st[var]
+            work[QXX] = st['x_xi'] ** 2 + st['y_xi'] ** 2
+            work[QEE] = st['x_eta'] ** 2 + st['y_eta'] ** 2
+            work[QXE] = st['x_xi'] * st['x_eta'] + st['y_xi'] * st['y_eta']
+
+        self.wall = np.stack((g11[:, N-1], g12[:, N-1], g22[:, N-1]))
+
+        # arreglos de trabajo
+        self.workV  = np.zeros((4, M, N-1))
+        self.workH  = np.zeros((4, M-1, N))
+        self.phi    = np.zeros((M, N))
+        self.phi_old = np.zeros((M, N))
+
+        # coeficientes congelados, para actualizar la densidad con retraso
+        self.phi_rho    = np.zeros((M, N))
+        self.coefV      = np.zeros((2, M, N-1))
+        self.coefH      = np.zeros((2, M-1, N))
+        self.diag_inv   = np.zeros((M-1, N))
+
+        # angulo theta de cada nodo, desde 0 hasta 2 * pi
+        theta = np.arctan2(self.Y, self.X)
+        theta[theta < 0] += 2 * np.pi
+        theta[-1, :] = 2 * np.pi
+        theta[0, :] = 0
+        self.theta = theta
+
+        return
+
+    def _arcotan(self, alfa):
+        """
+        Angulo de cada nodo de la frontera externa, corregido por
+            compresibilidad, para la condicion de frontera del potencial
+        """
+
+        return _arcotan(self.theta[:, 0], alfa, self.mach_inf)
+
+    def sonic(self):
+        """
+        Diagnostico de la densidad en las mallas intercaladas, con las
+            velocidades de la ultima actualizacion de la densidad. Es valido
+            despues de cualquiera de los metodos de solucion
+        ...
+
+        Parametros
+        ----------
+        None
+
+        Return
+        ------
+        sonic : dict
+            negative: numero de nodos con densidad negativa
+            supersonic: numero de nodos con Mach local mayor que 1
+            mach_max: Mach local maximo (inf si la densidad es negativa)
+            x, y: coordenadas del nodo con Mach maximo
+        """
+
+        out = np.zeros((6, ))
+        _sonic(self.metricV, self.metricH, self.workV, self.workH, self.H0,
+               self.gamma, out)
+        (i, j) = (int(out[4]), int(out[5]))
+        if out[3] == 0:
+            x = 0.5 * (self.X[i, j] + self.X[i, j+1])
+            y = 0.5 * (self.Y[i, j] + self.Y[i, j+1])
+        else:
+            x = 0.5 * (self.X[i, j] + self.X[i+1, j])
+            y = 0.5 * (self.Y[i, j] + self.Y[i+1, j])
+
+        return {'negative': int(out[0]), 'supersonic': int(out[1]),
+                'mach_max': out[2], 'x': x, 'y': y}
+
+    def start(self, alfa, phi=None, C=0, init='panel'):
+        """
+        Inicia una solucion: angulo de ataque, aproximacion inicial de la
+            funcion de potencial y de la circulacion
+        ...
+
+        Parametros
+        ----------
+        alfa : float64
+            angulo de ataque en grados
+        phi : numpy.array
+            aproximacion inicial de la funcion de potencial (M, N), en la
+            orientacion de la malla. None para utilizar init
+        C : float64
+            aproximacion inicial de la circulacion
+        init : str
+            aproximacion inicial cuando phi es None: 'panel' (metodo de
+            paneles, potential_panel) o 'zero' (phi = 0)
+
+        Return
+        ------
+        None
+        """
+
+        if init not in ('panel', 'zero'):
+            raise ValueError("init debe ser 'panel' o 'zero'")
+
+        self.alfa       = alfa
+        self.arcotan    = self._arcotan(alfa * np.pi / 180)
+        self.C          = float(C)
+        self.IMA        = 0
+        self.it         = 0
+        self.err        = 0
+        self.history    = np.zeros((0, ))
+        self.density_updates = np.zeros((0, ), dtype=bool)
+        self.sonic_history = np.zeros((0, 4))
+        self.status     = None
+
+        if phi is None and init == 'panel':
+            (phi, C) = panel_guess(self.mesh, alfa, self.v_inf, self.mach_inf)
+            self.C = C
+            self.phi[:, :] = np.flip(phi)
+        elif phi is None:
+            self.phi[:, :] = 0
+        else:
+            self.phi[:, :] = np.flip(phi)
+
+        return
+
+    def _run(self, k, omega, error, density_every=1, density_tol=0.):
+        """
+        Ejecuta hasta k iteraciones sobre el estado actual. Regresa el
+            historial de error de las iteraciones ejecutadas y agrega las
+            actualizaciones de la densidad a density_updates
+        """
+
+        history = np.empty((k, ))
+        updates = np.zeros((k, ), dtype=bool)
+        (self.C, n, self.err, self.IMA) = _solve(
+                        self.phi, self.phi_old, self.X[:, 0], self.Y[:, 0],
+                        self.arcotan, self.v_inf, self.alfa * np.pi / 180,
+                        self.C, omega, k, error, self.H0, self.gamma, self.d0,
+                        self.metricV, self.metricH, self.wall, self.workV,
+                        self.workH, history, int(density_every),
+                        float(density_tol), self.phi_rho, self.coefV,
+                        self.coefH, self.diag_inv, updates)
+        self.it += n
+        self.density_updates = np.concatenate((self.density_updates,
+                                               updates[:n]))
+
+        return history[:n]
+
+    def run(self, k, omega=0.9, error=1e-6, density_every=1, density_tol=0.):
+        """
+        Ejecuta hasta k iteraciones (o hasta alcanzar la tolerancia) dentro
+            de la funcion compilada, a partir del estado actual. Se debe
+            llamar antes a start
+        ...
+
+        Parametros
+        ----------
+        k : int
+            numero maximo de iteraciones
+        omega : float64
+            factor de sobrerelajacion
+        error : float64
+            error maximo permitido entre iteraciones
+        density_every, density_tol : int, float64
+            actualizacion de la densidad con retraso, ver solve
+
+        Return
+        ------
+        (phi, C, IMA, history) : (numpy.array, float64, int, numpy.array)
+            Phi: valores de la funcion de potencial en todos los nodos
+            C: circulacion alrededor del perfil
+            IMA: indica si la densidad es negativa en algun nodo
+            history: error de cada iteracion ejecutada
+        """
+
+        history         = self._run(k, omega, error, density_every,
+                                        density_tol)
+        self.history    = np.concatenate((self.history, history))
+
+        return (np.flip(self.phi).copy(), self.C, self.IMA, history)
+
+    def solve(self, alfa, omega=0.9, it_max=600000, error=1e-6, phi=None,
+              C=0, report_every=0, init='zero', accel_every=0, tol_C=0.,
+              tol_CL=0., density_every=1, density_tol=0., sonic_every=0,
+              on_sonic=None, omega_min=0.1):
+        """
+        Resuelve la ecuacion de flujo potencial
+        ...
+
+        Parametros
+        ----------
+        alfa : float64
+            angulo de ataque en grados
+        omega : float64
+            factor de sobrerelajacion
+        it_max : int
+            numero maximo de iteraciones
+        error : float64
+            error maximo permitido entre iteraciones
+        phi : numpy.array
+            aproximacion inicial de la funcion de potencial (M, N), en la
+            orientacion de la malla. None para utilizar init
+        C : float64
+            aproximacion inicial de la circulacion
+        report_every : int
+            cada cuantas iteraciones se imprime el estado de la solucion.
+            0 para no imprimir
+        init : str
+            aproximacion inicial cuando phi es None, ver start. Con SOR el
+            inicio en cero converge en menos barridos que el de paneles
+        accel_every : int
+            cada cuantas iteraciones se extrapola la circulacion (Aitken, ver
+            potential_circulation). Si es mayor que 0 el estado se imprime
+            cada accel_every iteraciones. 0 para no extrapolar
+        tol_C, tol_CL : float64
+            error estimado maximo de la circulacion y del coeficiente de
+            levantamiento, criterio de paro adicional a error. Requieren
+            accel_every > 0. 0 para no utilizarlos
+        density_every : int
+            la densidad (y los coeficientes rho * J * g) se recalcula cada
+            density_every iteraciones; entre actualizaciones los barridos
+            utilizan los coeficientes congelados. 1 para recalcularla en
+            todas las iteraciones
+        density_tol : float64
+            si es mayor que 0, la densidad se recalcula ademas cuando el
+            cambio maximo de las diferencias de phi entre nodos vecinos desde
+            la ultima actualizacion supera density_tol. Con density_every
+            grande la actualizacion es solo adaptativa. Las iteraciones en
+            que se actualizo la densidad quedan en density_updates
+        sonic_every : int
+            cada cuantas iteraciones se revisa la densidad (sonic). Los
+            resultados quedan en sonic_history. 0 para no revisarla
+        on_sonic : str
+            accion al revisar la densidad. Requiere sonic_every > 0:
+            None: solo se registran los diagnosticos
+            'abort': termina si la densidad es negativa en algun nodo
+            'relax': si la densidad es negativa regresa a la ultima revision
+                sin densidad negativa y reduce omega a la mitad; termina si
+                omega es menor que omega_min
+            'transonic': termina al aparecer una region supersonica
+        omega_min : float64
+            factor de sobrerelajacion minimo con on_sonic = 'relax'
+
+        Return
+        ------
+        (phi, C, theta, IMA) : (numpy.array, float64, numpy.array, int)
+            Phi: valores de la funcion de potencial en todos los nodos
+            C: circulacion alrededor del perfil
+            theta: angulo entre el eje X y todos los nodos de la malla
+            IMA: indica si la densidad es negativa en algun nodo
+        """
+
+        self.start(alfa, phi, C, init)
+
+        k           = report_every if report_every > 0 else it_max
+        aitken      = None
+        if accel_every > 0:
+            k       = accel_every
+            c       = np.max(self.X[:, -1]) - np.min(self.X[:, -1])
+            aitken  = aitken_kutta(accel_every, self.v_inf, c, tol_C, tol_CL)
+            aitken.update(self.phi, self.C)
+        self.aitken = aitken
+        # bloques hasta la siguiente revision de la densidad o extrapolacion
+        bloques     = [b for b in (k, sonic_every) if 0 < b < it_max]
+        # ultimo estado sin densidad negativa, para on_sonic = 'relax'
+        seguro      = (np.copy(self.phi), self.C)
+        revisiones  = []
+        historias   = []
+        self.status = 'it_max'
+        while self.it < it_max:
+            n = min([b - self.it % b for b in bloques] + [it_max - self.it])
+            historias.append(self._run(n, omega, error, density_every,
+                                       density_tol))
+            if report_every > 0:
+                print('it =  ' + str(self.it), end=' ')
+                print('err = ' + '{0:.4e}'.format(self.err), end=' ')
+                print('C = ' + '{:.5e}'.format(self.C), end=' ')
+                print('rho = ' + str(int(self.density_updates.sum())),
+                      end=' ')
+                print('\t', end='\r')
+            if self.err < error:
+                self.status = 'converged'
+                break
+            if sonic_every > 0 and self.it % sonic_every == 0:
+                sonic = self.sonic()
+                revisiones.append((self.it, sonic['negative'],
+                                   sonic['supersonic'], sonic['mach_max']))
+                if on_sonic == 'abort' and sonic['negative'] > 0:
+                    self.status = 'aborted'
+                    break
+                if on_sonic == 'transonic' and sonic['supersonic'] > 0:
+                    self.status = 'transonic'
+                    break
+                if on_sonic == 'relax' and sonic['negative'] > 0:
+                    omega /= 2
+                    if omega < omega_min:
+                        self.status = 'aborted'
+                        break
+                    self.phi[:, :] = seguro[0]
+                    self.C = seguro[1]
+                    if aitken is not None:
+                        aitken = aitken_kutta(accel_every, self.v_inf, c,
+                                              tol_C, tol_CL)
+                        aitken.update(self.phi, self.C)
+                        self.aitken = aitken
+                    continue
+                if sonic['negative'] == 0:
+                    seguro = (np.copy(self.phi), self.C)
+            if aitken is not None and self.it % accel_every == 0:
+                (self.C, converged) = aitken.update(self.phi, self.C)
+                if converged:
+                    self.status = 'converged'
+                    break
+        if report_every > 0:
+            print()
+        self.history = np.concatenate(historias)
+        self.sonic_history = np.array(revisiones).reshape(-1, 4)
+
+        return (np.flip(self.phi).copy(), self.C, np.flip(self.theta).copy(),
+                self.IMA)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Solucion de la ecuacion de flujo potencial por iteraciones de Picard con
+    matriz dispersa (scipy.sparse) para mallas tipo O.
+
+En cada iteracion se congela la densidad y se ensambla el operador de cinco
+    puntos construido con g11H, g22V, JH, JV y la densidad en las mallas
+    intercaladas. Los terminos cruzados (g12) se evaluan con la solucion
+    anterior y pasan al lado derecho. La condicion de pared, la
+    discontinuidad del potencial y la condicion de Kutta forman parte del
+    sistema, la circulacion C es una incognita mas.
+
+La factorizacion (splu) o el precondicionador (spilu para GMRES) se reutilizan
+    mientras el cambio relativo de la densidad respecto a la densidad con la
+    que se factorizo sea menor que refactor_tol. Con una factorizacion
+    anterior se aplica correccion de defecto: x += LU^-1 (b - A x).
+
+Se agrega como metodo solve_sparse a la clase PotentialSolver.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+from .potential_kernels import _farfield, _density, G11, G12, G22, JAC, P_, \
+    RHO
+
+
+def _ensambla(self, cos_a, sin_a, kutta=True):
+    """
+    Matriz del sistema lineal (densidad congelada) y lado derecho. Las
+        incognitas son phi[i, j], i = 0 .. M-2, j = 1 .. N-1 (malla
+        invertida) y C al final. Si kutta es False la circulacion se fija
+        en self.C
+    ...
+
+    Return
+    ------
+    (A, b) : (scipy.sparse.csc_matrix, numpy.array)
+    """
+
+    M       = self.mesh.M
+    N       = self.mesh.N
+    n       = (M - 1) * (N - 1) + 1
+    nc      = n - 1
+    metricV = self.metricV
+    metricH = self.metricH
+    workV   = self.workV
+    workH   = self.workH
+
+    # numero de incognita de cada nodo
+    idx = np.arange((M - 1) * (N - 1)).reshape(M - 1, N - 1)
+
+    # coeficientes de los nodos internos, j = 1 .. N-2
+    aH = workH[RHO] * metricH[JAC]
+    aV = workV[RHO, :M-1] * metricV[JAC, :M-1]
+    aE = (aH * metricH[G11])[:, 1:-1]
+    aW = np.roll(aE, 1, axis=0)
+    aN = (aV * metricV[G22, :M-1])[:, 1:]
+    aS = (aV * metricV[G22, :M-1])[:, :-1]
+    diag = aE + aW + aN + aS
+
+    # terminos cruzados con la solucion anterior
+    cH = (aH * metricH[G12] * workH[P_])[:, 1:-1]
+    cV = aV * metricV[G12, :M-1] * workV[P_, :M-1]
+    q = cH - np.roll(cH, 1, axis=0) + cV[:, 1:] - cV[:, :-1]
+
+    fila    = idx[:, :-1]
+    im      = np.roll(np.arange(M - 1), 1)
+    ip      = np.roll(np.arange(M - 1), -1)
+    rows    = [fila, fila, fila, fila, fila[:, 1:]]
+    cols    = [fila, idx[ip, :-1], idx[im, :-1], idx[:, 1:], idx[:, :-2]]
+    vals    = [diag, -aE, -aW, -aN, -aS[:, 1:]]
+
+    b = np.zeros((n, ))
+    b[fila.ravel()] = q.ravel()
+
+    # frontera externa (j = 0) en las ecuaciones j = 1
+    X0          = self.X[:M-1, 0]
+    Y0          = self.Y[:M-1, 0]
+    b[fila[:, 0]] += aS[:, 0] * self.v_inf * (X0 * cos_a + Y0 * sin_a)
+    rows.append(fila[:, 0])
+    cols.append(np.full(M - 1, nc))
+    vals.append(-aS[:, 0] * self.arcotan[:M-1] / 2 / np.pi)
+
+    # discontinuidad: en i = 0 el vecino oeste es phi[M-2] - C, en i = M-2 el
+    # vecino este es phi[0] + C
+    rows.extend([fila[0], fila[M-2]])
+    cols.extend([np.full(N - 2, nc), np.full(N - 2, nc)])
+    vals.extend([aW[0], -aE[M-2]])
+
+    # pared, j = N-1
+    # 3 phi[N-1] - 4 phi[N-2] + phi[N-3]
+    #   + r (phi[i+1, N-1] - phi[i-1, N-1]) = 0
+    r       = self.wall[1, :M-1] / self.wall[2, :M-1]
+    pared   = idx[:, N-2]
+    rows.extend([pared, pared, pared, pared, pared, pared[[0, M-2]]])
+    cols.extend([pared, idx[:, N-3], idx[:, N-4], pared[ip], pared[im],
+                 np.full(2, nc)])
+    vals.extend([np.full(M - 1, 3.), np.full(M - 1, -4.), np.ones(M - 1), r,
+                 -r, r[[0, M-2]]])
+
+    # condicion de Kutta
+    # C - phi[M-2, N-1] + phi[1, N-1]
+    #   + g12 / g11 (phi[0, N-3] - 4 phi[0, N-2] + 3 phi[0, N-1]) = 0
+    if kutta:
+        k = self.wall[1, 0] / self.wall[0, 0]
+        rows.append(np.full(6, nc))
+        cols.append(np.array([nc, idx[M-2, N-2], idx[1, N-2], idx[0, N-4],
+                              idx[0, N-3], idx[0, N-2]]))
+        vals.append(np.array([1., -1., 1., k, -4 * k, 3 * k]))
+    else:
+        rows.append(np.array([nc]))
+        cols.append(np.array([nc]))
+        vals.append(np.ones(1))
+        b[nc] = self.C
+
+    A = sp.csc_matrix((np.concatenate([np.ravel(v) for v in vals]),
+                       (np.concatenate([np.ravel(v) for v in rows]),
+                        np.concatenate([np.ravel(v) for v in cols]))),
+                      shape=(n, n))
+
+    return (A, b)
+
+
+def solve_sparse(self, alfa, it_max=200, error=1e-6, phi=None, C=0,
+                 method='splu', refactor_tol=0.05, report=False, init='panel'):
+    """
+    Resuelve la ecuacion de flujo potencial por iteraciones de Picard con
+        matriz dispersa
+    ...
+
+    Parametros
+    ----------
+    alfa : float64
+        angulo de ataque en grados
+    it_max : int
+        numero maximo de iteraciones de Picard
+    error : float64
+        cambio maximo permitido de phi entre iteraciones
+    phi : numpy.array
+        aproximacion inicial de la funcion de potencial (M, N), en la
+        orientacion de la malla. None para utilizar init
+    C : float64
+        aproximacion inicial de la circulacion
+    method : str
+        'splu' factorizacion LU directa, 'gmres' GMRES precondicionado con
+        factorizacion LU incompleta (spilu)
+    refactor_tol : float64
+        cambio relativo maximo de la densidad antes de volver a factorizar.
+        El numero de factorizaciones queda en self.factorizations
+    report : boolean
+        imprime el estado al final de cada iteracion
+    init : str
+        aproximacion inicial cuando phi es None, ver PotentialSolver.start
+
+    Return
+    ------
+    (phi, C, theta, IMA) : (numpy.array, float64, numpy.array, int)
+        Phi: valores de la funcion de potencial en todos los nodos
+        C: circulacion alrededor del perfil
+        theta: angulo entre el eje X y todos los nodos de la malla
+        IMA: indica si la densidad es negativa en algun nodo
+    """
+
+    self.start(alfa, phi, C, init)
+    alfa_r = alfa * np.pi / 180
+    _picard(self, np.cos(alfa_r), np.sin(alfa_r), True, it_max, error, method,
+            refactor_tol, report)
+
+    return (np.flip(self.phi).copy(), self.C, np.flip(self.theta).copy(),
+            self.IMA)
+
+
+def _picard(self, cos_a, sin_a, kutta, it_max, error, method, refactor_tol,
+            report):
+    """
+    Iteraciones de Picard a partir del estado actual del solver (self.phi,
+        self.C). La corriente libre en la frontera externa es
+        v_inf * (x * cos_a + y * sin_a). Si kutta es False la circulacion
+        permanece fija
+    """
+
+    M       = self.mesh.M
+    N       = self.mesh.N
+    phi     = self.phi
+
+    factor      = None
+    rho_ref     = None
+    history     = []
+    self.factorizations = 0
+    while self.it < it_max:
+        self.phi_old[:, :] = phi
+        _farfield(phi, self.X[:, 0], self.Y[:, 0], self.arcotan, self.v_inf,
+                  cos_a, sin_a, self.C)
+        self.IMA = _density(phi, self.C, self.metricV, self.metricH,
+                            self.workV, self.workH, self.H0, self.gamma,
+                            self.d0)
+        (A, b) = _ensambla(self, cos_a, sin_a, kutta)
+
+        rho = np.concatenate((self.workV[RHO].ravel(),
+                              self.workH[RHO, :, 1:-1].ravel()))
+        if factor is None \
+                or np.max(np.abs(rho - rho_ref) / rho_ref) > refactor_tol:
+            if method == 'gmres':
+                factor = spla.spilu(A, drop_tol=1e-5, fill_factor=20)
+            else:
+                factor = spla.splu(A)
+            rho_ref = rho
+            self.factorizations += 1
+
+        x = np.append(phi[:M-1, 1:].ravel(), self.C)
+        if method == 'gmres':
+            precond = spla.LinearOperator(A.shape, factor.solve)
+            (x, info) = spla.gmres(A, b, x0=x, M=precond, rtol=1e-10,
+                                   atol=0., restart=50, maxiter=20)
+        else:
+            x += factor.solve(b - A @ x)
+
+        phi[:M-1, 1:] = x[:-1].reshape(M - 1, N - 1)
+        self.C = x[-1]
+        phi[M-1, :] = phi[0, :] + self.C
+
+        self.it += 1
+        self.err = np.abs(phi - self.phi_old).max()
+        history.append(self.err)
+        if report:
+            print('it = ' + str(self.it), end=' ')
+            print('err = ' + '{0:.4e}'.format(self.err), end=' ')
+            print('C = ' + '{:.5e}'.format(self.C))
+        if self.err < error:
+            break
+
+    _farfield(phi, self.X[:, 0], self.Y[:, 0], self.arcotan, self.v_inf,
+              cos_a, sin_a, self.C)
+    self.history = np.array(history)
+    self.density_updates = np.ones(np.shape(self.history), dtype=bool)
+
+    return
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Barrido de angulo de ataque por superposicion para flujo incompresible en
+    mallas tipo O.
+
+Con M_inf -> 0 la densidad es constante y la ecuacion de potencial es lineal:
+    phi(alfa) = cos(alfa) * phi_x + sin(alfa) * phi_y + C * phi_c
+    donde phi_x y phi_y son las soluciones con corriente libre v_inf en X y
+    en Y sin circulacion, y phi_c la solucion con circulacion unitaria y sin
+    corriente libre. La condicion de Kutta es lineal en phi, por lo que C se
+    obtiene directamente para cualquier alfa.
+
+Las tres soluciones base se calculan una sola vez con el solver disperso
+    (potential_sparse). El corte del vortice en la frontera externa se toma
+    en theta = 0, sobre el corte de la malla, en lugar de theta = alfa.
+
+Para casos debilmente compresibles la solucion por superposicion sirve como
+    aproximacion inicial:
+        sup = superposition(mesh, v_inf)
+        (phi, C, _) = sup.solve(alfa)
+        solver.solve(alfa, phi=phi, C=C)
+"""
+
+import numpy as np
+
+from .potential_kernels import _kutta
+from .potential_solver import PotentialSolver
+from .potential_sparse import _picard
+
+
+class superposition(object):
+    """
+    Soluciones base de flujo incompresible sobre una malla tipo O
+    ...
+
+    Atributos
+    ----------
+    mesh : mesh
+        malla tipo O
+    v_inf : float64
+        velocidad de corriente libre
+    phi_x, phi_y, phi_c : numpy.array
+        soluciones base (M, N), en la orientacion de la malla
+    K : numpy.array
+        circulacion de Kutta de cada solucion base (3, )
+    theta : numpy.array
+        angulo entre el eje X y todos los nodos de la malla
+    u_w, v_w : numpy.array
+        velocidad en la pared de cada solucion base (3, M)
+
+    Metodos
+    -------
+    circulation(alfa):
+        circulacion para uno o varios angulos de ataque
+    solve(alfa):
+        potencial y circulacion para un angulo de ataque
+    polar(alfas, c=1):
+        cp en la pared, CL y CD para varios angulos de ataque
+    """
+
+    def __init__(self, mesh, v_inf, it_max=200, error=1e-10):
+        self.mesh   = mesh
+        self.v_inf  = v_inf
+
+        # densidad constante: entalpia de estancamiento infinita
+        solver = PotentialSolver(1., np.inf, 1.4, 0., v_inf, mesh)
+        solver.start(0, init='zero')
+        bases   = []
+        K       = []
+        for (cos_a, sin_a, C) in ((1., 0., 0.), (0., 1., 0.), (0., 0., 1.)):
+            solver.phi[:, :] = 0
+            solver.C = C
+            solver.it = 0
+            _picard(solver, cos_a, sin_a, False, it_max, error, 'splu', 1.,
+                    False)
+            K.append(_kutta(solver.phi, solver.wall))
+            bases.append(np.flip(solver.phi).copy())
+
+        (self.phi_x, self.phi_y, self.phi_c) = bases
+        self.K      = np.array(K)
+        self.theta  = np.flip(solver.theta).copy()
+
+        # velocidad en la pared (j = 0), lineal en phi
+        (_, g22, g12, J, x_xi, x_eta, y_xi, y_eta, _, _, _) = \
+            mesh.metric().tensor()
+        self.u_w = np.zeros((3, mesh.M))
+        self.v_w = np.zeros((3, mesh.M))
+        for (k, phi) in enumerate(bases):
+            dphi = np.zeros((mesh.M, ))
+            dphi[1:-1] = (phi[2:, 0] - phi[:-2, 0]) / 2
+            self.u_w[k] = dphi / J[:, 0] \
+                * (y_eta[:, 0] + y_xi[:, 0] * g12[:, 0] / g22[:, 0])
+            self.v_w[k] = - dphi / J[:, 0] \
+                * (x_eta[:, 0] + x_xi[:, 0] * g12[:, 0] / g22[:, 0])
+        self.x_xi = x_xi[:, 0]
+        self.y_xi = y_xi[:, 0]
+
+        return
+
+    def circulation(self, alfa):
+        """
+        Circulacion que cumple la condicion de Kutta
+        ...
+
+        Parametros
+        ----------
+        alfa : float64 o numpy.array
+            angulo de ataque en grados
+
+        Return
+        ------
+        C : float64 o numpy.array
+        """
+
+        alfa = np.asarray(alfa) * np.pi / 180
+
+        return (np.cos(alfa) * self.K[0] + np.sin(alfa) * self.K[1]) \
+            / (1 - self.K[2])
+
+    def solve(self, alfa):
+        """
+        Potencial para un angulo de ataque, por combinacion lineal de las
+            soluciones base
+        ...
+
+        Parametros
+        ----------
+        alfa : float64
+            angulo de ataque en grados
+
+        Return
+        ------
+        (phi, C, theta) : (numpy.array, float64, numpy.array)
+            Phi: valores de la funcion de potencial en todos los nodos
+            C: circulacion alrededor del perfil
+            theta: angulo entre el eje X y todos los nodos de la malla
+        """
+
+        C       = float(self.circulation(alfa))
+        alfa    = alfa * np.pi / 180
+        phi     = np.cos(alfa) * self.phi_x + np.sin(alfa) * self.phi_y \
+            + C * self.phi_c
+
+        return (phi, C, self.theta.copy())
+
+    def polar(self, alfas, c=1):
+        """
+        Coeficiente de presion en la pared, levantamiento y resistencia para
+            varios angulos de ataque. Misma integracion que lift_n_drag, con
+            cp incompresible 1 - V^2 / v_inf^2
+        ...
+
+        Parametros
+        ----------
+        alfas : numpy.array
+            angulos de ataque en grados
+        c : float64
+            cuerda aerodinamica del perfil
+
+        Return
+        ------
+        polar : dict
+            'alfa', 'C', 'CL', 'CD' : numpy.array (n, )
+            'cp' : numpy.array (n, M) coeficiente de presion en la pared, en
+            el orden de la malla
+        """
+
+        alfas   = np.atleast_1d(np.asarray(alfas, dtype=float))
+        C       = self.circulation(alfas)
+        a       = alfas * np.pi / 180
+        coef    = np.stack((np.cos(a), np.sin(a), C), axis=1)
+        u       = coef @ self.u_w
+        v       = coef @ self.v_w
+        cp      = 1 - (u ** 2 + v ** 2) / self.v_inf ** 2
+
+        # lift_n_drag integra sobre la malla invertida
+        x_xi    = -np.flip(self.x_xi)
+        y_xi    = -np.flip(self.y_xi)
+        cp_f    = np.flip(cp, axis=1)
+        cl_x    = -np.trapz(cp_f * y_xi / c, axis=1)
+        cl_y    = np.trapz(cp_f * x_xi / c, axis=1)
+
+        CL = -cl_x * np.sin(a) + cl_y * np.cos(a)
+        CD = cl_x * np.cos(a) + cl_y * np.sin(a)
+
+        return {'alfa': alfas, 'C': C, 'CL': CL, 'CD': CD, 'cp': cp}
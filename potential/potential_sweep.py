@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Barridos de angulo de ataque y numero de Mach en paralelo, para mallas tipo O.
+
+Los casos se ordenan por (mach, alfa) y se reparten en bloques contiguos, uno
+    por proceso. Cada proceso recorre su bloque en orden e inicia cada caso a
+    partir de la solucion anterior: la corriente libre se rota al nuevo
+    angulo de ataque, phi se escala con la velocidad de corriente libre y la
+    circulacion se corrige con la pendiente de la teoria de perfiles
+    delgados (con el factor de Prandtl-Glauert).
+
+Los resultados (phi, theta, C, CL, CD, historial) se escriben en un solo
+    archivo HDF5 (case_store) desde el proceso principal.
+
+Ejemplo:
+    polar = sweep(malla, np.arange(-4, 11, 2), machs=[0.14],
+                  store_file='naca0012.h5', jobs=4)
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .potential_post import postprocess, surface
+from .potential_solver import PotentialSolver
+
+
+def flow_conditions(mach=None, v_inf=None, t_inf=293.15, p_inf=101325,
+                    gamma=1.4, cp_=1007):
+    """
+    Condiciones de corriente libre y de estancamiento (relaciones
+        isentropicas), igual que en main_potential.py
+    ...
+
+    Parametros
+    ----------
+    mach : float64
+        numero de Mach de la corriente libre
+    v_inf : float64
+        velocidad de corriente libre, si no se indica el numero de Mach
+    t_inf, p_inf : float64
+        temperatura [K] y presion [Pa] de la corriente libre
+    gamma : float64
+        relacion de calores especificos del fluido
+    cp_ : float64
+        calor especifico a presion constante
+
+    Return
+    ------
+    flow : dict
+        mach, v_inf, d_inf, p_inf, h0, d0, p0, gamma
+    """
+
+    Rg      = cp_ * (gamma - 1) / gamma
+    d_inf   = p_inf / (Rg * t_inf)
+    h_inf   = cp_ * t_inf
+    c_inf   = (gamma * p_inf / d_inf) ** 0.5
+    if v_inf is None:
+        v_inf = mach * c_inf
+    mach    = v_inf / c_inf
+
+    h0  = h_inf + 0.5 * v_inf ** 2
+    d0  = d_inf * (1 + (gamma - 1) / 2 * mach ** 2) ** (1 / (gamma - 1))
+    p0  = p_inf * (d0 / d_inf) ** gamma
+
+    return {'mach': mach, 'v_inf': v_inf, 'd_inf': d_inf, 'p_inf': p_inf,
+            'h0': h0, 'd0': d0, 'p0': p0, 'gamma': gamma}
+
+
+def _predictor(phi, C, theta, X, Y, caso0, caso1, c):
+    """
+    Aproximacion inicial de un caso a partir de la solucion del caso
+        anterior: se rota la corriente libre, se escala con v_inf y se
+        corrige la circulacion con la pendiente de perfil delgado
+    """
+
+    (a0, v0, m0) = caso0
+    (a1, v1, m1) = caso1
+    a0      = a0 * np.pi / 180
+    a1      = a1 * np.pi / 180
+    beta0   = (1 - m0 ** 2) ** 0.5
+    beta1   = (1 - m1 ** 2) ** 0.5
+    s       = v1 / v0
+
+    C1  = s * C * beta0 / beta1 \
+        - np.pi * c * v1 / beta1 * (np.sin(a1) - np.sin(a0))
+    phi = s * phi + v1 * (X * (np.cos(a1) - np.cos(a0))
+                          + Y * (np.sin(a1) - np.sin(a0))) \
+        + (C1 - s * C) * theta / 2 / np.pi
+
+    return (phi, C1)
+
+
+def _resuelve(solver, alfa, phi, C, method, error, sonic_every, on_sonic):
+    """
+    Resuelve un caso con el metodo indicado. Regresa tambien el estado del
+        caso y el diagnostico de la densidad (PotentialSolver.sonic). Con
+        multimalla y matriz dispersa la politica on_sonic se aplica solo a
+        la solucion final
+    """
+
+    if method == 'multigrid':
+        res = solver.solve_multigrid(alfa, error=error, phi=phi, C=C)
+    elif method == 'sparse':
+        res = solver.solve_sparse(alfa, error=error, phi=phi, C=C)
+    else:
+        res = solver.solve(alfa, error=error, phi=phi, C=C,
+                           sonic_every=sonic_every if on_sonic else 0,
+                           on_sonic=on_sonic)
+
+    sonic   = solver.sonic()
+    estado  = solver.status if method == 'sor' else \
+        ('converged' if solver.err < error else 'it_max')
+    if method != 'sor' and on_sonic in ('abort', 'relax') \
+            and sonic['negative'] > 0:
+        estado = 'aborted'
+    elif method != 'sor' and on_sonic == 'transonic' \
+            and sonic['supersonic'] > 0:
+        estado = 'transonic'
+
+    return res + (estado, sonic)
+
+
+def _sin_solucion(alfa, mach, abortados):
+    """
+    Un caso no tiene solucion si ya se abandono otro caso del mismo signo de
+        alfa con menor o igual angulo de ataque y numero de Mach
+    """
+
+    for (a, m) in abortados:
+        if mach >= m and alfa * a > 0 and abs(alfa) >= abs(a):
+            return True
+
+    return False
+
+
+def _bloque(mesh, casos, flujo, c, method, error, warm, fields, sonic_every,
+            on_sonic, skip):
+    """
+    Resuelve un bloque de casos (alfa, mach) en orden, con continuacion.
+        Se ejecuta en los procesos del pool. Sin fields solo se calculan y
+        regresan las cantidades en la superficie
+    """
+
+    resultados  = []
+    solver      = None
+    anterior    = None
+    abortados   = []
+    for (alfa, mach) in casos:
+        flow = flow_conditions(mach, **flujo)
+        if skip and _sin_solucion(alfa, flow['mach'], abortados):
+            resultados.append({'alfa': alfa, 'mach': flow['mach'],
+                               'phi': None, 'theta': None, 'C': np.nan,
+                               'CL': np.nan, 'CD': np.nan, 'IMA': 1,
+                               'history': None, 'it': 0, 'time': 0.,
+                               'status': 'skipped', 'mach_max': np.nan})
+            continue
+        if solver is None or solver.mach_inf != flow['mach']:
+            solver = PotentialSolver(flow['d0'], flow['h0'], flow['gamma'],
+                                     flow['mach'], flow['v_inf'], mesh)
+
+        phi = None
+        C   = 0.
+        if warm and anterior is not None:
+            (phi, C) = _predictor(anterior[0], anterior[1], anterior[2],
+                                  mesh.X, mesh.Y, anterior[3],
+                                  (alfa, flow['v_inf'], flow['mach']), c)
+
+        t0 = time.time()
+        (phi, C, theta, IMA, estado, sonic) = _resuelve(
+            solver, alfa, phi, C, method, error, sonic_every, on_sonic)
+        t = time.time() - t0
+        if estado in ('aborted', 'transonic'):
+            abortados.append((alfa, flow['mach']))
+
+        if fields:
+            post = postprocess(mesh, phi, C, alfa, flow, c, theta)
+        else:
+            post = surface(mesh, phi, C, alfa, flow, c)
+
+        resultados.append({'alfa': alfa, 'mach': flow['mach'],
+                           'phi': phi if fields else None,
+                           'theta': theta if fields else None, 'C': C,
+                           'CL': post['CL'], 'CD': post['CD'],
+                           'IMA': IMA, 'history': solver.history,
+                           'it': solver.it, 'time': t, 'status': estado,
+                           'mach_max': sonic['mach_max']})
+        # la continuacion solo parte de casos que no se abandonaron
+        if estado in ('converged', 'it_max'):
+            anterior = (phi, C, theta, (alfa, flow['v_inf'], flow['mach']))
+
+    return resultados
+
+
+def sweep(mesh, alfas, machs, store_file=None, jobs=None, method='multigrid',
+          error=1e-6, c=1, warm=True, t_inf=293.15, p_inf=101325, gamma=1.4,
+          cp_=1007, report=True, fields=True, on_sonic=None,
+          sonic_every=1000, skip=False):
+    """
+    Barrido de angulo de ataque y numero de Mach en paralelo
+    ...
+
+    Parametros
+    ----------
+    mesh : mesh
+        malla tipo O
+    alfas : list
+        angulos de ataque en grados
+    machs : list
+        numeros de Mach de la corriente libre
+    store_file : str
+        archivo HDF5 (case_store) donde se guardan los casos. None para no
+        guardar
+    jobs : int
+        numero de procesos. None para usar todos los procesadores, 1 para
+        ejecutar en el proceso actual
+    method : str
+        'multigrid', 'sparse' o 'sor' (PotentialSolver.solve)
+    error : float64
+        tolerancia del metodo iterativo
+    c : float64
+        cuerda aerodinamica del perfil
+    warm : boolean
+        inicia cada caso a partir del caso anterior del mismo bloque
+    t_inf, p_inf, gamma, cp_ : float64
+        condiciones de la corriente libre, ver flow_conditions
+    report : boolean
+        imprime cada caso terminado
+    fields : boolean
+        con False solo se calculan cp, CL y CD en la pared (surface) y en
+        store_file no se guardan phi ni theta, unicamente los escalares y el
+        historial de convergencia
+    on_sonic : str
+        politica ante densidad negativa o regiones supersonicas, ver
+        PotentialSolver.solve ('abort', 'relax', 'transonic'). None para no
+        revisar la densidad durante la solucion
+    sonic_every : int
+        cada cuantas iteraciones se revisa la densidad con method = 'sor'
+    skip : boolean
+        no resuelve los casos de un bloque con mayor (o igual) angulo de
+        ataque y numero de Mach que un caso abandonado ('aborted' o
+        'transonic'); se regresan con status 'skipped' y valores nan
+
+    Return
+    ------
+    polar : dict
+        numpy.array con llaves alfa, mach, C, CL, CD, IMA, it, time, status,
+        mach_max (Mach local maximo), ordenados por (mach, alfa)
+    """
+
+    casos = [(float(alfa), float(mach)) for mach in sorted(machs)
+             for alfa in sorted(alfas)]
+    flujo = {'t_inf': t_inf, 'p_inf': p_inf, 'gamma': gamma, 'cp_': cp_}
+    if jobs is None:
+        jobs = os.cpu_count()
+    jobs = max(1, min(jobs, len(casos)))
+    bloques = [[casos[k] for k in b]
+               for b in np.array_split(np.arange(len(casos)), jobs)]
+
+    resultados = []
+    if jobs == 1:
+        resultados = _bloque(mesh, casos, flujo, c, method, error, warm,
+                             fields, sonic_every, on_sonic, skip)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_bloque, mesh, b, flujo, c, method, error,
+                                   warm, fields, sonic_every, on_sonic, skip)
+                       for b in bloques]
+            for future in as_completed(futures):
+                resultados.extend(future.result())
+                if report:
+                    print(str(len(resultados)) + '/' + str(len(casos))
+                          + ' casos')
+
+    resultados.sort(key=lambda r: (r['mach'], r['alfa']))
+
+    if store_file is not None:
+        # importacion local, h5py solo se requiere para guardar los casos
+        from case_store import case_store
+        with case_store(store_file, mode='a') as store:
+            store.write_mesh(mesh)
+            for r in resultados:
+                if r['status'] == 'skipped':
+                    continue
+                store.write_case(r['alfa'], phi=r['phi'], theta=r['theta'],
+                                 C=r['C'], CL=r['CL'], CD=r['CD'],
+                                 IMA=r['IMA'], history=r['history'],
+                                 mach=r['mach'])
+
+    polar = {key: np.array([r[key] for r in resultados])
+             for key in ('alfa', 'mach', 'C', 'CL', 'CD', 'IMA', 'it',
+                         'time', 'status', 'mach_max')}
+    if report:
+        for k in range(len(resultados)):
+            print('M = {:.3f} alfa = {:+6.2f} CL = {:.5f} CD = {:+.5f} '
+                  'it = {:d} t = {:.2f} s {}'.format(
+                      polar['mach'][k], polar['alfa'][k], polar['CL'][k],
+                      polar['CD'][k], polar['it'][k], polar['time'][k],
+                      polar['status'][k]))
+
+    return polar
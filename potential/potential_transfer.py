@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Transferencia de una solucion de flujo potencial (phi, C) entre mallas tipo
+    O, para iniciar la solucion en una malla nueva a partir de una solucion
+    convergida en otra malla.
+
+phi es discontinua en el corte (salto C), por lo que se interpola solo la
+    parte regular
+        phi_r = phi - C theta / (2 pi)
+    donde theta es el angulo de cada nodo, continuo a lo largo de cada linea
+    eta y con el salto de 2 pi exactamente en el corte de la malla. En la
+    malla nueva se suma de nuevo C theta / (2 pi) con su propio theta.
+
+Los nodos de la malla nueva se localizan en la malla original: con un
+    KD-tree se buscan los nodos mas cercanos y, en las celdas vecinas, se
+    invierte la interpolacion bilineal (Newton) para obtener los indices
+    fraccionarios (i + u, j + v). phi_r se interpola en esos indices con
+    splines bicubicos en el espacio computacional, periodicos en xi. Si las
+    dos mallas son iguales la solucion se copia.
+"""
+
+import numpy as np
+from scipy.interpolate import RectBivariateSpline
+from scipy.spatial import cKDTree
+
+
+def _theta(X, Y):
+    """
+    Angulo de cada nodo (M, N), continuo a lo largo de las lineas eta, de
+        2 pi en i = 0 a 0 en i = M-1 (misma convencion que el theta de
+        PotentialSolver.solve en la orientacion de la malla)
+    """
+
+    theta = np.unwrap(np.arctan2(Y, X), axis=0)
+    theta -= theta[-1]
+
+    return theta * (2 * np.pi / theta[0])
+
+
+def _localiza(X, Y, x, y, vecinos=4, it_max=10):
+    """
+    Indices fraccionarios (I, J) de los puntos (x, y) en la malla tipo O
+        (X, Y). Los puntos fuera de la malla se proyectan a la celda mas
+        cercana
+    """
+
+    (M, N)  = np.shape(X)
+    arbol   = cKDTree(np.column_stack((X[:-1].ravel(), Y[:-1].ravel())))
+    (_, k)  = arbol.query(np.column_stack((x, y)), k=vecinos)
+    (i0, j0) = np.divmod(k, N)
+
+    # las cuatro celdas que comparten cada nodo cercano
+    ic = ((i0[..., np.newaxis] - np.array([0, 1, 0, 1])) % (M - 1)) \
+        .reshape(np.size(x), -1)
+    jc = np.clip(j0[..., np.newaxis] - np.array([0, 0, 1, 1]), 0, N - 2) \
+        .reshape(np.size(x), -1)
+    x00 = X[ic, jc]
+    x10 = X[ic+1, jc]
+    x11 = X[ic+1, jc+1]
+    x01 = X[ic, jc+1]
+    y00 = Y[ic, jc]
+    y10 = Y[ic+1, jc]
+    y11 = Y[ic+1, jc+1]
+    y01 = Y[ic, jc+1]
+    xp  = x[:, np.newaxis]
+    yp  = y[:, np.newaxis]
+
+    # inversa de la interpolacion bilineal por Newton
+    u = np.full(np.shape(ic), 0.5)
+    v = np.full(np.shape(ic), 0.5)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(it_max):
+            fx  = (1 - u) * (1 - v) * x00 + u * (1 - v) * x10 + u * v * x11 \
+                + (1 - u) * v * x01 - xp
+            fy  = (1 - u) * (1 - v) * y00 + u * (1 - v) * y10 + u * v * y11 \
+                + (1 - u) * v * y01 - yp
+            a   = (1 - v) * (x10 - x00) + v * (x11 - x01)
+            b   = (1 - u) * (x01 - x00) + u * (x11 - x10)
+            c   = (1 - v) * (y10 - y00) + v * (y11 - y01)
+            d   = (1 - u) * (y01 - y00) + u * (y11 - y10)
+            det = a * d - b * c
+            u   = u - (d * fx - b * fy) / det
+            v   = v - (a * fy - c * fx) / det
+
+        # celda que contiene al punto, o la mas cercana
+        fuera = np.fmax(np.fmax(-u, u - 1), np.fmax(-v, v - 1))
+    fuera[np.isnan(fuera)] = np.inf
+    k = np.argmin(fuera, axis=1)
+    p = np.arange(np.size(x))
+    u = np.clip(np.nan_to_num(u[p, k], nan=0.5), 0, 1)
+    v = np.clip(np.nan_to_num(v[p, k], nan=0.5), 0, 1)
+
+    return (ic[p, k] + u, jc[p, k] + v)
+
+
+def transfer(mesh_from, mesh_to, phi, C):
+    """
+    Interpola la funcion de potencial de una malla tipo O a otra
+    ...
+
+    Parametros
+    ----------
+    mesh_from : mesh_O
+        malla en la que se calculo la solucion
+    mesh_to : mesh_O
+        malla nueva
+    phi : numpy.array
+        funcion de potencial (M, N) en mesh_from, en la orientacion de la
+        malla
+    C : float64
+        circulacion alrededor del perfil
+
+    Return
+    ------
+    (phi, C) : (numpy.array, float64)
+        aproximacion inicial en mesh_to, en la orientacion de la malla, para
+        PotentialSolver.solve, solve_multigrid o solve_sparse
+    """
+
+    if mesh_from.tipo == 'C' or mesh_to.tipo == 'C':
+        raise ValueError('transfer solo esta disponible en mallas tipo O')
+
+    X0 = mesh_from.X
+    Y0 = mesh_from.Y
+    X1 = mesh_to.X
+    Y1 = mesh_to.Y
+    if np.shape(X0) == np.shape(X1) and np.array_equal(X0, X1) \
+            and np.array_equal(Y0, Y1):
+        return (np.copy(phi), C)
+
+    # parte regular de phi, periodica en xi
+    (M, N)  = np.shape(X0)
+    phi_r   = phi - C * _theta(X0, Y0) / (2 * np.pi)
+    phi_r   = np.concatenate((phi_r[-4:-1], phi_r, phi_r[1:4]))
+    spline  = RectBivariateSpline(np.arange(-3, M + 3), np.arange(N), phi_r)
+
+    (I, J)  = _localiza(X0, Y0, X1.ravel(), Y1.ravel())
+    phi_n   = spline.ev(I, J).reshape(np.shape(X1)) \
+        + C * _theta(X1, Y1) / (2 * np.pi)
+
+    return (phi_n, C)
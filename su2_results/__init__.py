@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Lectura de resultados de SU2 (surface_flow.vtk, history.csv) con numpy y
+    comparacion de coeficientes de presion, levantamiento y resistencia
+    contra los resultados de flujo potencial.
+
+Solo se leen archivos de superficie. Del archivo VTK se leen unicamente los
+    campos solicitados, el resto se salta sin cargarlo en memoria.
+
+Documentación: https://vtk.org/wp-content/uploads/2015/04/file-formats.pdf
+"""
+
+import numpy as np
+
+# tipos de dato de VTK legacy. En formato BINARY son big endian
+VTK_TYPES = {'float': '>f4', 'double': '>f8', 'int': '>i4',
+             'unsigned_int': '>u4', 'long': '>i8', 'short': '>i2',
+             'char': '>i1', 'unsigned_char': '>u1', 'vtkidtype': '>i4'}
+
+
+def _read_block(f, binary, count, dtype, skip=False):
+    '''
+    Lee (o salta) un bloque de datos de count valores
+    '''
+
+    dtype = np.dtype(dtype)
+    if binary:
+        if skip:
+            f.seek(count * dtype.itemsize, 1)
+            data = None
+        else:
+            data = np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype)
+            data = data.astype(dtype.newbyteorder('='))
+        # fin de linea despues de los datos binarios
+        f.readline()
+        return data
+
+    data    = []
+    total   = 0
+    while total < count:
+        line = f.readline().split()
+        total += len(line)
+        if not skip:
+            data.append(line)
+    if skip:
+        return None
+
+    return np.array([x for line in data for x in line],
+                    dtype=dtype.newbyteorder('='))
+
+
+def read_vtk(filename, fields=None):
+    '''
+    Lee un archivo VTK legacy (ASCII o BINARY) de tipo UNSTRUCTURED_GRID o
+        POLYDATA, como surface_flow.vtk de SU2
+    ...
+
+    Parametros
+    ----------
+    filename : str
+        nombre del archivo
+    fields : list
+        nombres de los campos (SCALARS / VECTORS de POINT_DATA) a leer.
+        None para leer todos
+
+    Return
+    ------
+    vtk : dict
+        'points' : numpy.array (n, 3)
+        'cells' : numpy.array con la lista de celdas en formato de VTK
+            (numero de nodos seguido de los nodos de cada celda)
+        'cell_types' : numpy.array
+        y un elemento por cada campo leido, (n, ) o (n, 3)
+    '''
+
+    vtk = {}
+    with open(filename, 'rb') as f:
+        # encabezado: version, titulo, formato
+        f.readline()
+        f.readline()
+        binary = f.readline().strip().upper() == b'BINARY'
+
+        n_points    = 0
+        line        = f.readline()
+        while line:
+            words = line.split()
+            if not words:
+                line = f.readline()
+                continue
+            key = words[0].decode().upper()
+
+            if key == 'POINTS':
+                n_points = int(words[1])
+                dtype = VTK_TYPES[words[2].decode().lower()]
+                vtk['points'] = _read_block(f, binary, 3 * n_points,
+                                            dtype).reshape(n_points, 3)
+            elif key in ('CELLS', 'LINES', 'POLYGONS', 'VERTICES'):
+                vtk['cells'] = _read_block(f, binary, int(words[2]), '>i4')
+            elif key == 'CELL_TYPES':
+                vtk['cell_types'] = _read_block(f, binary, int(words[1]),
+                                                '>i4')
+            elif key in ('SCALARS', 'VECTORS', 'NORMALS'):
+                name    = words[1].decode()
+                dtype   = VTK_TYPES[words[2].decode().lower()]
+                if key == 'SCALARS':
+                    ncomp = int(words[3]) if len(words) > 3 else 1
+                    # LOOKUP_TABLE en formato legacy
+                    pos = f.tell()
+                    if not f.readline().upper().startswith(b'LOOKUP_TABLE'):
+                        f.seek(pos)
+                else:
+                    ncomp = 3
+                skip = fields is not None and name not in fields
+                data = _read_block(f, binary, ncomp * n_points, dtype, skip)
+                if data is not None:
+                    vtk[name] = data.reshape(n_points, ncomp) if ncomp > 1 \
+                                    else data
+            elif key == 'FIELD':
+                # arreglos de FIELD: nombre, componentes, tuplas, tipo
+                for _ in range(int(words[2])):
+                    words = f.readline().split()
+                    while not words:
+                        words = f.readline().split()
+                    name    = words[0].decode()
+                    ncomp   = int(words[1])
+                    ntuples = int(words[2])
+                    dtype   = VTK_TYPES[words[3].decode().lower()]
+                    skip    = fields is not None and name not in fields
+                    data    = _read_block(f, binary, ncomp * ntuples, dtype,
+                                          skip)
+                    if data is not None:
+                        vtk[name] = data.reshape(ntuples, ncomp) \
+                                        if ncomp > 1 else data
+
+            # POINT_DATA, CELL_DATA, DATASET, METADATA, ... no tienen datos
+            # propios, se continua con la siguiente linea
+            line = f.readline()
+
+    return vtk
+
+
+def read_history(filename):
+    '''
+    Lee el archivo history.csv de SU2
+    ...
+
+    Parametros
+    ----------
+    filename : str
+        nombre del archivo
+
+    Return
+    ------
+    history : dict
+        un numpy.array por columna, las llaves son los nombres de las
+        columnas sin comillas ni espacios ("rms[P]", "CL", ...)
+    '''
+
+    with open(filename, 'r') as f:
+        names = [name.strip().strip('"') for name in f.readline().split(',')]
+        data = np.loadtxt(f, delimiter=',', ndmin=2)
+
+    return {name: data[:, k] for k, name in enumerate(names)}
+
+
+def read_cfg(filename):
+    '''
+    Lee las opciones de un archivo de configuracion de SU2 (.cfg) como
+        cadenas de texto. Se ignoran comentarios
+    '''
+
+    cfg = {}
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.split('%')[0]
+            if '=' in line:
+                key, value = line.split('=', 1)
+                cfg[key.strip()] = value.strip()
+
+    return cfg
+
+
+def cfg_alfa(cfg):
+    '''
+    Angulo de ataque de un caso de SU2 en grados. Se toma de AOA o, para
+        casos incompresibles, de la direccion de INC_VELOCITY_INIT
+    '''
+
+    if 'AOA' in cfg:
+        return float(cfg['AOA'])
+    if 'INC_VELOCITY_INIT' in cfg:
+        u, v = np.array(cfg['INC_VELOCITY_INIT'].strip('() ').split(',')[:2],
+                        dtype=float)
+        return np.degrees(np.arctan2(v, u))
+
+    return 0.
+
+
+def wall_points(mesh):
+    '''
+    Coordenadas de los nodos de la pared (eta = 0) en el orden de la malla,
+        que es el orden del perfil (airfoil)
+    ...
+
+    Parametros
+    ----------
+    mesh : mesh
+        Objeto mesh_O o mesh_C
+
+    Return
+    ------
+    (i, x, y) : numpy.array
+        indices xi de los nodos de pared y sus coordenadas
+    '''
+
+    # en malla C airfoil_boundary solo contiene al perfil
+    bound   = np.asarray(mesh.airfoil_boundary)
+    pad     = (mesh.M - np.size(bound)) // 2
+    i       = pad + np.nonzero(bound)[0]
+
+    return (i, mesh.X[i, 0], mesh.Y[i, 0])
+
+
+def map_to_wall(points, x, y, chunk=2048):
+    '''
+    Relaciona los puntos de superficie de SU2 con los nodos de pared de la
+        malla mediante el punto mas cercano
+    ...
+
+    Parametros
+    ----------
+    points : numpy.array
+        puntos de superficie de SU2 (n, 2) o (n, 3)
+    x, y : numpy.array
+        coordenadas de los nodos de pared, en orden del perfil
+    chunk : int
+        numero de nodos de pared procesados a la vez
+
+    Return
+    ------
+    (index, dist) : numpy.array, numpy.array
+        index: punto de SU2 correspondiente a cada nodo de pared
+        dist: distancia entre ambos
+    '''
+
+    P       = np.asarray(points)[:, :2]
+    index   = np.empty(np.size(x), dtype=np.int64)
+    dist    = np.empty(np.size(x))
+
+    for k in range(0, np.size(x), chunk):
+        dx  = x[k: k + chunk, np.newaxis] - P[np.newaxis, :, 0]
+        dy  = y[k: k + chunk, np.newaxis] - P[np.newaxis, :, 1]
+        d2  = dx ** 2 + dy ** 2
+        index[k: k + chunk] = np.argmin(d2, axis=1)
+        dist[k: k + chunk] = np.sqrt(d2[np.arange(np.shape(d2)[0]),
+                                        index[k: k + chunk]])
+
+    return (index, dist)
+
+
+def wall_coefficients(x, y, cp, alfa, c=1):
+    '''
+    Coeficientes de levantamiento y resistencia por integracion del
+        coeficiente de presion sobre la pared. Misma formulacion que
+        potential.lift_n_drag, pero solo con los nodos de pared
+    ...
+
+    Parametros
+    ----------
+    x, y : numpy.array
+        coordenadas de los nodos de pared, en orden de la malla
+    cp : numpy.array
+        coeficiente de presion en los nodos de pared
+    alfa : float64
+        angulo de ataque en grados
+    c : float64
+        cuerda aerodinamica del perfil
+
+    Return
+    ------
+    (L, D) : float64, float64
+        L: coeficiente de levantamiento
+        D: coeficiente de resistencia aerodinamica
+    '''
+
+    alfa = alfa * np.pi / 180
+
+    # lift_n_drag integra en la malla invertida, el signo del recorrido
+    # se compensa en las derivadas
+    x_xi = -np.gradient(x)
+    y_xi = -np.gradient(y)
+
+    cl_x = -np.trapz(cp * y_xi / c)
+    cl_y = np.trapz(cp * x_xi / c)
+
+    L = -cl_x * np.sin(alfa) + cl_y * np.cos(alfa)
+    D = cl_x * np.cos(alfa) + cl_y * np.sin(alfa)
+
+    return (L, D)
+
+
+def compare(casos, c=1, field='Pressure_Coefficient'):
+    '''
+    Compara varios casos de SU2 contra los resultados de flujo potencial
+        sobre la misma malla
+    ...
+
+    Parametros
+    ----------
+    casos : list
+        lista de tuplas (vtk_file, mesh, cp, alfa)
+        vtk_file: archivo surface_flow.vtk de SU2
+        mesh: malla utilizada por ambos solvers
+        cp: coeficiente de presion del flujo potencial (M, N)
+        alfa: angulo de ataque en grados
+    c : float64
+        cuerda aerodinamica del perfil
+    field : str
+        nombre del campo de coeficiente de presion en el archivo VTK
+
+    Return
+    ------
+    result : dict
+        'alfa', 'CL_su2', 'CD_su2', 'CL_pot', 'CD_pot', 'cp_rms', 'dist_max':
+            numpy.array con un valor por caso
+        'x_c', 'cp_su2', 'cp_pot': listas con los valores en la pared,
+            en orden del perfil
+    '''
+
+    # importacion local, potential importa mesh_o y mesh_c
+    from potential import lift_n_drag
+
+    n       = len(casos)
+    result  = {key: np.zeros((n, )) for key in ('alfa', 'CL_su2', 'CD_su2',
+                                               'CL_pot', 'CD_pot', 'cp_rms',
+                                               'dist_max')}
+    result['x_c']       = []
+    result['cp_su2']    = []
+    result['cp_pot']    = []
+
+    for k, (vtk_file, mesh, cp, alfa) in enumerate(casos):
+        vtk             = read_vtk(vtk_file, fields=[field])
+        (i, x, y)       = wall_points(mesh)
+        (index, dist)   = map_to_wall(vtk['points'], x, y)
+        cp_su2          = vtk[field][index]
+        cp_pot          = np.asarray(cp)[i, 0]
+
+        (CL_su2, CD_su2) = wall_coefficients(x, y, cp_su2, alfa, c)
+        (CL_pot, CD_pot) = lift_n_drag(mesh, cp, alfa, c)
+
+        result['alfa'][k]       = alfa
+        result['CL_su2'][k]     = CL_su2
+        result['CD_su2'][k]     = CD_su2
+        result['CL_pot'][k]     = CL_pot
+        result['CD_pot'][k]     = CD_pot
+        result['cp_rms'][k]     = np.sqrt(np.mean((cp_su2 - cp_pot) ** 2))
+        result['dist_max'][k]   = np.max(dist)
+        result['x_c'].append((x - np.min(x)) / c)
+        result['cp_su2'].append(cp_su2)
+        result['cp_pot'].append(cp_pot)
+
+    return result
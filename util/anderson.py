@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Aceleracion de Anderson (Anderson mixing) para iteraciones de punto fijo
+    x <- G(x), como los barridos de Gauss-Seidel de la generacion de mallas
+    (_gen_Laplace_n, _gen_Poisson_n) y de flujo potencial
+    (_potential_flow_o_n).
+
+Con f = G(x) - x y las diferencias de las ultimas depth iteraciones
+    dF = [f_k - f_k-1, ...], dG = [G_k - G_k-1, ...], se resuelve por minimos
+    cuadrados min || f - dF gamma || y la nueva iteracion es
+        x <- (G - dG gamma) - (1 - beta) (f - dF gamma)
+    beta es el amortiguamiento (beta = 1 sin amortiguar, equivalente a omega
+    en SOR).
+
+Salvaguarda: si la norma del residuo crece mas de restart veces respecto al
+    menor residuo desde el ultimo reinicio, si la extrapolacion no es finita
+    o si el paso es mayor que max_step veces el paso simple amortiguado, se
+    descarta el historial y se da un paso simple amortiguado. En la
+    generacion de mallas los pasos largos pueden cruzar la malla y llevar a
+    otra solucion de las ecuaciones, de ahi el valor por defecto de max_step.
+
+El estado puede estar formado por varios arreglos (por ejemplo X y Y, o phi
+    y C), que se concatenan internamente.
+"""
+
+import numpy as np
+
+
+class anderson(object):
+    '''
+    Acelerador de Anderson para iteraciones de punto fijo
+    ...
+
+    Atributos
+    ----------
+    depth : int
+        numero de iteraciones anteriores utilizadas
+    beta : float64
+        amortiguamiento, 0 < beta <= 1
+    restart : float64
+        crecimiento maximo del residuo antes de reiniciar el historial
+    max_step : float64
+        relacion maxima entre el paso de Anderson y el paso simple
+    restarts : int
+        numero de reinicios
+    res : float64
+        maximo valor absoluto del residuo G(x) - x de la ultima iteracion
+
+    Metodos
+    -------
+    update(x, g):
+        nueva iteracion a partir de x y G(x)
+    reset():
+        descarta el historial
+    '''
+
+    def __init__(self, depth=5, beta=1., restart=1e1, max_step=20):
+        self.depth      = depth
+        self.beta       = beta
+        self.restart    = restart
+        self.max_step   = max_step
+        self.restarts   = 0
+        self.res        = np.inf
+        self.reset()
+
+        return
+
+    def reset(self):
+        '''
+        Descarta el historial de iteraciones
+        '''
+
+        self._dF    = []
+        self._dG    = []
+        self._f     = None
+        self._g     = None
+        self._best  = np.inf
+
+        return
+
+    def update(self, x, g):
+        '''
+        Nueva iteracion de Anderson
+        ...
+
+        Parametros
+        ----------
+        x : tuple
+            arreglos (o escalares) del estado actual
+        g : tuple
+            G(x), con las mismas dimensiones que x
+
+        Return
+        ------
+        x : tuple
+            nueva iteracion, con las mismas dimensiones que x
+        '''
+
+        shapes  = [np.shape(a) for a in x]
+        x_      = np.concatenate([np.ravel(a) for a in x])
+        g_      = np.concatenate([np.ravel(a) for a in g])
+        f       = g_ - x_
+        nf      = np.linalg.norm(f)
+        self.res = np.abs(f).max()
+
+        if self._f is not None:
+            self._dF.append(f - self._f)
+            self._dG.append(g_ - self._g)
+            if len(self._dF) > self.depth:
+                self._dF.pop(0)
+                self._dG.pop(0)
+        self._f = f
+        self._g = g_
+
+        if nf > self.restart * self._best:
+            self.restarts += 1
+            self.reset()
+            self._f = f
+            self._g = g_
+        self._best = min(self._best, nf)
+
+        x_new = x_ + self.beta * f
+        if self._dF:
+            dF      = np.stack(self._dF, axis=1)
+            dG      = np.stack(self._dG, axis=1)
+            gamma   = np.linalg.lstsq(dF, f, rcond=1e-10)[0]
+            x_aa    = g_ - dG @ gamma - (1 - self.beta) * (f - dF @ gamma)
+            paso    = np.abs(x_aa - x_).max()
+            if np.all(np.isfinite(x_aa)) \
+                    and paso <= self.max_step * self.beta * self.res:
+                x_new = x_aa
+            else:
+                self.restarts += 1
+                self.reset()
+
+        salida  = []
+        k       = 0
+        for s in shapes:
+            n = int(np.prod(s))
+            salida.append(x_new[k:k + n].reshape(s) if s else x_new[k])
+            k += n
+
+        return tuple(salida)
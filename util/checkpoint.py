@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author:    Marco Antonio Cardoso Moreno
+@mail:      marcoacardosom@gmail.com
+
+Puntos de control (checkpoints) para metodos iterativos de larga duracion
+    (generacion de mallas, flujo potencial).
+
+Los archivos se escriben en formato npz comprimido. La escritura es atomica:
+    primero se escribe un archivo temporal y despues se reemplaza el archivo
+    final, de manera que una interrupcion nunca deja un checkpoint corrupto.
+"""
+
+import os
+import time
+
+import numpy as np
+
+
+def save_checkpoint(filename, **data):
+    '''
+    Guarda los arreglos y escalares de data en un archivo npz comprimido,
+        de forma atomica
+    ...
+
+    Parametros
+    ----------
+    filename : str
+        nombre del archivo (se recomienda extension .npz)
+    **data : numpy.array, float, int, str
+        valores a guardar
+
+    Return
+    ------
+    None
+    '''
+
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, **data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+    return
+
+
+def load_checkpoint(filename):
+    '''
+    Lee un checkpoint escrito con save_checkpoint
+    ...
+
+    Parametros
+    ----------
+    filename : str
+        nombre del archivo
+
+    Return
+    ------
+    data : dict
+        valores guardados. Los escalares se regresan como tipos de python
+    '''
+
+    data = {}
+    with np.load(filename, allow_pickle=False) as f:
+        for key in f.files:
+            value = f[key]
+            data[key] = value.item() if value.ndim == 0 else value
+
+    return data
+
+
+class checkpoint_timer(object):
+    '''
+    Indica cuando se debe escribir un checkpoint, cada every segundos
+    '''
+
+    def __init__(self, every):
+        self.every  = every
+        self.last   = time.time()
+
+    def due(self):
+        now = time.time()
+        if now - self.last >= self.every:
+            self.last = now
+            return True
+
+        return False
@@ -66,6 +66,18 @@ def from_txt_mesh(filename='./garbage/mesh_own.txt_mesh'):
         Y[i, :] = np.fromstring(mesh[line_], sep=',')
         i += 1
 
+    mesh = mesh_from_arrays(tipo, d_eta, d_xi, R, M, N, airfoil_alone,
+                            airfoil_join, airfoil_boundary, X, Y)
+
+    return mesh
+
+def mesh_from_arrays(tipo, d_eta, d_xi, R, M, N, airfoil_alone, airfoil_join,
+                     airfoil_boundary, X, Y):
+    '''
+    Construye un objeto mesh_O o mesh_C a partir de sus atributos y de las
+        matrices X y Y. Utilizada por los diferentes formatos de importacion
+    '''
+
     perfil = airfoil.airfoil(c=1)
     perfil.x = X[:, 0]
     perfil.y = Y[:, 0]